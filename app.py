@@ -1,255 +1,194 @@
+import hashlib
+import io
+import json
+import logging
 import os
-import re
-import sqlite3
 import time
 import threading
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Use backend não-interativo
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
-from collections import Counter
-import base64
-import io
-from flask import Flask, render_template, request, jsonify, url_for
-try:
-    from selenium_simples import executar_web_scraping_selenium_simples, progresso_busca as progresso_selenium
-except ImportError:
-    progresso_selenium = None
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-import nltk
-from nltk.corpus import stopwords
+from flask import (Flask, Response, g, render_template, request, jsonify, send_file, send_from_directory,
+                   stream_with_context, url_for)
+import banco
+import busca_textual
+import cache_graficos
+import colunar
+import graficos
+import indice_termos
+import jobs
+import metricas
+import temas
+from config import FTS_CONFIG, METRICS_CONFIG, PAGINATION_CONFIG, PLOT_CONFIG, TOPIC_MODEL_CONFIG
+from preprocessamento import carregar_stopwords
+
+# Pandas, matplotlib, wordcloud, NLTK, scikit-learn e Selenium são importados sob demanda (graficos,
+# sentimento, preprocessamento e selenium_simples), para o app subir rápido
 
 # Inicializa Flask
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'sua_chave_secreta_aqui'
 
-# Variáveis globais para controle de progresso
-progresso_busca = {'status': 'idle', 'progresso': 0, 'total_resultados': 0, 'topico_atual': ''}
+_log = logging.getLogger('cq.app')
 
-def verificar_nltk():
-    """Verifica e baixa recursos NLTK necessários"""
-    for recurso in ['stopwords', 'punkt']:
-        try:
-            nltk.data.find(f'corpora/{recurso}')
-        except LookupError:
-            nltk.download(recurso)
+# Estado devolvido por /progresso antes da primeira busca
+PROGRESSO_OCIOSO = {'status': 'idle', 'progresso': 0, 'total_resultados': 0, 'topico_atual': ''}
 
-def executar_web_scraping(topicos_selecionados, ano_inicio, ano_fim, min_resultados):
-    """Chama a versão simples do Selenium"""
-    global progresso_busca
-    
+# Diretório dos gráficos renderizados (nomes derivados do conteúdo, ver graficos.nome_arquivo)
+PLOTS_DIR = os.path.join('static', 'plots')
+
+# Intervalo máximo sem eventos no SSE antes de mandar um comentário de keep-alive
+INTERVALO_KEEPALIVE = 15
+
+def executar_web_scraping(job, topicos_selecionados, ano_inicio, ano_fim, min_resultados):
+    """Chama a versão simples do Selenium, registrando o progresso no job da busca"""
     try:
-        # Importar e sincronizar progresso
         import selenium_simples
         
-        # Garantir que o progresso está sincronizado
-        selenium_simples.progresso_busca = progresso_busca
-        
-        print(f"🎯 Iniciando busca para {len(topicos_selecionados)} tópicos")
+        print(f"🎯 Iniciando busca {job.id} para {len(topicos_selecionados)} tópicos")
         print(f"📊 Parâmetros: {ano_inicio}-{ano_fim}, min_resultados={min_resultados}")
         
         # Executar scraping
-        selenium_simples.executar_web_scraping_selenium_simples(topicos_selecionados, ano_inicio, ano_fim, min_resultados)
-        
-        # Sincronizar progresso de volta
-        progresso_busca.update(selenium_simples.progresso_busca)
+        selenium_simples.executar_web_scraping_selenium_simples(
+            topicos_selecionados, ano_inicio, ano_fim, min_resultados, job=job
+        )
         
         print("✅ Web scraping concluído com sucesso")
         
+        # Artigos novos entram no snapshot colunar das análises (colunar.py)
+        _atualizar_snapshot()
+        
+        # Artigos novos entram no modelo de temas em segundo plano
+        if TOPIC_MODEL_CONFIG['ENABLED']:
+            iniciar_job_temas()
+        
     except Exception as e:
         print(f"❌ Erro no web scraping: {e}")
-        progresso_busca['status'] = f'erro: {str(e)}'
-        progresso_busca['progresso'] = 0
+        job.atualizar(status=f'erro: {str(e)}', progresso=0)
+
+def _atualizar_snapshot():
+    """Leva o snapshot colunar até o estado do banco; uma falha não afeta a busca"""
+    try:
+        with banco.conexao() as conn:
+            colunar.atualizar(conn)
+    except Exception as e:
+        print(f"⚠️ Erro ao atualizar o snapshot colunar: {e}")
 
-def gerar_graficos():
-    """Gera todos os gráficos e retorna os caminhos"""
+def gerar_graficos(execucao_id=None):
+    """Gera todos os gráficos e retorna os caminhos
+
+    Com execucao_id, analisa apenas os artigos encontrados naquela execução de busca;
+    sem ele, usa o histórico completo (cada artigo contado uma única vez). Os dados são
+    agregados aqui e os gráficos renderizados em paralelo no pool de processos de graficos,
+    em arquivos cujo nome deriva do fingerprint: cada escopo e versão dos dados tem os seus.
+    """
     try:
         # Garantir que o diretório de plots existe
-        plots_dir = os.path.join('static', 'plots')
-        os.makedirs(plots_dir, exist_ok=True)
-        
-        # Verificar NLTK
-        verificar_nltk()
-        
-        # Carregar dados
-        conn = sqlite3.connect("buscas_completas_CQ.db")
-        df = pd.read_sql_query("SELECT * FROM resultados_detalhados_CQ", conn)
-        conn.close()
-        
-        if df.empty:
-            return None
-        
-        graficos = {}
-        
-        # Configurar matplotlib com fonte compatível
-        plt.rcParams['font.family'] = 'DejaVu Sans'
-        plt.rcParams['font.size'] = 10
-        
-        # Preparar dados
-        df['texto_completo'] = df['titulo'].fillna('') + ' ' + df['resumo'].fillna('')
-        df['texto_limpo'] = df['texto_completo'].str.lower().apply(lambda x: re.sub(r'[^a-z\s]', '', x))
-        
-        stopwords_custom = set(stopwords.words('portuguese')).union({
-            'computacao', 'quantica', 'quântico', 'quantum', 'trabalho', 'estudo', 'pesquisa',
-            'neste', 'este', 'para', 'com', 'que', 'uma', 'como', 'sobre', 'dados', 'resultados'
-        })
-        
-        df['texto_filtrado'] = df['texto_limpo'].apply(lambda x: ' '.join([w for w in x.split() if w not in stopwords_custom]))
-        
-        # 1. WordCloud
-        try:
-            plt.figure(figsize=(12, 6))
-            texto = ' '.join(df['texto_filtrado'].dropna())
-            if texto and len(texto.strip()) > 0:
-                wordcloud = WordCloud(
-                    width=800, 
-                    height=400, 
-                    background_color='white',
-                    colormap='viridis',
-                    max_words=100,
-                    relative_scaling=0.5
-                ).generate(texto)
-                plt.imshow(wordcloud, interpolation='bilinear')
-                plt.axis('off')
-                plt.title('Nuvem de Palavras-Chave', fontsize=16, fontweight='bold')
-                plt.tight_layout()
-                plt.savefig('static/plots/wordcloud.png', dpi=300, bbox_inches='tight', facecolor='white')
-                plt.close()
-                graficos['wordcloud'] = 'plots/wordcloud.png'
-                print("WordCloud gerado com sucesso!")
-        except Exception as e:
-            print(f"Erro ao gerar WordCloud: {e}")
-            plt.close()
-        
-        # 2. Análise de Sentimento
-        try:
-            positivas = {'inovação', 'oportunidades', 'avanços', 'eficiente', 'sucesso', 'melhor', 'novo', 'promissor'}
-            negativas = {'desafios', 'problemas', 'riscos', 'limitações', 'ameaça', 'dificuldade', 'complexo'}
+        os.makedirs(PLOTS_DIR, exist_ok=True)
+        
+        with banco.conexao() as conn:
+            # Reaproveitar os gráficos se os dados não mudaram desde a última geração
+            fingerprint = cache_graficos.calcular_fingerprint(conn, execucao_id)
+            graficos_cache = cache_graficos.obter(fingerprint)
+            if graficos_cache is not None:
+                print(f"♻️ Gráficos servidos do cache ({fingerprint})")
+                return graficos_cache
             
-            def sentimento(texto):
-                if not isinstance(texto, str):
-                    return 'Neutro'
-                texto = texto.lower()
-                p = sum(1 for w in positivas if w in texto)
-                n = sum(1 for w in negativas if w in texto)
-                return 'Positivo' if p > n else 'Negativo' if n > p else 'Neutro'
-            
-            df['sentimento'] = df['resumo'].apply(sentimento)
-            
-            plt.figure(figsize=(10, 6))
-            sentimento_counts = df['sentimento'].value_counts()
-            colors = ['#28a745', '#dc3545', '#6c757d']
-            
-            plt.pie(sentimento_counts.values, labels=sentimento_counts.index, 
-                   autopct='%1.1f%%', colors=colors, startangle=90)
-            plt.title('Análise de Sentimento dos Resumos', fontsize=16, fontweight='bold')
-            plt.axis('equal')
-            plt.tight_layout()
-            plt.savefig('static/plots/sentimentos.png', dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close()
-            graficos['sentimentos'] = 'plots/sentimentos.png'
-            print("Análise de sentimento gerada com sucesso!")
-        except Exception as e:
-            print(f"Erro ao gerar análise de sentimento: {e}")
-            plt.close()
-        
-        # 3. Análise Temporal
-        try:
-            df['ano_publicacao'] = pd.to_numeric(df['ano_publicacao'], errors='coerce')
-            df_anos = df.dropna(subset=['ano_publicacao'])
-            df_anos = df_anos[(df_anos['ano_publicacao'] >= 1900) & (df_anos['ano_publicacao'] <= 2025)]
-            df_anos['ano_publicacao'] = df_anos['ano_publicacao'].astype(int)
-            
-            if not df_anos.empty:
-                plt.figure(figsize=(12, 6))
-                anos_contagem = df_anos['ano_publicacao'].value_counts().sort_index()
-                
-                plt.bar(anos_contagem.index, anos_contagem.values, 
-                       color='skyblue', edgecolor='navy', alpha=0.7)
-                plt.title('Publicações por Ano', fontsize=16, fontweight='bold')
-                plt.xlabel('Ano', fontsize=12)
-                plt.ylabel('Número de Artigos', fontsize=12)
-                plt.xticks(rotation=45)
-                plt.grid(axis='y', alpha=0.3)
-                
-                # Adicionar valores nas barras
-                for i, v in enumerate(anos_contagem.values):
-                    plt.text(anos_contagem.index[i], v + 0.1, str(v), 
-                           ha='center', va='bottom', fontweight='bold')
-                
-                plt.tight_layout()
-                plt.savefig('static/plots/temporal.png', dpi=300, bbox_inches='tight', facecolor='white')
-                plt.close()
-                graficos['temporal'] = 'plots/temporal.png'
-                print("Gráfico temporal gerado com sucesso!")
-        except Exception as e:
-            print(f"Erro ao gerar gráfico temporal: {e}")
-            plt.close()
-        
-        # 4. Tendências por Tópico
-        try:
-            if 'termo' in df.columns and not df_anos.empty:
-                plt.figure(figsize=(14, 8))
-                tendencias = df_anos.groupby(['ano_publicacao', 'termo']).size().unstack(fill_value=0)
-                
-                # Limitar a 10 tópicos mais frequentes para melhor visualização
-                top_topicos = df['termo'].value_counts().head(10).index
-                tendencias_top = tendencias[top_topicos]
-                
-                tendencias_top.plot(kind='line', marker='o', figsize=(14, 8), linewidth=2, markersize=6)
-                plt.title('Tendência de Tópicos por Ano', fontsize=16, fontweight='bold')
-                plt.xlabel('Ano', fontsize=12)
-                plt.ylabel('Quantidade de Artigos', fontsize=12)
-                plt.legend(title='Tópico', bbox_to_anchor=(1.05, 1), loc='upper left')
-                plt.grid(True, alpha=0.3)
-                plt.tight_layout()
-                plt.savefig('static/plots/tendencias.png', dpi=300, bbox_inches='tight', facecolor='white')
-                plt.close()
-                graficos['tendencias'] = 'plots/tendencias.png'
-                print("Gráfico de tendências gerado com sucesso!")
-        except Exception as e:
-            print(f"Erro ao gerar gráfico de tendências: {e}")
-            plt.close()
-        
-        # 5. Top Palavras
-        try:
-            if texto and len(texto.strip()) > 0:
-                palavras_freq = Counter(texto.split()).most_common(20)
-                if palavras_freq:
-                    palavras, frequencias = zip(*palavras_freq)
-                    
-                    plt.figure(figsize=(12, 8))
-                    colors = plt.cm.viridis(range(len(palavras)))
-                    bars = plt.barh(range(len(palavras)), frequencias, color=colors)
-                    plt.yticks(range(len(palavras)), palavras)
-                    plt.title('Top 20 Palavras Mais Frequentes', fontsize=16, fontweight='bold')
-                    plt.xlabel('Frequência', fontsize=12)
-                    plt.gca().invert_yaxis()
-                    plt.grid(axis='x', alpha=0.3)
-                    
-                    # Adicionar valores nas barras
-                    for i, (bar, freq) in enumerate(zip(bars, frequencias)):
-                        plt.text(freq + max(frequencias) * 0.01, i, str(freq), 
-                               va='center', ha='left', fontweight='bold')
-                    
-                    plt.tight_layout()
-                    plt.savefig('static/plots/top_palavras.png', dpi=300, bbox_inches='tight', facecolor='white')
-                    plt.close()
-                    graficos['top_palavras'] = 'plots/top_palavras.png'
-                    print("Gráfico de top palavras gerado com sucesso!")
-        except Exception as e:
-            print(f"Erro ao gerar gráfico de top palavras: {e}")
-            plt.close()
+            _, dados = cache_graficos.obter_dados(conn, execucao_id, fingerprint)
+        if dados is None:
+            return None
         
-        return graficos
+        resultado = graficos.renderizar_todos(dados, PLOTS_DIR, fingerprint)
+        cache_graficos.salvar(fingerprint, resultado)
+        # Apagar renderizações antigas, poupando as que ainda estão no cache
+        em_uso = cache_graficos.arquivos_em_uso() | {os.path.basename(caminho) for caminho in resultado.values()}
+        graficos.coletar_lixo(PLOTS_DIR, em_uso)
+        return resultado
         
     except Exception as e:
         print(f"Erro ao gerar gráficos: {e}")
         return None
 
+def _executar_job_graficos(job, execucao_id):
+    """Corpo da thread de um job de gráficos"""
+    job.atualizar(status='gerando', progresso=10)
+    inicio = time.time()
+    resultado = gerar_graficos(execucao_id)
+    duracao = round(time.time() - inicio, 2)
+    if resultado is None:
+        # gerar_graficos já registrou a causa: falha na geração ou nenhum artigo no escopo
+        job.atualizar(status='erro: gráficos não gerados (sem dados ou falha na geração)', progresso=0,
+                      duracao=duracao)
+        print(f"❌ Job de gráficos {job.id} terminou sem gráficos em {duracao}s")
+        return
+    job.atualizar(status='concluido', progresso=100, graficos=resultado, duracao=duracao)
+    print(f"✅ Job de gráficos {job.id} concluído em {duracao}s")
+
+def iniciar_job_graficos(execucao_id=None):
+    """Inicia (ou reaproveita, se já estiver rodando) a geração dos gráficos em segundo plano"""
+    escopo = execucao_id if execucao_id is not None else 'todas'
+    job = jobs.registro.em_andamento('graficos', escopo=escopo)
+    if job is not None:
+        return job.id
+    
+    job = jobs.registro.criar('graficos', {'escopo': escopo, 'graficos': None}, escopo=escopo)
+    threading.Thread(target=_executar_job_graficos, args=(job, execucao_id), daemon=True).start()
+    return job.id
+
+def _executar_job_temas(job, reajustar):
+    """Corpo da thread de um job de modelagem de temas"""
+    try:
+        job.atualizar(status='ajustando', progresso=0)
+        with banco.conexao() as conn:
+            resultado = temas.atualizar(
+                conn, reajustar, progresso=lambda percentual: job.atualizar(progresso=round(percentual, 1))
+            )
+        job.atualizar(status='concluido', progresso=100, resultado=resultado)
+    except Exception as e:
+        print(f"❌ Erro na modelagem de temas: {e}")
+        job.atualizar(status=f'erro: {str(e)}')
+
+def iniciar_job_temas(reajustar=False):
+    """Inicia (ou reaproveita, se já estiver rodando) a atualização do modelo de temas"""
+    job = jobs.registro.em_andamento('temas')
+    if job is not None:
+        return job.id
+    
+    job = jobs.registro.criar('temas', {'resultado': None}, reajustar=reajustar)
+    threading.Thread(target=_executar_job_temas, args=(job, reajustar), daemon=True).start()
+    return job.id
+
+@app.before_request
+def _antes_da_requisicao():
+    g.inicio_requisicao = time.perf_counter()
+    # Perfilador por amostragem só para esta requisição (?perfil=1), se habilitado
+    if METRICS_CONFIG['PROFILER_ENABLED'] and request.args.get(METRICS_CONFIG['PROFILER_PARAM']):
+        g.amostrador = metricas.AmostradorPerfil(threading.get_ident()).iniciar()
+
+@app.after_request
+def _depois_da_requisicao(resposta):
+    """Métricas da requisição e, se perfilada, o perfil gravado ao fim da resposta (X-Perfil)"""
+    rota = request.url_rule.rule if request.url_rule is not None else 'sem_rota'
+    metricas.observar('requisicao', time.perf_counter() - g.inicio_requisicao, rota=rota)
+    metricas.incrementar('requisicoes_http', rota=rota, status=resposta.status_code)
+    
+    amostrador = g.pop('amostrador', None)
+    if amostrador is not None:
+        # Respostas transmitidas em partes continuam depois daqui: o perfil fecha com a resposta
+        caminho = os.path.join(METRICS_CONFIG['PROFILER_DIR'], f"perfil_{time.time_ns()}_{request.endpoint}.txt")
+        resposta.headers['X-Perfil'] = caminho
+        resposta.call_on_close(lambda: amostrador.salvar(caminho))
+    return resposta
+
+@app.teardown_request
+def _fim_da_requisicao(_erro):
+    # Requisição que falhou antes do after_request: parar o amostrador sem gravar
+    amostrador = g.pop('amostrador', None)
+    if amostrador is not None:
+        amostrador.parar()
+
+@app.route('/metrics')
+def exibir_metricas():
+    """Contadores e durações das etapas instrumentadas, no formato de texto do Prometheus"""
+    return Response(metricas.exportar_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/')
 def index():
     """Página inicial"""
@@ -286,63 +225,411 @@ def iniciar_busca():
             print("❌ Nenhum tópico selecionado")
             return jsonify({'erro': 'Nenhum tópico selecionado'}), 400
         
-        # Resetar progresso
-        global progresso_busca
-        progresso_busca = {'status': 'recebido', 'progresso': 0, 'total_resultados': 0, 'topico_atual': ''}
+        # Cada busca tem o próprio job (e progresso); várias podem rodar ao mesmo tempo
+        job = jobs.registro.criar(
+            'busca',
+            {'status': 'recebido', 'total_resultados': 0, 'topico_atual': ''},
+            topicos=topicos_selecionados
+        )
         
         print("🧵 Iniciando thread de scraping...")
         # Iniciar o scraping em uma thread separada
         thread = threading.Thread(
             target=executar_web_scraping,
-            args=(topicos_selecionados, ano_inicio, ano_fim, min_resultados),
+            args=(job, topicos_selecionados, ano_inicio, ano_fim, min_resultados),
             daemon=True
         )
         thread.start()
         
         print("✅ Thread iniciada com sucesso")
-        return jsonify({'sucesso': True, 'mensagem': 'Busca iniciada com sucesso'})
+        return jsonify({
+            'sucesso': True,
+            'mensagem': 'Busca iniciada com sucesso',
+            'job_id': job.id,
+            'eventos': url_for('eventos_job', job_id=job.id),
+            'progresso': url_for('obter_progresso_job', job_id=job.id)
+        })
     
     except Exception as e:
         print(f"❌ Erro na rota iniciar_busca: {e}")
         return jsonify({'erro': str(e)}), 500
 
+@app.route('/cancelar', methods=['POST'])
+@app.route('/cancelar/<job_id>', methods=['POST'])
+def cancelar_busca(job_id=None):
+    """Cancela uma busca em andamento (a mais recente, se o job_id não for informado)
+
+    Os artigos já gravados são mantidos; o job passa a 'cancelado' assim que o motor para.
+    """
+    job = jobs.registro.obter(job_id) if job_id else jobs.registro.ultimo('busca')
+    if job is None or job.tipo != 'busca':
+        return jsonify({'erro': 'Busca não encontrada'}), 404
+    if not job.cancelar():
+        return jsonify({'erro': 'A busca já terminou', 'status': job.status}), 409
+    print(f"🛑 Cancelamento solicitado para a busca {job.id}")
+    return jsonify({
+        'sucesso': True,
+        'job_id': job.id,
+        'progresso': url_for('obter_progresso_job', job_id=job.id)
+    })
+
 @app.route('/progresso')
 def obter_progresso():
-    """Retorna o progresso atual da busca"""
-    global progresso_busca
-    print(f"📊 Progresso solicitado: {progresso_busca}")
-    return jsonify(progresso_busca)
+    """Retorna o progresso da busca mais recente (use /progresso/<job_id> para uma busca específica)"""
+    job = jobs.registro.ultimo('busca')
+    return jsonify(job.instantaneo() if job is not None else PROGRESSO_OCIOSO)
+
+@app.route('/progresso/<job_id>')
+def obter_progresso_job(job_id):
+    """Retorna o progresso de um job (busca ou gráficos)"""
+    job = jobs.registro.obter(job_id)
+    if job is None:
+        return jsonify({'erro': 'Job não encontrado'}), 404
+    return jsonify(job.instantaneo())
+
+@app.route('/eventos/<job_id>')
+def eventos_job(job_id):
+    """Transmite o progresso de um job por Server-Sent Events até ele terminar"""
+    job = jobs.registro.obter(job_id)
+    if job is None:
+        return jsonify({'erro': 'Job não encontrado'}), 404
+    
+    def gerar():
+        versao = None
+        while True:
+            estado, versao = job.aguardar_mudanca(versao, INTERVALO_KEEPALIVE)
+            if estado is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: progresso\ndata: {json.dumps(estado, ensure_ascii=False)}\n\n"
+            if jobs.finalizado(estado['status']):
+                yield "event: fim\ndata: {}\n\n"
+                return
+    
+    return Response(
+        stream_with_context(gerar()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/jobs')
+def listar_jobs():
+    """Lista os jobs registrados (?tipo=busca|graficos|temas)"""
+    return jsonify([job.instantaneo() for job in jobs.registro.listar(request.args.get('tipo'))])
 
 @app.route('/resultados')
 def exibir_resultados():
-    """Página para exibir os resultados e gráficos"""
-    graficos = gerar_graficos()
-    return render_template('resultados.html', graficos=graficos)
+    """Página para exibir os resultados e gráficos (?execucao=<id> filtra uma execução)"""
+    execucao_id = request.args.get('execucao', type=int)
+    
+    # Agregados em JSON para os gráficos desenhados no navegador
+    analises_url = url_for('obter_analises', execucao=execucao_id)
+    if not PLOT_CONFIG['SERVER_RENDER']:
+        return render_template('resultados.html', graficos=None, job_id=None, analises_url=analises_url)
+    
+    # Com os dados inalterados os gráficos já estão prontos; senão a página volta na hora
+    # e acompanha a geração por /graficos/status/<job_id>
+    with banco.conexao() as conn:
+        graficos_prontos = cache_graficos.obter(cache_graficos.calcular_fingerprint(conn, execucao_id))
+    if graficos_prontos is not None:
+        return render_template('resultados.html', graficos=graficos_prontos, urls=_urls_graficos(graficos_prontos),
+                               job_id=None, analises_url=analises_url)
+    
+    job_id = iniciar_job_graficos(execucao_id)
+    return render_template('resultados.html', graficos=None, job_id=job_id, analises_url=analises_url)
+
+@app.route('/api/analises')
+def obter_analises():
+    """Dados dos gráficos em JSON, para desenhar no navegador (?execucao=<id>&top=20)
+
+    Publicações por ano, matriz tópico x ano, sentimentos, palavras mais frequentes,
+    frequências da nuvem de palavras e temas. Os agregados ficam em cache pelo fingerprint
+    da tabela: com os dados inalterados, a requisição custa só o fingerprint, e o ETag
+    permite ao navegador revalidar sem baixar de novo (304).
+    """
+    try:
+        execucao_id = request.args.get('execucao', type=int)
+        top = min(max(request.args.get('top', 20, type=int), 1), 100)
+        with banco.conexao() as conn:
+            fingerprint = cache_graficos.calcular_fingerprint(conn, execucao_id)
+            etag = hashlib.sha1(f"{fingerprint}:{top}".encode('utf-8')).hexdigest()
+            if request.if_none_match.contains(etag):
+                resposta = Response(status=304)
+                resposta.set_etag(etag)
+                return resposta
+            _, dados = cache_graficos.obter_dados(conn, execucao_id, fingerprint)
+        if dados is None:
+            return jsonify({'erro': 'Nenhum artigo encontrado'}), 404
+        
+        resposta = jsonify({
+            'execucao': execucao_id,
+            **graficos.agregados_json(dados, top),
+            'exportar': {
+                nome: url_for('exportar_grafico', nome=nome, formato='svg', execucao=execucao_id)
+                for nome in graficos.RENDERIZADORES
+            }
+        })
+        resposta.set_etag(etag)
+        resposta.headers['Cache-Control'] = 'no-cache'
+        return resposta
+    
+    except Exception as e:
+        print(f"❌ Erro na rota api/analises: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/analises/<nome>.<formato>')
+def exportar_grafico(nome, formato):
+    """Um gráfico renderizado no servidor sob demanda (?execucao=<id>&dpi=300)
+
+    Formatos de PLOT_CONFIG['EXPORT_FORMATS']; dpi até EXPORT_MAX_DPI. Com ?download=1
+    o arquivo vem como anexo.
+    """
+    try:
+        if nome not in graficos.RENDERIZADORES:
+            return jsonify({'erro': f'Gráfico desconhecido: {nome}'}), 404
+        execucao_id = request.args.get('execucao', type=int)
+        dpi = request.args.get('dpi', PLOT_CONFIG['DPI'], type=int)
+        with banco.conexao() as conn:
+            _, dados = cache_graficos.obter_dados(conn, execucao_id)
+        if dados is None:
+            return jsonify({'erro': 'Nenhum artigo encontrado'}), 404
+        
+        conteudo = graficos.exportar(nome, dados, formato, dpi)
+        if conteudo is None:
+            return jsonify({'erro': f'Sem dados para o gráfico {nome}'}), 404
+        return send_file(
+            io.BytesIO(conteudo), download_name=f"{nome}.{formato}",
+            as_attachment=request.args.get('download', type=int) == 1
+        )
+    
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Erro na rota api/analises/{nome}.{formato}: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/graficos/gerar', methods=['POST'])
+def gerar_graficos_rota():
+    """Inicia a geração dos gráficos em segundo plano (?execucao=<id> filtra uma execução)"""
+    try:
+        execucao_id = request.args.get('execucao', type=int)
+        job_id = iniciar_job_graficos(execucao_id)
+        return jsonify({'sucesso': True, 'job_id': job_id})
+    
+    except Exception as e:
+        print(f"❌ Erro na rota graficos/gerar: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/graficos/status/<job_id>')
+def obter_status_graficos(job_id):
+    """Retorna o estado de um job de gráficos e, quando concluído, os caminhos gerados"""
+    job = jobs.registro.obter(job_id)
+    if job is None or job.tipo != 'graficos':
+        return jsonify({'erro': 'Job não encontrado'}), 404
+    resposta = job.instantaneo()
+    if resposta['graficos']:
+        resposta['urls'] = _urls_graficos(resposta['graficos'])
+    return jsonify(resposta)
+
+def _urls_graficos(caminhos):
+    """URLs de /graficos/arquivo para os caminhos relativos a static/ de gerar_graficos"""
+    return {nome: url_for('servir_grafico', arquivo=os.path.basename(caminho)) for nome, caminho in caminhos.items()}
+
+@app.route('/graficos/arquivo/<arquivo>')
+def servir_grafico(arquivo):
+    """Imagem de um gráfico gerado
+
+    O nome deriva dos dados e dos parâmetros de renderização e o conteúdo de um nome
+    nunca muda, então a resposta leva ETag forte e Cache-Control immutable de longa
+    duração (PLOT_CONFIG['FILE_MAX_AGE']); If-None-Match com o mesmo ETag recebe 304.
+    """
+    resposta = send_from_directory(os.path.abspath(PLOTS_DIR), arquivo, etag=graficos.etag_arquivo(arquivo),
+                                   max_age=PLOT_CONFIG['FILE_MAX_AGE'], conditional=True)
+    resposta.cache_control.public = True
+    resposta.cache_control.immutable = True
+    return resposta
+
+@app.route('/tendencias_termos')
+def obter_tendencias_termos():
+    """Tendência anual de termos (?termos=a,b) e termos mais frequentes por tópico (?topico=...)"""
+    try:
+        execucao_id = request.args.get('execucao', type=int)
+        limite = request.args.get('limite', 20, type=int)
+        termos = [t.strip().lower() for t in request.args.get('termos', '').split(',') if t.strip()]
+        topico = request.args.get('topico')
+        
+        stopwords_analise = carregar_stopwords()
+        with banco.conexao() as conn:
+            if topico:
+                mais_frequentes = indice_termos.top_termos_por_topico(conn, topico, limite, stopwords_analise, execucao_id)
+            else:
+                mais_frequentes = indice_termos.top_termos(conn, limite, stopwords_analise, execucao_id)
+            if not termos:
+                termos = [termo for termo, _ in mais_frequentes[:5]]
+            por_ano = indice_termos.tendencia_termos(conn, termos, execucao_id)
+        
+        return jsonify({
+            'mais_frequentes': [{'termo': termo, 'ocorrencias': total} for termo, total in mais_frequentes],
+            'por_ano': [
+                {'ano': ano, 'termo': termo, 'ocorrencias': ocorrencias, 'artigos': artigos}
+                for ano, termo, ocorrencias, artigos in por_ano
+            ]
+        })
+    
+    except Exception as e:
+        print(f"❌ Erro na rota tendencias_termos: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/temas')
+def obter_temas():
+    """Temas descobertos nos resumos (LDA) e a prevalência de cada um por ano (?execucao=<id>)
+
+    Enquanto não há modelo ajustado, inicia o ajuste e responde 202 com o job_id.
+    """
+    try:
+        execucao_id = request.args.get('execucao', type=int)
+        with banco.conexao() as conn:
+            lista = temas.listar_temas(conn, execucao_id)
+            por_ano = temas.prevalencia_por_ano(conn, execucao_id) if lista else []
+        
+        if not lista:
+            return jsonify({'temas': [], 'por_ano': [], 'job_id': iniciar_job_temas()}), 202
+        
+        artigos_no_ano = {}
+        for ano, _, artigos in por_ano:
+            artigos_no_ano[ano] = artigos_no_ano.get(ano, 0) + artigos
+        return jsonify({
+            'versao': lista[0]['versao'],
+            'atualizado_em': lista[0]['atualizado_em'],
+            'temas': [{'tema': t['tema'], 'palavras': t['palavras'], 'artigos': t['artigos']} for t in lista],
+            'por_ano': [
+                {'ano': ano, 'tema': tema, 'artigos': artigos,
+                 'prevalencia': round(artigos / artigos_no_ano[ano], 4)}
+                for ano, tema, artigos in por_ano
+            ]
+        })
+    
+    except Exception as e:
+        print(f"❌ Erro na rota api/temas: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/temas/atualizar', methods=['POST'])
+def atualizar_temas():
+    """Atualiza o modelo de temas com os artigos novos (?reajustar=1 refaz do zero)"""
+    try:
+        job_id = iniciar_job_temas(request.args.get('reajustar', 0, type=int) == 1)
+        return jsonify({'sucesso': True, 'job_id': job_id})
+    
+    except Exception as e:
+        print(f"❌ Erro na rota api/temas/atualizar: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/execucoes')
+def obter_execucoes():
+    """Lista as execuções de busca registradas"""
+    try:
+        with banco.conexao() as conn:
+            execucoes = banco.listar_execucoes(conn)
+        return jsonify(execucoes)
+    
+    except Exception as e:
+        print(f"❌ Erro na rota execucoes: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/buscar')
+def buscar():
+    """Busca textual no corpus (título, resumo, autores e fonte), ordenada por relevância (BM25)
+
+    Parâmetros: q (termos; "frase exata"; termo* para prefixo), prefixo=1 (o último termo
+    também vira prefixo, para busca enquanto se digita), topico, execucao, ano_min, ano_max,
+    limite, cursor (valor de 'proximo' da página anterior) e duplicatas=1 (inclui as
+    quase-duplicatas agrupadas). 'truncado' indica que a consulta casou com mais de
+    FTS_CONFIG['MAX_RANKED'] artigos e só os mais recentes foram ranqueados.
+    """
+    try:
+        limite = request.args.get('limite', FTS_CONFIG['PAGE_SIZE'], type=int)
+        limite = max(1, min(limite, PAGINATION_CONFIG['MAX_PAGE_SIZE']))
+        inicio = time.perf_counter()
+        try:
+            with banco.conexao() as conn:
+                resultados, proximo, truncado = busca_textual.buscar(
+                    conn,
+                    request.args.get('q', ''),
+                    prefixo=request.args.get('prefixo', 0, type=int) == 1,
+                    topico=request.args.get('topico'),
+                    execucao_id=request.args.get('execucao', type=int),
+                    ano_min=request.args.get('ano_min', type=int),
+                    ano_max=request.args.get('ano_max', type=int),
+                    limite=limite,
+                    cursor_pagina=request.args.get('cursor'),
+                    duplicatas=request.args.get('duplicatas', 0, type=int) == 1
+                )
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+        
+        return jsonify({
+            'resultados': resultados,
+            'proximo': proximo,
+            'truncado': truncado,
+            'tempo_ms': round((time.perf_counter() - inicio) * 1000, 2)
+        })
+    
+    except Exception as e:
+        print(f"❌ Erro na rota buscar: {e}")
+        return jsonify({'erro': str(e)}), 500
 
 @app.route('/dados_tabela')
 def obter_dados_tabela():
-    """Retorna os dados em formato JSON para a tabela"""
+    """Retorna uma página da tabela de resultados, transmitida em partes
+
+    Parâmetros: cursor (valor do cabeçalho X-Proximo-Cursor da página anterior), limite,
+    topico, execucao, ano_min, ano_max, q (busca textual, ver /buscar), ordem (id_desc, id_asc,
+    ano_desc, ano_asc), colunas (separadas por vírgula) e formato (json ou ndjson).
+    """
     try:
-        conn = sqlite3.connect("buscas_completas_CQ.db")
-        cursor = conn.cursor()
+        limite = request.args.get('limite', PAGINATION_CONFIG['PAGE_SIZE'], type=int)
+        limite = max(1, min(limite, PAGINATION_CONFIG['MAX_PAGE_SIZE']))
+        colunas = [c.strip() for c in request.args.get('colunas', '').split(',') if c.strip()]
+        formato = request.args.get('formato', 'json')
+        if formato not in ('json', 'ndjson'):
+            return jsonify({'erro': f'Formato inválido: {formato}'}), 400
         
-        # Buscar dados com SQL direto para garantir compatibilidade
-        cursor.execute("SELECT * FROM resultados_detalhados_CQ ORDER BY id DESC LIMIT 1000")
-        colunas = [description[0] for description in cursor.description]
-        linhas = cursor.fetchall()
-        
-        # Converter para lista de dicionários
-        dados = []
-        for linha in linhas:
-            registro = {}
-            for i, coluna in enumerate(colunas):
-                registro[coluna] = linha[i]
-            dados.append(registro)
-        
-        conn.close()
-        
-        print(f"📊 Retornando {len(dados)} registros para a tabela")
-        return jsonify(dados)
+        try:
+            with banco.conexao() as conn:
+                colunas, linhas, proximo_cursor = banco.pagina_resultados(
+                    conn,
+                    colunas or PAGINATION_CONFIG['DEFAULT_COLUMNS'],
+                    ordem=request.args.get('ordem', 'id_desc'),
+                    cursor_pagina=request.args.get('cursor'),
+                    limite=limite,
+                    topico=request.args.get('topico'),
+                    execucao_id=request.args.get('execucao', type=int),
+                    ano_min=request.args.get('ano_min', type=int),
+                    ano_max=request.args.get('ano_max', type=int),
+                    texto=request.args.get('q', '').strip()
+                )
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+        
+        def gerar():
+            # Serializa linha a linha: nada de montar o payload inteiro em memória
+            if formato == 'ndjson':
+                for linha in linhas:
+                    yield json.dumps(dict(zip(colunas, linha)), ensure_ascii=False) + '\n'
+                return
+            yield '['
+            for i, linha in enumerate(linhas):
+                yield (',' if i else '') + json.dumps(dict(zip(colunas, linha)), ensure_ascii=False)
+            yield ']'
+        
+        resposta = Response(
+            stream_with_context(gerar()),
+            mimetype='application/x-ndjson' if formato == 'ndjson' else 'application/json'
+        )
+        if proximo_cursor is not None:
+            resposta.headers['X-Proximo-Cursor'] = proximo_cursor
+        _log.debug(f"dados_tabela: {len(linhas)} registros")
+        return resposta
     
     except Exception as e:
         print(f"❌ Erro na rota dados_tabela: {e}")
@@ -355,19 +642,22 @@ def testar_graficos():
         # Garantir que o diretório existe
         os.makedirs('static/plots', exist_ok=True)
         
-        # Tentar gerar um gráfico simples de teste
-        plt.figure(figsize=(10, 6))
-        plt.plot([1, 2, 3, 4], [1, 4, 2, 3], 'o-', linewidth=2, markersize=8)
-        plt.title('Gráfico de Teste', fontsize=16, fontweight='bold')
-        plt.xlabel('X')
-        plt.ylabel('Y')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('static/plots/teste.png', dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
-        
-        # Verificar se matplotlib e seaborn estão funcionando
         import matplotlib
+        matplotlib.use('Agg')  # Use backend não-interativo
+        from matplotlib.figure import Figure
+        
+        # Tentar gerar um gráfico simples de teste
+        fig = Figure(figsize=(10, 6))
+        ax = fig.add_subplot()
+        ax.plot([1, 2, 3, 4], [1, 4, 2, 3], 'o-', linewidth=2, markersize=8)
+        ax.set_title('Gráfico de Teste', fontsize=16, fontweight='bold')
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        fig.savefig('static/plots/teste.png', dpi=300, bbox_inches='tight', facecolor='white')
+        
+        # Verificar se o seaborn está disponível
         import seaborn as sns
         
         info = {
@@ -389,6 +679,16 @@ if __name__ == '__main__':
     os.makedirs('static/js', exist_ok=True)
     
     print("Diretórios criados com sucesso!")
+    
+    # Log em arquivo com rotação (LOGGING_CONFIG)
+    metricas.configurar_logs()
+    
+    # Recursos do NLTK resolvidos uma vez, antes de servir requisições
+    carregar_stopwords()
+
+    # Migrações e índices pendentes do banco, antes de servir requisições
+    with banco.conexao() as conn:
+        banco.migrar_pendentes(conn)
     print("Servidor iniciando...")
     
     # Executar aplicação
@@ -0,0 +1,563 @@
+"""
+Acesso ao banco de resultados: esquema, execuções de busca e ingestão incremental
+
+Cada artigo é gravado uma única vez em resultados_detalhados_CQ, identificado por uma
+chave normalizada (URL ou, na falta dela, título). Os tópicos e execuções em que o
+artigo apareceu ficam em artigo_topicos, de modo que buscas repetidas não duplicam
+linhas e as análises podem olhar uma execução específica ou o histórico inteiro.
+Quase-duplicatas (preprint x versão publicada, espelhos) são agrupadas por
+duplicatas.py: cluster_id aponta para o artigo canônico do grupo.
+
+As conexões vêm de um pool compartilhado pelo app e pelo scraper (conexao(),
+obter_conexao()/devolver_conexao()): cada thread usa uma conexão por vez, em modo WAL,
+para que as leituras não esperem pelas escritas do scraper.
+"""
+
+import contextlib
+import queue
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from urllib.parse import urlsplit, urlunsplit
+
+import busca_textual
+import duplicatas
+import indice_termos
+import metricas
+import temas
+from config import DATABASE_CONFIG
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+_lock_esquema = threading.Lock()
+_esquema_pronto = False
+
+# Conexões ociosas e a conexão em uso por cada thread
+_pool = queue.LifoQueue(maxsize=DATABASE_CONFIG['POOL_SIZE'])
+_local = threading.local()
+
+_REGEX_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+_REGEX_URL = re.compile(r'https?://([\w.:@-]+)(/[^?#\s]*)?(?:\?([^#\s]*))?(?:#\S*)?', re.ASCII)
+
+# Colunas que a tabela de resultados pode devolver
+COLUNAS_PUBLICAS = ('id', 'termo', 'titulo', 'ano_publicacao', 'autores', 'fonte_publicacao',
+                    'resumo', 'url_artigo', 'timestamp', 'execucao_id', 'cluster_id')
+
+# Ordenações aceitas por pagina_resultados: chave do cursor e direção
+ORDENACOES = {
+    'id_desc': (('id',), 'DESC'),
+    'id_asc': (('id',), 'ASC'),
+    'ano_desc': (('COALESCE(ano_publicacao, 0)', 'id'), 'DESC'),
+    'ano_asc': (('COALESCE(ano_publicacao, 0)', 'id'), 'ASC'),
+}
+
+
+def normalizar_chave(url_artigo, titulo):
+    """Chave de deduplicação: URL sem esquema/fragmento ou, sem URL, o título normalizado"""
+    if url_artigo:
+        # Caminho rápido para URLs absolutas comuns (mesmo resultado do urlsplit abaixo)
+        simples = _REGEX_URL.fullmatch(url_artigo)
+        if simples:
+            host, caminho, query = simples.groups()
+            host = host.lower()
+            if host.startswith('www.'):
+                host = host[4:]
+            if host:
+                return f"url:{host}{(caminho or '').rstrip('/')}{'?' + query if query else ''}"
+
+        partes = urlsplit(url_artigo.strip())
+        host = partes.netloc.lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        caminho = partes.path.rstrip('/')
+        return 'url:' + urlunsplit(('', host, caminho, partes.query, '')).lstrip('/')
+
+    texto = unicodedata.normalize('NFKD', titulo or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return 'titulo:' + _REGEX_NAO_ALFANUMERICO.sub(' ', texto).strip()
+
+
+def _nova_conexao():
+    conn = sqlite3.connect(
+        DATABASE_CONFIG['DATABASE_NAME'], timeout=DATABASE_CONFIG['TIMEOUT'], check_same_thread=False
+    )
+    # WAL: leitores não bloqueiam o escritor (e vice-versa); NORMAL é seguro em WAL
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {int(DATABASE_CONFIG['TIMEOUT'] * 1000)}")
+    conn.execute(f"PRAGMA cache_size = -{DATABASE_CONFIG['CACHE_SIZE_MB'] * 1024}")
+    conn.execute(f"PRAGMA mmap_size = {DATABASE_CONFIG['MMAP_SIZE_MB'] * 1024 * 1024}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA foreign_keys = ON")
+    garantir_esquema(conn)
+    return conn
+
+
+def obter_conexao():
+    """Conexão da thread atual (reaproveitada do pool ou criada)
+
+    Chamadas aninhadas na mesma thread recebem a mesma conexão. Cada obter_conexao()
+    precisa de um devolver_conexao() correspondente; prefira o gerenciador conexao().
+    """
+    conn = getattr(_local, 'conexao', None)
+    if conn is not None:
+        _local.profundidade += 1
+        return conn
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _nova_conexao()
+    _local.conexao = conn
+    _local.profundidade = 1
+    return conn
+
+
+def devolver_conexao(conn):
+    """Devolve a conexão ao pool (transações não confirmadas são desfeitas)"""
+    if getattr(_local, 'conexao', None) is not conn:
+        conn.close()
+        return
+    _local.profundidade -= 1
+    if _local.profundidade > 0:
+        return
+    _local.conexao = None
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+@contextlib.contextmanager
+def conexao():
+    """with banco.conexao() as conn: ... — conexão do pool, devolvida ao final"""
+    conn = obter_conexao()
+    try:
+        yield conn
+    finally:
+        devolver_conexao(conn)
+
+
+def definir_banco(caminho):
+    """Passa a usar outro arquivo de banco e retorna o caminho anterior
+
+    As conexões ociosas do pool são fechadas e o esquema é conferido de novo na próxima
+    conexão. Usado pelos benchmarks, que gravam em bancos temporários; chame sem
+    conexões em uso, que voltariam ao pool ainda apontando para o banco anterior.
+    """
+    global _esquema_pronto
+    with _lock_esquema:
+        while True:
+            try:
+                _pool.get_nowait().close()
+            except queue.Empty:
+                break
+        _esquema_pronto = False
+        anterior = DATABASE_CONFIG['DATABASE_NAME']
+        DATABASE_CONFIG['DATABASE_NAME'] = caminho
+    return anterior
+
+
+def _colunas(cursor, tabela):
+    cursor.execute(f"PRAGMA table_info({tabela})")
+    return {linha[1] for linha in cursor.fetchall()}
+
+
+def criar_esquema(conn):
+    """Cria as tabelas, colunas e índices que faltam (só DDL, custo fixo)
+
+    O que depende do tamanho do corpus fica em migrar_pendentes.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {TABELA} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            termo TEXT NOT NULL,
+            titulo TEXT NOT NULL,
+            ano_publicacao INTEGER,
+            autores TEXT,
+            fonte_publicacao TEXT,
+            resumo TEXT,
+            url_artigo TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            chave TEXT,
+            execucao_id INTEGER,
+            indexado INTEGER DEFAULT 0,
+            assinatura BLOB,
+            cluster_id INTEGER
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS execucoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            inicio DATETIME DEFAULT CURRENT_TIMESTAMP,
+            fim DATETIME,
+            topicos TEXT,
+            ano_inicio INTEGER,
+            ano_fim INTEGER,
+            status TEXT,
+            novos INTEGER DEFAULT 0,
+            repetidos INTEGER DEFAULT 0
+        )
+    ''')
+    # Uma linha por (artigo, tópico, execução) em que o artigo foi encontrado
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS artigo_topicos (
+            artigo_id INTEGER NOT NULL,
+            termo TEXT NOT NULL,
+            execucao_id INTEGER NOT NULL,
+            PRIMARY KEY (artigo_id, termo, execucao_id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_artigo_topicos_execucao ON artigo_topicos(execucao_id)")
+
+    indice_termos.criar_tabelas(cursor)
+    temas.criar_tabelas(cursor)
+    duplicatas.criar_tabelas(cursor)
+    busca_textual.criar_tabelas(cursor)
+
+    colunas = _colunas(cursor, TABELA)
+    for coluna, tipo in (('chave', 'TEXT'), ('execucao_id', 'INTEGER'), ('indexado', 'INTEGER DEFAULT 0'),
+                         ('assinatura', 'BLOB'), ('cluster_id', 'INTEGER')):
+        if coluna not in colunas:
+            cursor.execute(f"ALTER TABLE {TABELA} ADD COLUMN {coluna} {tipo}")
+
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_resultados_chave ON {TABELA}(chave)")
+
+    # Índices dos filtros da tabela e das análises
+    for coluna in ('termo', 'ano_publicacao', 'url_artigo', 'timestamp', 'cluster_id'):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_resultados_{coluna} ON {TABELA}({coluna})")
+    # Chave das ordenações por ano da tabela (ORDENACOES): páginas pelo índice, sem ordenar
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_resultados_ano_id ON {TABELA}(COALESCE(ano_publicacao, 0), id)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_artigo_topicos_termo ON artigo_topicos(termo, artigo_id)")
+    conn.commit()
+
+
+def migrar_pendentes(conn):
+    """Põe em dia bancos antigos e artigos gravados sem índices
+
+    Monta o índice de busca textual se ele não cobre a tabela, preenche a chave das
+    linhas antigas, agrupa duplicatas e indexa os termos dos artigos pendentes. Percorre o
+    corpus, então é um passo explícito da inicialização (app.py e importacao.py), e não
+    de garantir_esquema, que roda ao abrir conexões.
+    """
+    cursor = conn.cursor()
+    # Primeiro o índice FTS: a migração apaga duplicatas, e o gatilho de DELETE espera
+    # encontrar cada linha apagada no índice
+    busca_textual.montar_pendente(cursor)
+    _migrar_sem_chave(cursor)
+    conn.commit()
+    duplicatas.agrupar_pendentes(conn)
+    indice_termos.reindexar_pendentes(conn)
+
+
+def _migrar_sem_chave(cursor):
+    """Preenche a chave das linhas antigas, unindo duplicatas em um único artigo"""
+    cursor.execute(f"SELECT id, termo, titulo, url_artigo FROM {TABELA} WHERE chave IS NULL ORDER BY id")
+    linhas = cursor.fetchall()
+    if not linhas:
+        return
+
+    print(f"🔧 Migrando {len(linhas)} resultados para a ingestão incremental...")
+    cursor.execute(
+        "INSERT INTO execucoes (status, fim, novos) VALUES ('migrado', CURRENT_TIMESTAMP, 0)"
+    )
+    execucao_id = cursor.lastrowid
+
+    cursor.execute(f"SELECT chave, id FROM {TABELA} WHERE chave IS NOT NULL")
+    canonicos = dict(cursor.fetchall())
+    duplicados = []
+    for artigo_id, termo, titulo, url_artigo in linhas:
+        chave = normalizar_chave(url_artigo, titulo)
+        canonico = canonicos.get(chave)
+        if canonico is None:
+            canonicos[chave] = canonico = artigo_id
+            cursor.execute(
+                f"UPDATE {TABELA} SET chave = ?, execucao_id = ? WHERE id = ?",
+                (chave, execucao_id, artigo_id)
+            )
+        else:
+            duplicados.append((artigo_id,))
+        cursor.execute(
+            "INSERT OR IGNORE INTO artigo_topicos (artigo_id, termo, execucao_id) VALUES (?, ?, ?)",
+            (canonico, termo, execucao_id)
+        )
+
+    cursor.executemany(f"DELETE FROM {TABELA} WHERE id = ?", duplicados)
+    cursor.execute(
+        "UPDATE execucoes SET novos = ?, repetidos = ? WHERE id = ?",
+        (len(linhas) - len(duplicados), len(duplicados), execucao_id)
+    )
+    print(f"✅ Migração concluída: {len(duplicados)} duplicatas unidas")
+
+
+def garantir_esquema(conn):
+    """Executa criar_esquema uma única vez por processo"""
+    global _esquema_pronto
+    if _esquema_pronto:
+        return
+    with _lock_esquema:
+        if not _esquema_pronto:
+            criar_esquema(conn)
+            _esquema_pronto = True
+
+
+def limpar_resultados(conn):
+    """Apaga todos os artigos (modo não incremental)"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM artigo_topicos")
+    cursor.execute(f"DELETE FROM {TABELA}")
+    indice_termos.limpar(cursor)
+    temas.limpar(cursor)
+    duplicatas.limpar(cursor)
+    conn.commit()
+
+
+def iniciar_execucao(conn, topicos, ano_inicio, ano_fim):
+    """Registra uma nova execução de busca e retorna o id dela"""
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO execucoes (topicos, ano_inicio, ano_fim, status) VALUES (?, ?, ?, 'em andamento')",
+        (' | '.join(topicos), ano_inicio, ano_fim)
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+def finalizar_execucao(conn, execucao_id, status):
+    """Fecha a execução, gravando quantos artigos novos e repetidos ela encontrou"""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT COUNT(*) FROM {TABELA} WHERE execucao_id = ?", (execucao_id,)
+    )
+    novos = cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT COUNT(DISTINCT artigo_id) FROM artigo_topicos WHERE execucao_id = ?", (execucao_id,)
+    )
+    encontrados = cursor.fetchone()[0]
+    cursor.execute(
+        "UPDATE execucoes SET fim = CURRENT_TIMESTAMP, status = ?, novos = ?, repetidos = ? WHERE id = ?",
+        (status, novos, encontrados - novos, execucao_id)
+    )
+    conn.commit()
+
+
+def salvar_artigo(conn, linha, termo, execucao_id):
+    """Insere o artigo se ele ainda não existe e associa o tópico à execução
+
+    Artigos novos são agrupados com suas quase-duplicatas e, se canônicos, entram no
+    índice de termos. Retorna True quando o artigo é novo.
+    O commit fica a cargo de quem chama.
+    """
+    cursor = conn.cursor()
+    chave = normalizar_chave(linha['url_artigo'], linha['titulo'])
+    cursor.execute(
+        f"INSERT OR IGNORE INTO {TABELA} "
+        "(termo, titulo, ano_publicacao, autores, fonte_publicacao, resumo, url_artigo, chave, execucao_id, indexado) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)",
+        (termo, linha['titulo'], linha['ano_publicacao'], linha['autores'],
+         linha['fonte_publicacao'], linha['resumo'], linha['url_artigo'], chave, execucao_id)
+    )
+    novo = cursor.rowcount == 1
+    if novo:
+        artigo_id = cursor.lastrowid
+        canonicos = duplicatas.agrupar_lote(cursor, [(artigo_id, linha['titulo'], linha['resumo'])])
+        indice_termos.indexar_lote(cursor, canonicos)
+    else:
+        cursor.execute(f"SELECT id FROM {TABELA} WHERE chave = ?", (chave,))
+        artigo_id = cursor.fetchone()[0]
+
+    cursor.execute(
+        "INSERT OR IGNORE INTO artigo_topicos (artigo_id, termo, execucao_id) VALUES (?, ?, ?)",
+        (artigo_id, termo, execucao_id)
+    )
+    return novo
+
+
+class EscritorLote:
+    """Acumula artigos e grava o lote inteiro em uma única transação
+
+    O lote é descarregado quando atinge `tamanho_lote` artigos ou quando o mais antigo
+    espera há `intervalo` segundos (verificado a cada adicionar), além de explicitamente
+    por descarregar(). As linhas vão para uma tabela temporária com executemany e dali
+    para a tabela principal e artigo_topicos com INSERT ... SELECT.
+    """
+
+    COLUNAS = ('titulo', 'ano_publicacao', 'autores', 'fonte_publicacao', 'resumo', 'url_artigo')
+
+    def __init__(self, conn, execucao_id, tamanho_lote=None, intervalo=None, indexar=True):
+        self.conn = conn
+        self.execucao_id = execucao_id
+        self.tamanho_lote = tamanho_lote or DATABASE_CONFIG['WRITE_BATCH_SIZE']
+        self.intervalo = DATABASE_CONFIG['WRITE_BATCH_INTERVAL'] if intervalo is None else intervalo
+        # Sem indexar, os artigos ficam com indexado = 0 e sem grupo para
+        # duplicatas.agrupar_pendentes e indice_termos.reindexar_pendentes
+        self.indexar = indexar
+        self._pendentes = []
+        self._primeiro_em = None
+        self.salvos = 0
+        self.novos = 0
+        conn.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS lote_artigos (
+                ordem INTEGER PRIMARY KEY,
+                termo TEXT, {', '.join(self.COLUNAS)}, chave TEXT
+            )
+        """)
+
+    def adicionar(self, linha, termo):
+        """Enfileira um artigo (dict com as colunas de COLUNAS); retorna o resultado do
+        descarregamento se o lote foi gravado, senão None"""
+        if not self._pendentes:
+            self._primeiro_em = time.monotonic()
+        url_artigo = linha.get('url_artigo')
+        titulo = linha.get('titulo')
+        self._pendentes.append((
+            termo, titulo, linha.get('ano_publicacao'), linha.get('autores'), linha.get('fonte_publicacao'),
+            linha.get('resumo'), url_artigo, normalizar_chave(url_artigo, titulo)
+        ))
+        if (len(self._pendentes) >= self.tamanho_lote
+                or time.monotonic() - self._primeiro_em >= self.intervalo):
+            return self.descarregar()
+        return None
+
+    def descarregar(self):
+        """Grava os artigos pendentes e retorna (salvos, novos) deste lote"""
+        if not self._pendentes:
+            return 0, 0
+        pendentes, self._pendentes = self._pendentes, []
+        colunas = ', '.join(self.COLUNAS)
+        with metricas.medir('gravacao_banco'), self.conn:
+            cursor = self.conn.cursor()
+            # Trava de escrita já no início: numa transação adiada, a leitura aberta pela
+            # tabela temporária não pode virar escrita depois que outro worker gravou, e o
+            # SQLite devolve "database is locked" sem esperar o timeout
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(
+                f"INSERT INTO lote_artigos (termo, {colunas}, chave) VALUES ({', '.join('?' * (len(self.COLUNAS) + 2))})",
+                pendentes
+            )
+            cursor.execute(
+                f"INSERT OR IGNORE INTO {TABELA} (termo, {colunas}, chave, execucao_id, indexado) "
+                f"SELECT termo, {colunas}, chave, ?, 0 FROM lote_artigos ORDER BY ordem",
+                (self.execucao_id,)
+            )
+            # rowcount conta só as linhas inseridas pelo comando, sem as dos gatilhos (FTS)
+            novos = cursor.rowcount
+            cursor.execute(
+                "INSERT OR IGNORE INTO artigo_topicos (artigo_id, termo, execucao_id) "
+                f"SELECT r.id, l.termo, ? FROM lote_artigos l JOIN {TABELA} r ON r.chave = l.chave",
+                (self.execucao_id,)
+            )
+            if self.indexar and novos:
+                cursor.execute(
+                    f"SELECT id, titulo, resumo FROM {TABELA} "
+                    "WHERE indexado = 0 AND chave IN (SELECT chave FROM lote_artigos)"
+                )
+                artigos = cursor.fetchall()
+                indice_termos.indexar_lote(cursor, duplicatas.agrupar_lote(cursor, artigos))
+                cursor.executemany(
+                    f"UPDATE {TABELA} SET indexado = 1 WHERE id = ?", [(artigo[0],) for artigo in artigos]
+                )
+            cursor.execute("DELETE FROM lote_artigos")
+        self.salvos += len(pendentes)
+        self.novos += novos
+        metricas.incrementar('linhas_gravadas', len(pendentes))
+        metricas.incrementar('artigos_novos', novos)
+        return len(pendentes), novos
+
+
+def listar_execucoes(conn):
+    """Execuções registradas, da mais recente para a mais antiga"""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, inicio, fim, topicos, ano_inicio, ano_fim, status, novos, repetidos "
+        "FROM execucoes ORDER BY id DESC"
+    )
+    colunas = [descricao[0] for descricao in cursor.description]
+    return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+
+
+def pagina_resultados(conn, colunas, ordem='id_desc', cursor_pagina=None, limite=100,
+                      topico=None, execucao_id=None, ano_min=None, ano_max=None, texto=None):
+    """Uma página de artigos com paginação por chave (keyset)
+
+    cursor_pagina é a chave da última linha da página anterior ("id" ou "ano:id",
+    conforme a ordenação), então o custo de cada página não depende da posição dela na
+    tabela. Retorna (nomes das colunas, linhas, cursor da próxima página ou None).
+
+    Com a chave "ano:id", a página sai de até duas buscas no índice idx_resultados_ano_id:
+    o restante do ano do cursor (ano = ? AND id < ?) e, se faltarem linhas, os anos
+    seguintes (ano < ?). Uma comparação de row values, (ano, id) < (?, ?), só restringe
+    a primeira coluna do índice e percorreria o ano inteiro do cursor a cada página.
+    """
+    if ordem not in ORDENACOES:
+        raise ValueError(f"Ordenação inválida: {ordem}")
+    colunas = [coluna for coluna in colunas if coluna in COLUNAS_PUBLICAS]
+    if not colunas:
+        raise ValueError("Nenhuma coluna válida selecionada")
+    chave, direcao = ORDENACOES[ordem]
+
+    condicoes, parametros = [], []
+    if topico:
+        condicoes.append("id IN (SELECT artigo_id FROM artigo_topicos WHERE termo = ?)")
+        parametros.append(topico)
+    if execucao_id is not None:
+        condicoes.append("id IN (SELECT artigo_id FROM artigo_topicos WHERE execucao_id = ?)")
+        parametros.append(execucao_id)
+    if ano_min is not None:
+        condicoes.append("ano_publicacao >= ?")
+        parametros.append(ano_min)
+    if ano_max is not None:
+        condicoes.append("ano_publicacao <= ?")
+        parametros.append(ano_max)
+    if texto:
+        # Índice FTS5 em vez de LIKE '%texto%', que varreria a tabela inteira
+        condicao, valores = busca_textual.filtro_ids(texto)
+        if condicao:
+            condicoes.append(condicao)
+            parametros.extend(valores)
+    # Trechos da página, na ordem: condições da chave, seus parâmetros e a ordenação
+    trechos = [([], [], chave)]
+    if cursor_pagina:
+        try:
+            valores = [int(parte) for parte in str(cursor_pagina).split(':')]
+        except ValueError:
+            raise ValueError(f"Cursor inválido: {cursor_pagina}")
+        if len(valores) != len(chave):
+            raise ValueError(f"Cursor inválido para a ordenação {ordem}: {cursor_pagina}")
+        operador = '<' if direcao == 'DESC' else '>'
+        if len(chave) == 1:
+            trechos = [([f"{chave[0]} {operador} ?"], valores, chave)]
+        else:
+            (ano, artigo_id), (valor_ano, valor_id) = chave, valores
+            # Com o ano fixo, ordenar só pelo id: o SQLite não descarta a expressão do
+            # ORDER BY pela igualdade e ordenaria numa B-tree temporária
+            trechos = [([f"{ano} = ?", f"{artigo_id} {operador} ?"], [valor_ano, valor_id], (artigo_id,)),
+                       ([f"{ano} {operador} ?"], [valor_ano], chave)]
+
+    cursor = conn.cursor()
+    linhas = []
+    for condicoes_chave, valores_chave, chave_ordem in trechos:
+        todas = condicoes + condicoes_chave
+        where = f" WHERE {' AND '.join(todas)}" if todas else ''
+        ordenacao = ', '.join(f"{expressao} {direcao}" for expressao in chave_ordem)
+        cursor.execute(
+            f"SELECT {', '.join(colunas)}, {', '.join(chave)} FROM {TABELA}"
+            f"{where} ORDER BY {ordenacao} LIMIT ?",
+            (*parametros, *valores_chave, limite + 1 - len(linhas))
+        )
+        linhas.extend(cursor.fetchall())
+        if len(linhas) > limite:
+            break
+
+    proximo = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo = ':'.join(str(valor) for valor in linhas[-1][len(colunas):])
+    return colunas, [linha[:len(colunas)] for linha in linhas], proximo
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark da coleta: o pipeline completo de busca contra um Scholar local
+
+Sobe um servidor HTTP local (ServidorScholar) que imita as páginas de resultados a
+partir das fixtures: `start` abaixo de --paginas devolve scholar_pagina.html (com títulos
+e URLs distintos por tópico e página), depois disso scholar_vazia.html. A busca roda
+inteira (selenium_simples -> coletor HTTP -> extração -> EscritorLote -> banco temporário),
+sem rede e sem navegador, e o resultado mostra páginas por segundo, requisições x
+conexões TCP abertas (keep-alive) e memória do processo.
+
+--intervalo-ms liga o token bucket por host (SEARCH_CONFIG['PAGE_DELAY']): a vazão
+deve ficar no limite de taxa, não abaixo dele. --lento-ms deixa as páginas do primeiro
+tópico lentas, para mostrar que os demais não esperam por ele (tempo de cada tópico no
+resultado). --cancelar-apos cancela o job no meio, como a rota /cancelar.
+
+Com --captcha, o servidor responde como o Scholar bloqueado (redirecionamento para
+/sorry/), para exercitar as novas tentativas e o tratamento de bloqueio (sem a
+alternativa Selenium, que precisaria de um navegador).
+
+Uso:
+    python benchmarks/bench_coleta.py [--topicos 4] [--paginas 5] [--workers 2] [--latencia-ms 20]
+                                      [--intervalo-ms 0] [--lento-ms 0] [--cancelar-apos SEGUNDOS]
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import DATABASE_CONFIG, GOOGLE_SCHOLAR_CONFIG, PAGE_CACHE_CONFIG, SEARCH_CONFIG  # noqa: E402
+
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+_REGEX_TITULO = re.compile(r'(<a id="cid\d+" href=")([^"]*)("[^>]*>)')
+
+
+class ServidorScholar(ThreadingHTTPServer):
+    """Servidor local com as páginas de fixture no lugar do Google Scholar"""
+
+    daemon_threads = True
+
+    def __init__(self, paginas=5, latencia=0.0, captcha=False, lento=0.0):
+        super().__init__(('127.0.0.1', 0), _Manipulador)
+        with open(os.path.join(DIR_FIXTURES, 'scholar_pagina.html'), encoding='utf-8') as f:
+            self.pagina = f.read()
+        with open(os.path.join(DIR_FIXTURES, 'scholar_vazia.html'), encoding='utf-8') as f:
+            self.vazia = f.read()
+        self.paginas = paginas
+        self.latencia = latencia
+        self.captcha = captcha
+        # Latência extra das páginas do primeiro tópico ("tópico 0 ...")
+        self.lento = lento
+        self.requisicoes = 0
+        self.conexoes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/scholar"
+
+    def contar(self, campo):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def gerar_pagina(self, consulta, inicio):
+        """Resultados distintos por tópico e página (títulos e URLs únicos)"""
+        if inicio >= self.paginas * 10:
+            return self.vazia
+        rotulo = html.escape(f"{consulta} #{inicio // 10 + 1}")
+        contador = iter(range(10))
+
+        def substituir(correspondencia):
+            posicao = next(contador, 0)
+            url = f"{correspondencia.group(2)}?q={urllib.parse.quote(consulta)}&n={inicio + posicao}"
+            return f"{correspondencia.group(1)}{html.escape(url)}{correspondencia.group(3)}[{rotulo}.{posicao}] "
+        return _REGEX_TITULO.sub(substituir, self.pagina)
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.contar('conexoes')
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.contar('requisicoes')
+        parametros = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        consulta = parametros.get('q', [''])[0]
+        latencia = self.server.latencia + (self.server.lento if consulta.startswith('tópico 0 ') else 0)
+        if latencia:
+            time.sleep(latencia)
+        if self.server.captcha:
+            self.send_response(302)
+            self.send_header('Location', '/sorry/index?continue=' + urllib.parse.quote(self.path))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        inicio = int(parametros.get('start', ['0'])[0])
+        corpo = self.server.gerar_pagina(consulta, inicio).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=UTF-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def executar(topicos=4, paginas=5, workers=2, latencia_ms=20.0, captcha=False, intervalo_ms=0.0, lento_ms=0.0,
+             cancelar_apos=None):
+    """Executa a busca contra o servidor local e retorna um dicionário com os resultados"""
+    servidor = ServidorScholar(paginas, latencia_ms / 1000, captcha, lento_ms / 1000)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    GOOGLE_SCHOLAR_CONFIG['BASE_URL'] = servidor.url
+    # Sem cache de páginas; sem limite de taxa, a menos que --intervalo-ms seja informado
+    PAGE_CACHE_CONFIG['ENABLED'] = False
+    SEARCH_CONFIG['PAGE_DELAY'] = intervalo_ms / 1000
+    SEARCH_CONFIG['BACKOFF_BASE'] = 0.01
+    if captcha:
+        SEARCH_CONFIG['FETCHER_FALLBACK'] = None
+
+    import banco
+    import jobs
+    import selenium_simples
+
+    banco.definir_banco(os.path.join(tempfile.mkdtemp(prefix='bench_coleta_'), 'coleta.db'))
+
+    nomes = [f"tópico {i} computação quântica" for i in range(topicos)]
+    meta = paginas * 10
+    job = jobs.registro.criar('busca', topicos=nomes)
+    if cancelar_apos is not None:
+        threading.Timer(cancelar_apos, job.cancelar).start()
+
+    # Momento em que cada tópico terminou, acompanhando as mudanças do job
+    concluidos = {}
+    inicio = time.perf_counter()
+
+    def acompanhar():
+        versao = None
+        while not job.finalizado:
+            estado, versao = job.aguardar_mudanca(versao, 1)
+            for nome, topico in ((estado or {}).get('topicos') or {}).items():
+                if topico['status'] in ('concluido', 'erro', 'cancelado') and nome not in concluidos:
+                    concluidos[nome] = round(time.perf_counter() - inicio, 3)
+    threading.Thread(target=acompanhar, daemon=True).start()
+
+    selenium_simples.executar_web_scraping_selenium_simples(nomes, 2020, 2025, meta, num_workers=workers, job=job)
+    duracao = time.perf_counter() - inicio
+    progresso = job.instantaneo()
+    servidor.shutdown()
+
+    with banco.conexao() as conn:
+        artigos = conn.execute(f"SELECT COUNT(*) FROM {DATABASE_CONFIG['TABLE_NAME']}").fetchone()[0]
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss_kb //= 1024
+    return {
+        'coletor': SEARCH_CONFIG['FETCHER'],
+        'status': progresso['status'],
+        'topicos': topicos,
+        'workers': workers,
+        'latencia_servidor_ms': latencia_ms,
+        'paginas_coletadas': progresso.get('paginas', 0),
+        'resultados': progresso.get('total_resultados', 0),
+        'artigos_no_banco': artigos,
+        'requisicoes_http': servidor.requisicoes,
+        'conexoes_tcp': servidor.conexoes,
+        'segundos': round(duracao, 3),
+        'paginas_por_segundo': round(progresso.get('paginas', 0) / duracao, 1) if duracao else None,
+        'limite_paginas_por_segundo': round(1000 / intervalo_ms, 1) if intervalo_ms else None,
+        'segundos_por_topico': {
+            nome: [concluidos.get(nome), topico['status']] for nome, topico in progresso.get('topicos', {}).items()
+        },
+        'rss_mb': round(rss_kb / 1024, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--topicos', type=int, default=4)
+    parser.add_argument('--paginas', type=int, default=5, help='páginas com resultados por tópico')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--latencia-ms', type=float, default=20.0, help='latência simulada de cada resposta')
+    parser.add_argument('--captcha', action='store_true', help='servidor responde como o Scholar bloqueado')
+    parser.add_argument('--intervalo-ms', type=float, default=0.0, help='intervalo do token bucket por host')
+    parser.add_argument('--lento-ms', type=float, default=0.0, help='latência extra das páginas do primeiro tópico')
+    parser.add_argument('--cancelar-apos', type=float, help='cancela a busca depois destes segundos')
+    args = parser.parse_args()
+    resultado = executar(args.topicos, args.paginas, args.workers, args.latencia_ms, args.captcha,
+                         args.intervalo_ms, args.lento_ms, args.cancelar_apos)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    if resultado['status'] not in ('concluido', 'cancelado'):
+        sys.exit(1)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark do snapshot colunar (colunar.py) contra as consultas SQL das análises
+
+Popula um banco temporário com o corpus sintético de corpus.py (sem índice de termos nem
+agrupamento de duplicatas, para 1M de linhas caberem em poucos minutos) e mede:
+  - construcao: o snapshot inteiro a partir do banco, e um acréscimo de 1% de artigos novos
+  - abertura: abrir() com o snapshot em dia (verificação das marcas + memory map dos arquivos)
+  - temporal, tendencias e resumos: a consulta SQL de graficos.preparar_dados x o mesmo
+    agregado sobre o snapshot, com o pico de memória de cada caminho (alocações Python
+    pelo tracemalloc, mais o pool do Arrow)
+
+Uso:
+    python benchmarks/bench_colunar.py [--linhas 200000] [--repeticoes 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import banco  # noqa: E402
+import colunar  # noqa: E402
+from config import DATABASE_CONFIG, SNAPSHOT_CONFIG  # noqa: E402
+from corpus import gerar_linhas, popular_banco  # noqa: E402
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+
+def _medir(funcao, repeticoes):
+    """Menor tempo de `repeticoes` execuções e o pico de memória (MB) da última"""
+    import pyarrow as pa
+
+    tempos = []
+    for i in range(repeticoes):
+        ultima = i == repeticoes - 1
+        if ultima:
+            tracemalloc.start()
+            arrow_antes = pa.total_allocated_bytes()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+        if ultima:
+            pico_python = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            # Buffers do Arrow ainda vivos no resultado (os mapeados do disco não contam)
+            arrow = max(0, pa.total_allocated_bytes() - arrow_antes)
+        del resultado
+    return {'segundos': round(min(tempos), 4), 'memoria_mb': round((pico_python + arrow) / 2 ** 20, 2)}
+
+
+def _sql(conn, consulta, parametros=()):
+    def executar():
+        cursor = conn.cursor()
+        cursor.execute(consulta, parametros)
+        return cursor.fetchall()
+    return executar
+
+
+def medir_consultas(conn, repeticoes):
+    import pandas as pd
+
+    ano_atual = time.localtime().tm_year
+    snapshot = colunar.abrir(conn)
+    return {
+        'temporal': {
+            'sql': _medir(_sql(
+                conn,
+                f"SELECT ano_publicacao, COUNT(*) FROM {TABELA} WHERE ano_publicacao BETWEEN 1900 AND ? "
+                "AND (cluster_id IS NULL OR cluster_id = id) GROUP BY ano_publicacao ORDER BY ano_publicacao",
+                (ano_atual,)
+            ), repeticoes),
+            'snapshot': _medir(lambda: snapshot.publicacoes_por_ano(ano_atual), repeticoes),
+        },
+        'tendencias': {
+            'sql': _medir(_sql(
+                conn,
+                "SELECT r.ano_publicacao, t.termo, COUNT(DISTINCT COALESCE(r.cluster_id, r.id)) FROM artigo_topicos t "
+                f"JOIN {TABELA} r ON r.id = t.artigo_id WHERE r.ano_publicacao BETWEEN 1900 AND ? "
+                "GROUP BY r.ano_publicacao, t.termo",
+                (ano_atual,)
+            ), repeticoes),
+            'snapshot': _medir(lambda: snapshot.topicos_por_ano(ano_atual), repeticoes),
+        },
+        'resumos': {
+            'sql': _medir(lambda: pd.read_sql_query(
+                f"SELECT id, resumo FROM {TABELA} WHERE (cluster_id IS NULL OR cluster_id = id)", conn
+            )['resumo'], repeticoes),
+            'snapshot': _medir(lambda: snapshot.resumos(), repeticoes),
+        },
+    }
+
+
+def executar(linhas, repeticoes):
+    SNAPSHOT_CONFIG['ENABLED'] = True
+    SNAPSHOT_CONFIG['DIR'] = None
+    nome_original = DATABASE_CONFIG['DATABASE_NAME']
+    resultados = {'linhas': linhas}
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultados['insercao_s'] = round(
+                popular_banco(os.path.join(diretorio, 'colunar.db'), linhas, indexar=False), 2
+            )
+            with banco.conexao() as conn:
+                inicio = time.perf_counter()
+                colunar.atualizar(conn)
+                construcao = time.perf_counter() - inicio
+
+                execucao_id = banco.iniciar_execucao(conn, ['bench'], None, None)
+                escritor = banco.EscritorLote(conn, execucao_id, tamanho_lote=DATABASE_CONFIG['IMPORT_BATCH_SIZE'],
+                                              intervalo=float('inf'), indexar=False)
+                for linha in gerar_linhas(max(1, linhas // 100), semente=7):
+                    escritor.adicionar(linha, linha['termo'])
+                escritor.descarregar()
+                inicio = time.perf_counter()
+                colunar.atualizar(conn)
+                acrescimo = time.perf_counter() - inicio
+
+                tamanho = sum(os.path.getsize(os.path.join(raiz, nome))
+                              for raiz, _, nomes in os.walk(colunar.diretorio_snapshot()) for nome in nomes)
+                resultados['construcao'] = {
+                    'completa_s': round(construcao, 3),
+                    'acrescimo_1pct_s': round(acrescimo, 3),
+                    'tamanho_mb': round(tamanho / 2 ** 20, 1),
+                    'banco_mb': round(os.path.getsize(DATABASE_CONFIG['DATABASE_NAME']) / 2 ** 20, 1),
+                }
+                resultados['abertura'] = _medir(lambda: colunar.abrir(conn), repeticoes)
+                resultados.update(medir_consultas(conn, repeticoes))
+    finally:
+        banco.definir_banco(nome_original)
+    return resultados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=200000, help='tamanho do corpus sintético (1k a 1M)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(executar(args.linhas, args.repeticoes), indent=2, ensure_ascii=False))
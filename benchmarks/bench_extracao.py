@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark da extração de resultados: campo a campo x em lote
+
+Roda offline sobre as páginas salvas em benchmarks/fixtures. O navegador é simulado:
+cada chamada ao WebDriver (find_element, .text, get_attribute, execute_script...)
+custa uma latência fixa de RPC, como acontece com o chromedriver via HTTP.
+
+Uso:
+    python benchmarks/bench_extracao.py [--latencia-ms 2] [--repeticoes 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import extrator_scholar  # noqa: E402
+
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class _ElementoSimulado:
+    """Elemento do WebDriver simulado: toda operação custa uma chamada RPC"""
+
+    def __init__(self, driver, no):
+        self._driver = driver
+        self._no = no
+
+    @property
+    def text(self):
+        self._driver.rpc()
+        return self._no.texto()
+
+    def get_attribute(self, nome):
+        self._driver.rpc()
+        return self._no.atributos.get(nome)
+
+    def find_element(self, _by, seletor):
+        self._driver.rpc()
+        no = extrator_scholar._selecionar_primeiro(self._no, seletor)
+        if no is None:
+            raise LookupError(seletor)
+        return _ElementoSimulado(self._driver, no)
+
+
+class DriverSimulado:
+    """WebDriver simulado sobre o HTML de uma fixture"""
+
+    def __init__(self, html, latencia):
+        self.page_source = html
+        self.latencia = latencia
+        self.chamadas = 0
+        construtor = extrator_scholar._ConstrutorArvore()
+        construtor.feed(html)
+        self._raiz = construtor.raiz
+
+    def rpc(self):
+        self.chamadas += 1
+        time.sleep(self.latencia)
+
+    def find_elements(self, _by, seletor):
+        self.rpc()
+        return [_ElementoSimulado(self, no) for no in extrator_scholar._selecionar(self._raiz, seletor)]
+
+    def execute_script(self, _script, *_args):
+        # O navegador percorre o DOM do lado dele: uma única ida e volta
+        self.rpc()
+        return extrator_scholar.extrair_resultados_html(self.page_source)
+
+
+def _medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def executar(latencia_ms=2.0, repeticoes=5):
+    """Executa o benchmark e retorna um dicionário com os resultados"""
+    caminho = os.path.join(DIR_FIXTURES, 'scholar_pagina.html')
+    with open(caminho, encoding='utf-8') as f:
+        html = f.read()
+
+    latencia = latencia_ms / 1000
+    driver_campo = DriverSimulado(html, latencia)
+    driver_lote = DriverSimulado(html, latencia)
+
+    def por_campo():
+        return [extrator_scholar.processar_resultado(b)
+                for b in extrator_scholar.extrair_resultados_elementos(driver_campo)]
+
+    def em_lote():
+        return [extrator_scholar.processar_resultado(b)
+                for b in extrator_scholar.extrair_resultados_driver(driver_lote)]
+
+    def page_source():
+        return [extrator_scholar.processar_resultado(b)
+                for b in extrator_scholar.extrair_resultados_html(html)]
+
+    # As três formas precisam produzir as mesmas linhas
+    assert por_campo() == em_lote() == page_source()
+    resultados_pagina = len(page_source())
+    driver_campo.chamadas = driver_lote.chamadas = 0
+
+    tempo_campo = _medir(por_campo, repeticoes)
+    tempo_lote = _medir(em_lote, repeticoes)
+    tempo_parse = _medir(page_source, repeticoes)
+
+    return {
+        'fixture': os.path.basename(caminho),
+        'resultados_por_pagina': resultados_pagina,
+        'latencia_rpc_ms': latencia_ms,
+        'rpc_por_pagina': {
+            'por_campo': driver_campo.chamadas // repeticoes,
+            'em_lote': driver_lote.chamadas // repeticoes,
+        },
+        'segundos_por_pagina': {
+            'por_campo': tempo_campo,
+            'em_lote': tempo_lote,
+            'parse_page_source': tempo_parse,
+        },
+        'ganho_em_lote': tempo_campo / tempo_lote if tempo_lote else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latencia-ms', type=float, default=2.0, help='latência simulada de cada chamada ao WebDriver')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(executar(args.latencia_ms, args.repeticoes), indent=2, ensure_ascii=False))
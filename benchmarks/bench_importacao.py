@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark da inicialização: tempo de importação e memória de `import app`
+
+Roda `python -X importtime -c "import app"` em um processo novo (várias vezes, fica a
+mediana) e resume o relatório: tempo total, memória máxima (RSS) e os módulos mais
+caros. Também verifica que as bibliotecas pesadas de análise e scraping não são
+carregadas na importação; com --limite-ms, o script sai com erro se o tempo passar do
+limite, para uso como verificação de regressão.
+
+Uso:
+    python benchmarks/bench_importacao.py [--repeticoes 5] [--top 15] [--limite-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Não devem aparecer em `import app`: são carregados na primeira rota que os usa
+PESADOS = ('pandas', 'numpy', 'matplotlib', 'seaborn', 'wordcloud', 'nltk', 'sklearn', 'selenium', 'scipy',
+           'pyarrow')
+
+# import time: self [us] | cumulative | imported package
+_REGEX_LINHA = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)')
+
+_CODIGO = (
+    "import resource, sys, time\n"
+    "inicio = time.perf_counter()\n"
+    "import app\n"
+    "duracao = time.perf_counter() - inicio\n"
+    "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "if sys.platform == 'darwin':\n"
+    "    rss //= 1024\n"
+    "print(duracao, rss, ' '.join(sorted(sys.modules)))\n"
+)
+
+
+def medir_uma_vez():
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CODIGO],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    duracao, rss_kb, modulos = processo.stdout.strip().splitlines()[-1].split(' ', 2)
+
+    # Tempo acumulado de cada módulo (inclui os que ele importa)
+    cumulativos = {}
+    for linha in processo.stderr.splitlines():
+        correspondencia = _REGEX_LINHA.match(linha)
+        if correspondencia:
+            _, cumulativo, modulo = correspondencia.groups()
+            cumulativos[modulo] = max(cumulativos.get(modulo, 0), int(cumulativo))
+    return float(duracao), int(rss_kb), set(modulos.split()), cumulativos
+
+
+def executar(repeticoes, top):
+    medicoes = [medir_uma_vez() for _ in range(repeticoes)]
+    duracoes = [m[0] for m in medicoes]
+    _, rss_kb, modulos, cumulativos = medicoes[len(medicoes) // 2]
+    mais_caros = sorted(cumulativos.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'import_app_ms': round(statistics.median(duracoes) * 1000, 1),
+        'import_app_ms_min': round(min(duracoes) * 1000, 1),
+        'rss_mb': round(rss_kb / 1024, 1),
+        'modulos_carregados': len(modulos),
+        'pesados_carregados': sorted(p for p in PESADOS if p in modulos),
+        'mais_caros_ms': {modulo: round(us / 1000, 1) for modulo, us in mais_caros},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tempo de importação de app.py')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--limite-ms', type=float, help='falha se a mediana passar deste tempo')
+    args = parser.parse_args()
+
+    resultado = executar(args.repeticoes, args.top)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+    if resultado['pesados_carregados']:
+        print(f"❌ Bibliotecas pesadas carregadas na importação: {', '.join(resultado['pesados_carregados'])}")
+        sys.exit(1)
+    if args.limite_ms is not None and resultado['import_app_ms'] > args.limite_ms:
+        print(f"❌ Importação levou {resultado['import_app_ms']} ms (limite {args.limite_ms} ms)")
+        sys.exit(1)
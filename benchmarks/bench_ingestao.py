@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark da ingestão: linha a linha x EscritorLote x importação de arquivo
+
+Gera o corpus sintético de corpus.py em um diretório temporário e grava em bancos novos:
+  - linha_a_linha: banco.salvar_artigo + commit a cada 10 linhas (o antigo caminho do scraper)
+  - lote: banco.EscritorLote com o tamanho de lote da importação (linhas já em memória)
+  - importacao_csv / importacao_jsonl: importacao.importar_arquivo (leitura + gravação)
+O índice de termos fica fora da medição (indexar=False) nos caminhos em lote; o caminho
+linha a linha indexa cada artigo, como o scraper fazia.
+
+Uso:
+    python benchmarks/bench_ingestao.py [--linhas 200000] [--linhas-lento 5000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import banco  # noqa: E402
+import importacao  # noqa: E402
+from config import DATABASE_CONFIG, SEARCH_CONFIG  # noqa: E402
+from corpus import gerar_linhas, salvar_arquivo  # noqa: E402
+
+
+def _novo_banco(diretorio, nome):
+    """Aponta o banco para um arquivo novo no diretório temporário"""
+    return banco.definir_banco(os.path.join(diretorio, f"{nome}.db"))
+
+
+def medir_linha_a_linha(diretorio, quantidade):
+    _novo_banco(diretorio, 'linha_a_linha')
+    with banco.conexao() as conn:
+        execucao_id = banco.iniciar_execucao(conn, ['bench'], None, None)
+        linhas = list(gerar_linhas(quantidade))
+        inicio = time.perf_counter()
+        for i, linha in enumerate(linhas):
+            banco.salvar_artigo(conn, linha, linha['termo'], execucao_id)
+            if i % 10 == 9:
+                conn.commit()
+        conn.commit()
+        return time.perf_counter() - inicio
+
+
+def medir_lote(diretorio, quantidade):
+    _novo_banco(diretorio, 'lote')
+    with banco.conexao() as conn:
+        execucao_id = banco.iniciar_execucao(conn, ['bench'], None, None)
+        escritor = banco.EscritorLote(
+            conn, execucao_id, tamanho_lote=DATABASE_CONFIG['IMPORT_BATCH_SIZE'], intervalo=float('inf'),
+            indexar=False
+        )
+        linhas = list(gerar_linhas(quantidade))
+        inicio = time.perf_counter()
+        for linha in linhas:
+            escritor.adicionar(linha, linha['termo'])
+        escritor.descarregar()
+        return time.perf_counter() - inicio
+
+
+def medir_importacao(diretorio, quantidade, formato):
+    caminho = os.path.join(diretorio, f"corpus.{formato}")
+    salvar_arquivo(caminho, quantidade)
+
+    _novo_banco(diretorio, f"importacao_{formato}")
+    inicio = time.perf_counter()
+    importacao.importar_arquivo(caminho, indexar=False)
+    return time.perf_counter() - inicio
+
+
+def executar(linhas, linhas_lento):
+    SEARCH_CONFIG['INCREMENTAL'] = True
+    nome_original = DATABASE_CONFIG['DATABASE_NAME']
+    resultados = {}
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            for nome, quantidade, medir in (
+                ('linha_a_linha', linhas_lento, lambda: medir_linha_a_linha(diretorio, linhas_lento)),
+                ('lote', linhas, lambda: medir_lote(diretorio, linhas)),
+                ('importacao_csv', linhas, lambda: medir_importacao(diretorio, linhas, 'csv')),
+                ('importacao_jsonl', linhas, lambda: medir_importacao(diretorio, linhas, 'jsonl')),
+            ):
+                segundos = medir()
+                resultados[nome] = {
+                    'linhas': quantidade,
+                    'segundos': round(segundos, 3),
+                    'linhas_por_segundo': round(quantidade / segundos),
+                }
+    finally:
+        # Fecha as conexões com os bancos temporários
+        banco.definir_banco(nome_original)
+    return resultados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark da ingestão em lote')
+    parser.add_argument('--linhas', type=int, default=200000)
+    parser.add_argument('--linhas-lento', type=int, default=5000, help='linhas do caminho linha a linha')
+    args = parser.parse_args()
+    print(json.dumps(executar(args.linhas, args.linhas_lento), indent=2, ensure_ascii=False))
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline inteiro: tempo de cada etapa sobre o corpus sintético, em JSON
+
+Roda offline, em um banco temporário populado por corpus.py, e mede:
+  - importacao_app: `import app` em um processo novo (bench_importacao)
+  - parse_pagina: extração de uma página do Scholar salva em benchmarks/fixtures
+  - geracao_corpus e insercao_banco: o corpus gravado com EscritorLote, com índice de
+    termos e agrupamento de duplicatas, como na coleta
+  - dados_tabela: /dados_tabela pelo cliente de teste do Flask (primeira página, página
+    profunda pelo cursor, filtro por tópico e busca textual)
+  - preprocessamento e sentimento: tokenização e pontuação de todos os resumos
+  - graficos: agregação (preparar_dados), cada gráfico renderizado no próprio processo e
+    gerar_graficos completo (pool de processos, cache vazio)
+
+O resultado tem os detalhes de cada etapa e um resumo plano em 'tempos_s', que é o que
+--comparar usa: com o JSON de outro commit, mostra a razão entre os tempos e sai com
+erro se alguma etapa ficou mais lenta que --tolerancia.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--linhas 20000] [--repeticoes 3] [--etapas parse_pagina,graficos]
+                                        [--saida resultado.json] [--comparar anterior.json] [--tolerancia 1.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+
+import corpus  # noqa: E402
+from config import DATABASE_CONFIG, DEFAULT_TOPICS  # noqa: E402
+
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+ETAPAS = ('importacao_app', 'parse_pagina', 'insercao_banco', 'dados_tabela', 'preprocessamento', 'sentimento',
+          'graficos')
+
+# Diferenças abaixo disso são ruído de medição e não contam como regressão
+PISO_COMPARACAO_S = 0.005
+
+
+def _medir(funcao, repeticoes):
+    """Menor tempo de `repeticoes` execuções e o resultado da última"""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir_importacao_app(repeticoes):
+    import bench_importacao
+
+    resultado = bench_importacao.executar(repeticoes, top=5)
+    return {
+        'segundos': resultado['import_app_ms'] / 1000,
+        'rss_mb': resultado['rss_mb'],
+        'pesados_carregados': resultado['pesados_carregados'],
+    }
+
+
+def medir_parse_pagina(repeticoes):
+    import extrator_scholar
+
+    with open(os.path.join(DIR_FIXTURES, 'scholar_pagina.html'), encoding='utf-8') as arquivo:
+        html = arquivo.read()
+
+    def extrair():
+        return [extrator_scholar.processar_resultado(b) for b in extrator_scholar.extrair_resultados_html(html)]
+
+    # Página isolada é rápida demais para uma única medição: 20 por repetição
+    segundos, linhas = _medir(lambda: [extrair() for _ in range(20)], repeticoes)
+    return {'segundos': segundos / 20, 'resultados_por_pagina': len(linhas[0])}
+
+
+def medir_insercao_banco(caminho, linhas):
+    inicio = time.perf_counter()
+    for _ in corpus.gerar_linhas(linhas):
+        pass
+    geracao = time.perf_counter() - inicio
+
+    insercao = corpus.popular_banco(caminho, linhas) - geracao
+    return {
+        'segundos': insercao,
+        'linhas': linhas,
+        'linhas_por_segundo': round(linhas / insercao) if insercao > 0 else None,
+        'geracao_corpus_s': geracao,
+        'tamanho_banco_mb': round(os.path.getsize(caminho) / 1024 / 1024, 1),
+    }
+
+
+def medir_dados_tabela(repeticoes):
+    import app
+
+    cliente = app.app.test_client()
+
+    def pagina(consulta):
+        resposta = cliente.get(f"/dados_tabela?{consulta}")
+        assert resposta.status_code == 200, resposta.get_data(as_text=True)
+        resposta.get_data()
+        return resposta
+
+    # Cursor da 50ª página, para medir uma página profunda
+    cursor = ''
+    for _ in range(49):
+        cursor = pagina(f"limite=100&cursor={cursor}").headers.get('X-Proximo-Cursor') or ''
+
+    consultas = {
+        'primeira_pagina': 'limite=100',
+        'pagina_50': f"limite=100&cursor={cursor}",
+        'filtro_topico': f"limite=100&topico={DEFAULT_TOPICS[3]}",
+        'busca_textual': 'limite=100&q=entanglement',
+    }
+    tempos = {nome: _medir(lambda c=consulta: pagina(c), repeticoes)[0] for nome, consulta in consultas.items()}
+    return {'segundos': sum(tempos.values()), 'consultas_s': tempos}
+
+
+def _resumos():
+    import pandas as pd
+
+    import banco
+
+    with banco.conexao() as conn:
+        return pd.read_sql_query(f"SELECT id, resumo FROM {DATABASE_CONFIG['TABLE_NAME']}", conn)['resumo']
+
+
+def medir_preprocessamento(repeticoes):
+    from preprocessamento import carregar_stopwords, tokenizar_textos
+
+    resumos = _resumos()
+    carregar_stopwords()  # Carregadas uma vez por processo, fora da medição
+    segundos, frequencias = _medir(lambda: tokenizar_textos(resumos).value_counts(), repeticoes)
+    return {'segundos': segundos, 'documentos': len(resumos), 'termos_distintos': len(frequencias)}
+
+
+def medir_sentimento(repeticoes):
+    from sentimento import obter_analisador
+
+    resumos = _resumos()
+    analisador = obter_analisador()
+    segundos, pontuacoes = _medir(lambda: analisador.pontuar(resumos), repeticoes)
+    return {
+        'segundos': segundos,
+        'documentos': len(resumos),
+        'distribuicao': {rotulo: int(total) for rotulo, total in pontuacoes['sentimento'].value_counts().items()},
+    }
+
+
+def medir_graficos(repeticoes, diretorio):
+    import app
+    import banco
+    import cache_graficos
+    import graficos
+
+    with banco.conexao() as conn:
+        preparar, dados = _medir(lambda: graficos.preparar_dados(conn), repeticoes)
+
+    inicio = time.perf_counter()
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure  # noqa: F401
+    importacao = time.perf_counter() - inicio
+
+    por_grafico = {}
+    for nome in graficos.RENDERIZADORES:
+        caminho = os.path.join(diretorio, f"{nome}.{graficos.PLOT_CONFIG['SAVE_FORMAT']}")
+        segundos, gerado = _medir(lambda n=nome, c=caminho: graficos.renderizar(n, dados.get(n), c), repeticoes)
+        # None: sem dados para o gráfico (temas precisa de um modelo ajustado)
+        por_grafico[nome] = segundos if gerado else None
+
+    # gerar_graficos de ponta a ponta, sem cache e em um diretório de saída temporário
+    app.PLOTS_DIR = os.path.join(diretorio, 'plots')
+    cache_graficos.limpar()
+    inicio = time.perf_counter()
+    gerados = app.gerar_graficos()
+    completo = time.perf_counter() - inicio
+    return {
+        'segundos': completo,
+        'gerados': sorted(gerados or ()),
+        'preparar_dados_s': preparar,
+        'importacao_matplotlib_s': importacao,
+        'por_grafico_s': por_grafico,
+    }
+
+
+def _tempos_planos(etapas):
+    """Resumo plano {etapa[.detalhe]: segundos} usado na comparação entre commits"""
+    tempos = {}
+    for etapa, detalhes in etapas.items():
+        for chave, valor in detalhes.items():
+            if chave == 'segundos':
+                tempos[etapa] = valor
+            elif chave.endswith('_s') and isinstance(valor, dict):
+                tempos.update({f"{etapa}.{nome}": segundos for nome, segundos in valor.items()})
+            elif chave.endswith('_s'):
+                tempos[f"{etapa}.{chave}"] = valor
+    return {chave: round(valor, 4) for chave, valor in tempos.items() if valor is not None}
+
+
+def executar(linhas=20000, repeticoes=3, etapas=ETAPAS):
+    """Executa as etapas pedidas e retorna um dicionário com os resultados"""
+    import banco
+
+    nome_original = DATABASE_CONFIG['DATABASE_NAME']
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix='bench_pipeline_') as diretorio:
+        try:
+            if 'importacao_app' in etapas:
+                resultados['importacao_app'] = medir_importacao_app(repeticoes)
+            if 'parse_pagina' in etapas:
+                resultados['parse_pagina'] = medir_parse_pagina(repeticoes)
+
+            # As demais etapas leem o banco sintético
+            caminho = os.path.join(diretorio, 'corpus.db')
+            if 'insercao_banco' in etapas:
+                resultados['insercao_banco'] = medir_insercao_banco(caminho, linhas)
+            elif set(etapas) & {'dados_tabela', 'preprocessamento', 'sentimento', 'graficos'}:
+                corpus.popular_banco(caminho, linhas)
+
+            if 'dados_tabela' in etapas:
+                resultados['dados_tabela'] = medir_dados_tabela(repeticoes)
+            if 'preprocessamento' in etapas:
+                resultados['preprocessamento'] = medir_preprocessamento(repeticoes)
+            if 'sentimento' in etapas:
+                resultados['sentimento'] = medir_sentimento(repeticoes)
+            if 'graficos' in etapas:
+                resultados['graficos'] = medir_graficos(repeticoes, diretorio)
+        finally:
+            # Fecha as conexões com o banco temporário antes de apagá-lo
+            banco.definir_banco(nome_original)
+
+    return {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parametros': {'linhas': linhas, 'repeticoes': repeticoes, 'semente': 42},
+        'tempos_s': _tempos_planos(resultados),
+        'etapas': resultados,
+    }
+
+
+def comparar(anterior, atual, tolerancia):
+    """Razão atual/anterior de cada tempo presente nos dois resultados e as regressões"""
+    comparacao = {}
+    regressoes = []
+    for chave, depois in atual['tempos_s'].items():
+        antes = anterior.get('tempos_s', {}).get(chave)
+        if not antes:
+            continue
+        razao = round(depois / antes, 2)
+        comparacao[chave] = {'antes': antes, 'depois': depois, 'razao': razao}
+        if razao > tolerancia and depois - antes > PISO_COMPARACAO_S:
+            regressoes.append(chave)
+    return {'base': anterior.get('commit'), 'tolerancia': tolerancia, 'tempos': comparacao, 'regressoes': regressoes}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=20000, help='tamanho do corpus sintético (1k a 1M)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--etapas', help=f"etapas separadas por vírgula (padrão: todas: {','.join(ETAPAS)})")
+    parser.add_argument('--saida', help='grava o JSON neste arquivo')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior (outro commit)')
+    parser.add_argument('--tolerancia', type=float, default=1.25, help='razão máxima antes de acusar regressão')
+    args = parser.parse_args()
+
+    etapas = tuple(e.strip() for e in args.etapas.split(',')) if args.etapas else ETAPAS
+    desconhecidas = set(etapas) - set(ETAPAS)
+    if desconhecidas:
+        parser.error(f"etapas desconhecidas: {', '.join(sorted(desconhecidas))}")
+
+    resultado = executar(args.linhas, args.repeticoes, etapas)
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            resultado['comparacao'] = comparar(json.load(arquivo), resultado, args.tolerancia)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    print(texto)
+
+    if resultado.get('comparacao', {}).get('regressoes'):
+        print(f"❌ Etapas mais lentas que a base: {', '.join(resultado['comparacao']['regressoes'])}")
+        sys.exit(1)
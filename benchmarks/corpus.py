@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Corpus sintético de resultados do Scholar para os benchmarks
+
+Gera linhas no formato de resultados_detalhados_CQ (termo, titulo, ano_publicacao,
+autores, fonte_publicacao, resumo, url_artigo), de forma determinística pela semente:
+  - títulos e resumos em português (~40%) e inglês, montados a partir de um vocabulário
+    por tópico, com termos do léxico de sentimento aparecendo de vez em quando;
+  - anos concentrados nos mais recentes (crescimento de ~25% ao ano desde 2000) e ~2%
+    das linhas sem ano;
+  - tópicos (DEFAULT_TOPICS) com frequência decrescente (Zipf), como nas buscas reais;
+  - ~2% de quase-duplicatas (mesmo artigo como preprint no arXiv, outra URL).
+O gerador é um iterador: 1 milhão de linhas não precisam caber na memória.
+
+Uso:
+    python benchmarks/corpus.py --linhas 100000 --saida corpus.jsonl   (ou .csv, ou .db)
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import DATABASE_CONFIG, DEFAULT_TOPICS, EXPORT_CONFIG, TEXT_ANALYSIS_CONFIG  # noqa: E402
+
+# Intervalo fixo (e não até o ano atual) para o corpus de uma semente não mudar com o tempo
+ANO_INICIAL = 2000
+ANO_FINAL = 2025
+
+CAMPOS = ('termo', 'titulo', 'ano_publicacao', 'autores', 'fonte_publicacao', 'resumo', 'url_artigo')
+
+# Vocabulário de cada tópico (na ordem de DEFAULT_TOPICS): (português, inglês)
+_VOCABULARIO = (
+    (('criptografia', 'chaves', 'algoritmo de Shor', 'RSA', 'distribuição quântica de chaves', 'segurança'),
+     ('cryptography', 'keys', "Shor's algorithm", 'RSA', 'quantum key distribution', 'security')),
+    (('portfólio', 'otimização', 'risco financeiro', 'precificação de opções', 'recozimento quântico', 'QAOA'),
+     ('portfolio', 'optimization', 'financial risk', 'option pricing', 'quantum annealing', 'QAOA')),
+    (('aprendizado de máquina', 'redes neurais', 'kernel quântico', 'classificação', 'circuitos variacionais'),
+     ('machine learning', 'neural networks', 'quantum kernel', 'classification', 'variational circuits')),
+    (('descoberta de fármacos', 'proteínas', 'moléculas', 'ligantes', 'simulação molecular'),
+     ('drug discovery', 'proteins', 'molecules', 'ligands', 'molecular simulation')),
+    (('estrutura eletrônica', 'VQE', 'hamiltoniano', 'energia do estado fundamental', 'catalisadores'),
+     ('electronic structure', 'VQE', 'hamiltonian', 'ground state energy', 'catalysts')),
+    (('roteiro', 'escalabilidade', 'tolerância a falhas', 'vantagem quântica', 'hardware'),
+     ('roadmap', 'scalability', 'fault tolerance', 'quantum advantage', 'hardware')),
+    (('reticulados', 'assinaturas digitais', 'padronização NIST', 'migração criptográfica', 'KEM'),
+     ('lattices', 'digital signatures', 'NIST standardization', 'cryptographic migration', 'KEM')),
+    (('mão de obra', 'políticas públicas', 'investimentos', 'ecossistema', 'educação'),
+     ('workforce', 'public policy', 'investment', 'ecosystem', 'education')),
+)
+
+_COMUNS = (
+    ('qubits', 'portas quânticas', 'ruído', 'emaranhamento', 'correção de erros', 'circuitos', 'simulação'),
+    ('qubits', 'quantum gates', 'noise', 'entanglement', 'error correction', 'circuits', 'simulation'),
+)
+
+_TITULOS = (
+    ('{a} com {b}: uma abordagem baseada em {c}', 'Uso de {a} para {b} em dispositivos NISQ',
+     'Análise de {a} e {b}', 'Uma revisão sobre {a} e {c}', '{a} aplicada a {b}'),
+    ('{a} with {b}: a {c}-based approach', 'Leveraging {a} for {b} on NISQ devices',
+     'An analysis of {a} and {b}', 'A survey on {a} and {c}', '{a} applied to {b}'),
+)
+
+_FRASES = (
+    ('Este trabalho investiga {a} no contexto de {b}.', 'Propomos um método que combina {a} e {c}.',
+     'Os experimentos com {d} indicam {s} em relação aos métodos clássicos.',
+     'Discutimos {s} associados a {b} e {d}.', 'Avaliamos o impacto de {c} sobre {a}.',
+     'A abordagem apresenta {s} para aplicações de {b}.'),
+    ('This paper investigates {a} in the context of {b}.', 'We propose a method combining {a} and {c}.',
+     'Experiments with {d} show {s} over classical baselines.',
+     'We discuss {s} related to {b} and {d}.', 'We evaluate the impact of {c} on {a}.',
+     'The approach shows {s} for {b} applications.'),
+)
+
+_NEUTROS = (('resultados preliminares', 'desempenho comparável', 'comportamento esperado'),
+            ('preliminary results', 'comparable performance', 'expected behavior'))
+
+_SOBRENOMES = ('Silva', 'Souza', 'Oliveira', 'Santos', 'Pereira', 'Lima', 'Costa', 'Smith', 'Chen', 'Wang',
+               'Müller', 'Tanaka', 'García', 'Kumar', 'Nguyen', 'Rossi', 'Johnson', 'Ivanov', 'Kim', 'Dubois')
+_FONTES = ('Physical Review A', 'Quantum', 'npj Quantum Information', 'Nature', 'IEEE Transactions on Quantum '
+           'Engineering', 'Revista Brasileira de Ensino de Física', 'arXiv preprint', 'Quantum Information '
+           'Processing', 'ACM Computing Surveys', 'Anais do SBSeg')
+_HOSTS = ('journals.aps.org', 'quantum-journal.org', 'www.nature.com', 'ieeexplore.ieee.org', 'link.springer.com',
+          'dl.acm.org', 'www.scielo.br', 'sol.sbc.org.br')
+
+
+def _sentimentos():
+    return (tuple(TEXT_ANALYSIS_CONFIG['POSITIVE_WORDS']), tuple(TEXT_ANALYSIS_CONFIG['NEGATIVE_WORDS']))
+
+
+def gerar_linhas(quantidade, semente=42, proporcao_pt=0.4, proporcao_duplicatas=0.02):
+    """Gera `quantidade` linhas sintéticas (dicts com as colunas de CAMPOS)"""
+    aleatorio = random.Random(semente)
+    escolher = aleatorio.choice
+    sortear = aleatorio.random
+
+    anos = list(range(ANO_INICIAL, ANO_FINAL + 1))
+    pesos_anos = []
+    acumulado = 0.0
+    for ano in anos:
+        acumulado += 1.25 ** (ano - ANO_INICIAL)
+        pesos_anos.append(acumulado)
+    pesos_topicos = []
+    acumulado = 0.0
+    for posicao in range(len(DEFAULT_TOPICS)):
+        acumulado += 1 / (posicao + 1)
+        pesos_topicos.append(acumulado)
+    indices_topicos = range(len(DEFAULT_TOPICS))
+    positivas, negativas = _sentimentos()
+    anterior = None
+
+    for i in range(quantidade):
+        # Quase-duplicata: o artigo anterior de novo, como preprint
+        if anterior is not None and sortear() < proporcao_duplicatas:
+            linha = dict(anterior, fonte_publicacao='arXiv preprint', url_artigo=f"https://arxiv.org/abs/bench.{i:07d}")
+            anterior = None
+            yield linha
+            continue
+
+        topico = aleatorio.choices(indices_topicos, cum_weights=pesos_topicos)[0]
+        idioma = 0 if sortear() < proporcao_pt else 1
+        especificos = _VOCABULARIO[topico][idioma]
+        comuns = _COMUNS[idioma]
+
+        titulo = escolher(_TITULOS[idioma]).format(a=escolher(especificos), b=escolher(comuns), c=escolher(especificos))
+        titulo = titulo[0].upper() + titulo[1:]
+        frases = []
+        for _ in range(aleatorio.randint(3, 6)):
+            sorteio = sortear()
+            if sorteio < 0.3:
+                sentimento = escolher(positivas)
+            elif sorteio < 0.5:
+                sentimento = escolher(negativas)
+            else:
+                sentimento = escolher(_NEUTROS[idioma])
+            frases.append(escolher(_FRASES[idioma]).format(
+                a=escolher(especificos), b=escolher(especificos), c=escolher(comuns), d=escolher(comuns), s=sentimento
+            ))
+
+        ano = None if sortear() < 0.02 else aleatorio.choices(anos, cum_weights=pesos_anos)[0]
+        autores = ', '.join(f"{chr(65 + aleatorio.randrange(26))} {escolher(_SOBRENOMES)}"
+                            for _ in range(aleatorio.randint(1, 5)))
+        linha = {
+            'termo': DEFAULT_TOPICS[topico],
+            'titulo': f"{titulo} ({i})",
+            'ano_publicacao': ano,
+            'autores': autores,
+            'fonte_publicacao': escolher(_FONTES),
+            'resumo': ' '.join(frases),
+            'url_artigo': f"https://{escolher(_HOSTS)}/artigo/{ano or 0}/{i:07d}",
+        }
+        anterior = linha
+        yield linha
+
+
+def popular_banco(caminho, quantidade, semente=42, indexar=True):
+    """Grava o corpus em um banco novo (como uma execução de busca) e retorna os segundos gastos
+
+    Com indexar=True os artigos passam pelo índice de termos e pelo agrupamento de
+    duplicatas, como na coleta; o banco passa a ser o do processo (banco.definir_banco).
+    """
+    import banco
+
+    banco.definir_banco(caminho)
+    with banco.conexao() as conn:
+        execucao_id = banco.iniciar_execucao(conn, list(DEFAULT_TOPICS), ANO_INICIAL, ANO_FINAL)
+        escritor = banco.EscritorLote(conn, execucao_id, tamanho_lote=DATABASE_CONFIG['IMPORT_BATCH_SIZE'],
+                                      intervalo=float('inf'), indexar=indexar)
+        inicio = time.perf_counter()
+        for linha in gerar_linhas(quantidade, semente):
+            escritor.adicionar(linha, linha['termo'])
+        escritor.descarregar()
+        segundos = time.perf_counter() - inicio
+        banco.finalizar_execucao(conn, execucao_id, 'concluido')
+    return segundos
+
+
+def salvar_arquivo(caminho, quantidade, semente=42):
+    """Grava o corpus em CSV ou JSONL (formato pela extensão), para importacao.importar_arquivo"""
+    if caminho.endswith('.csv'):
+        with open(caminho, 'w', encoding=EXPORT_CONFIG['CSV_ENCODING'], newline='') as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS, delimiter=EXPORT_CONFIG['CSV_SEPARATOR'])
+            escritor.writeheader()
+            escritor.writerows(gerar_linhas(quantidade, semente))
+    else:
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            for linha in gerar_linhas(quantidade, semente):
+                arquivo.write(json.dumps(linha, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=100000)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', required=True, help='arquivo .jsonl, .csv ou .db (banco SQLite novo)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.saida.endswith('.db'):
+        if os.path.exists(args.saida):
+            sys.exit(f"❌ {args.saida} já existe")
+        popular_banco(args.saida, args.linhas, args.semente)
+    else:
+        salvar_arquivo(args.saida, args.linhas, args.semente)
+    print(f"✅ {args.linhas} linhas em {args.saida} ({time.perf_counter() - inicio:.1f}s)")
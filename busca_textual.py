@@ -0,0 +1,203 @@
+"""
+Busca textual no corpus coletado (SQLite FTS5)
+
+resultados_fts é uma tabela FTS5 de conteúdo externo sobre titulo, resumo, autores e
+fonte_publicacao de resultados_detalhados_CQ: o texto não é duplicado, só o índice
+invertido. Gatilhos mantêm o índice em dia com qualquer caminho de ingestão (EscritorLote,
+salvar_artigo, importação, migrações e limpeza).
+
+A consulta do usuário é convertida para a sintaxe do FTS5 em montar_consulta (termos
+entre aspas, frases e prefixos com *), de modo que pontuação digitada não vira operador.
+O ranking é BM25 com pesos por coluna (FTS_CONFIG['WEIGHTS']), via ORDER BY rank, limitado
+aos MAX_RANKED casamentos mais recentes para termos comuns.
+"""
+
+import re
+import sqlite3
+
+from config import DATABASE_CONFIG, FTS_CONFIG
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+TABELA_FTS = 'resultados_fts'
+COLUNAS_FTS = ('titulo', 'resumo', 'autores', 'fonte_publicacao')
+
+# "frase entre aspas" ou termo solto (com * final opcional)
+_REGEX_CONSULTA = re.compile(r'"([^"]*)"|(\S+)')
+_REGEX_PALAVRA = re.compile(r'\w', re.UNICODE)
+
+
+def criar_tabelas(cursor):
+    """Cria o índice FTS5 e os gatilhos (chamado por banco.criar_esquema)
+
+    Em um banco que já tinha artigos, o índice é montado por montar_pendente.
+    """
+    colunas = ', '.join(COLUNAS_FTS)
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+            {colunas},
+            content='{TABELA}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    novos = ', '.join(f"new.{coluna}" for coluna in COLUNAS_FTS)
+    antigos = ', '.join(f"old.{coluna}" for coluna in COLUNAS_FTS)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON {TABELA} BEGIN
+            INSERT INTO {TABELA_FTS} (rowid, {colunas}) VALUES (new.id, {novos});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON {TABELA} BEGIN
+            INSERT INTO {TABELA_FTS} ({TABELA_FTS}, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+        END
+    ''')
+    # Só as colunas indexadas: atualizações de indexado, assinatura e cluster_id não mexem no índice
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF {colunas} ON {TABELA} BEGIN
+            INSERT INTO {TABELA_FTS} ({TABELA_FTS}, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+            INSERT INTO {TABELA_FTS} (rowid, {colunas}) VALUES (new.id, {novos});
+        END
+    ''')
+    pesos = ', '.join(str(float(peso)) for peso in FTS_CONFIG['WEIGHTS'])
+    cursor.execute(f"INSERT INTO {TABELA_FTS} ({TABELA_FTS}, rank) VALUES ('rank', 'bm25({pesos})')")
+
+
+def montar_pendente(cursor):
+    """Monta o índice a partir dos artigos se ele não cobre a tabela (chamado por
+    banco.migrar_pendentes): bancos de antes da busca textual"""
+    cursor.execute(f"SELECT COUNT(*) FROM {TABELA}")
+    total = cursor.fetchone()[0]
+    cursor.execute(f"SELECT COUNT(*) FROM {TABELA_FTS}_docsize")
+    if cursor.fetchone()[0] != total:
+        print(f"🔎 Montando o índice de busca textual para {total} artigos...")
+        cursor.execute(f"INSERT INTO {TABELA_FTS} ({TABELA_FTS}) VALUES ('rebuild')")
+
+
+def montar_consulta(texto, prefixo=False):
+    """Converte o texto digitado em uma expressão MATCH do FTS5 (termos unidos por AND)
+
+    "frase exata" vira uma frase, termo* busca por prefixo e, com prefixo=True, o último
+    termo também (busca enquanto se digita). Retorna None se não sobra nenhum termo.
+    """
+    partes = []
+    for frase, palavra in _REGEX_CONSULTA.findall(texto or ''):
+        termo = frase if frase else palavra.rstrip('*')
+        if not _REGEX_PALAVRA.search(termo):
+            continue
+        com_prefixo = bool(palavra) and palavra.endswith('*')
+        termo = termo.replace('"', '')
+        partes.append([f'"{termo}"', com_prefixo])
+    if not partes:
+        return None
+    if prefixo:
+        partes[-1][1] = True
+    return ' '.join(f"{termo}*" if com_prefixo else termo for termo, com_prefixo in partes)
+
+
+def buscar(conn, texto, prefixo=False, topico=None, execucao_id=None, ano_min=None, ano_max=None,
+           limite=None, cursor_pagina=None, duplicatas=False):
+    """Artigos que casam com a consulta, do mais para o menos relevante (BM25)
+
+    Retorna (resultados, cursor da próxima página ou None, truncado). Cada resultado traz
+    o título com os termos marcados e um trecho do resumo em volta deles. Sem
+    duplicatas=True, só o artigo canônico de cada grupo de quase-duplicatas aparece.
+
+    Com mais de MAX_RANKED casamentos, só os MAX_RANKED mais recentes são ordenados por
+    relevância e truncado é True: casamentos mais antigos não aparecem em página nenhuma.
+    O corte é achado na primeira página e segue no cursor ("deslocamento:corte"), para
+    as páginas seguintes ranquearem o mesmo conjunto sem procurá-lo de novo. Consulta
+    vazia ou inválida e cursor inválido levantam ValueError.
+    """
+    consulta = montar_consulta(texto, prefixo)
+    if consulta is None:
+        raise ValueError("Consulta vazia")
+    limite = limite or FTS_CONFIG['PAGE_SIZE']
+    deslocamento, corte = 0, None
+    if cursor_pagina:
+        try:
+            deslocamento, corte = (int(parte) for parte in str(cursor_pagina).split(':'))
+        except ValueError:
+            raise ValueError(f"Cursor inválido: {cursor_pagina}")
+        if deslocamento < 0 or corte < 0:
+            raise ValueError(f"Cursor inválido: {cursor_pagina}")
+
+    # Sem duplicatas, os artigos do tópico / execução são mapeados para o canônico do grupo
+    artigo = "a.artigo_id" if duplicatas else "COALESCE(x.cluster_id, x.id)"
+    subconsulta = (f"r.id IN (SELECT {artigo} FROM artigo_topicos a "
+                   f"JOIN {TABELA} x ON x.id = a.artigo_id WHERE a.{{}} = ?)")
+    condicoes, parametros = [f"{TABELA_FTS} MATCH ?"], [consulta]
+    if topico:
+        condicoes.append(subconsulta.format('termo'))
+        parametros.append(topico)
+    if execucao_id is not None:
+        condicoes.append(subconsulta.format('execucao_id'))
+        parametros.append(execucao_id)
+    if ano_min is not None:
+        condicoes.append("r.ano_publicacao >= ?")
+        parametros.append(ano_min)
+    if ano_max is not None:
+        condicoes.append("r.ano_publicacao <= ?")
+        parametros.append(ano_max)
+    if not duplicatas:
+        condicoes.append("(r.cluster_id IS NULL OR r.cluster_id = r.id)")
+
+    origem = f"FROM {TABELA_FTS} JOIN {TABELA} r ON r.id = {TABELA_FTS}.rowid"
+    marca_inicio, marca_fim = FTS_CONFIG['HIGHLIGHT']
+    cursor = conn.cursor()
+    try:
+        # O BM25 pontua cada casamento antes de ordenar: um termo presente em quase todo o
+        # corpus custaria uma passada inteira. Acima de MAX_RANKED casamentos, só os mais
+        # recentes entram no ranking; achar o corte em ordem de rowid não calcula pontuação.
+        # Corte 0 no cursor: todos os casamentos entram.
+        maximo = FTS_CONFIG['MAX_RANKED']
+        if corte is None:
+            corte = 0
+            if maximo:
+                cursor.execute(
+                    f"SELECT {TABELA_FTS}.rowid {origem} WHERE {' AND '.join(condicoes)} "
+                    f"ORDER BY {TABELA_FTS}.rowid DESC LIMIT 1 OFFSET ?",
+                    (*parametros, maximo)
+                )
+                # O casamento seguinte aos MAX_RANKED: sem ele, nada fica de fora
+                excedente = cursor.fetchone()
+                if excedente:
+                    corte = excedente[0] + 1
+        if corte:
+            condicoes.append(f"{TABELA_FTS}.rowid >= ?")
+            parametros.append(corte)
+
+        cursor.execute(
+            f"SELECT r.id, highlight({TABELA_FTS}, 0, ?, ?), "
+            f"snippet({TABELA_FTS}, 1, ?, ?, '…', ?), "
+            "r.ano_publicacao, r.autores, r.fonte_publicacao, r.url_artigo, r.cluster_id, rank "
+            f"{origem} WHERE {' AND '.join(condicoes)} ORDER BY rank LIMIT ? OFFSET ?",
+            (marca_inicio, marca_fim, marca_inicio, marca_fim, FTS_CONFIG['SNIPPET_TOKENS'],
+             *parametros, limite + 1, deslocamento)
+        )
+    except sqlite3.OperationalError as e:
+        # Erro de sintaxe do FTS5 (não deveria passar por montar_consulta)
+        raise ValueError(f"Consulta inválida: {e}")
+    linhas = cursor.fetchall()
+
+    proximo = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo = f"{deslocamento + limite}:{corte}"
+    resultados = [
+        {'id': artigo_id, 'titulo': titulo, 'trecho': trecho, 'ano_publicacao': ano, 'autores': autores,
+         'fonte_publicacao': fonte, 'url_artigo': url, 'cluster_id': cluster_id,
+         'pontuacao': round(-pontuacao, 4)}
+        for artigo_id, titulo, trecho, ano, autores, fonte, url, cluster_id, pontuacao in linhas
+    ]
+    return resultados, proximo, corte > 0
+
+
+def filtro_ids(texto):
+    """Condição SQL (e parâmetros) que restringe ids da tabela de resultados à consulta
+
+    Usado por banco.pagina_resultados no parâmetro de texto de /dados_tabela.
+    """
+    consulta = montar_consulta(texto)
+    if consulta is None:
+        return None, ()
+    return f"id IN (SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH ?)", (consulta,)
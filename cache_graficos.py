@@ -0,0 +1,124 @@
+"""
+Cache dos gráficos gerados e dos dados agregados por trás deles, indexado pela
+"impressão digital" da tabela de resultados
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import graficos
+import temas
+from config import CACHE_CONFIG, DATABASE_CONFIG
+
+# Entradas do cache: chave -> {'graficos': {...}, 'criado_em': timestamp}
+_cache = OrderedDict()
+# Agregados de graficos.preparar_dados: chave -> {'dados': {...}, 'criado_em': timestamp}
+_dados = OrderedDict()
+_lock_cache = threading.Lock()
+
+
+def calcular_fingerprint(conn, execucao_id=None, tabela=DATABASE_CONFIG['TABLE_NAME']):
+    """Retorna uma assinatura barata do conteúdo da tabela (total, maior id, último timestamp)
+
+    Inclui o total de associações artigo/tópico, que muda quando um artigo já conhecido
+    aparece em um novo tópico, os artigos ainda sem grupo de duplicatas, que mudam quando
+    duplicatas.agrupar_pendentes agrupa artigos já gravados, a versão do modelo de temas e
+    a execução analisada (None = histórico completo).
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*), MAX(id), MAX(timestamp) FROM {tabela}")
+    total, max_id, ultimo_timestamp = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) FROM artigo_topicos")
+    associacoes = cursor.fetchone()[0]
+    cursor.execute(f"SELECT COUNT(*) FROM {tabela} WHERE cluster_id IS NULL")
+    sem_grupo = cursor.fetchone()[0]
+    versao_temas = temas.versao_atual(conn)
+    return (f"{total}:{max_id}:{ultimo_timestamp}:{associacoes}:g{sem_grupo}:t{versao_temas}:"
+            f"{execucao_id or 'todas'}")
+
+
+def _chave(fingerprint):
+    return f"{CACHE_CONFIG['KEY_PREFIX']}graficos_{fingerprint}"
+
+
+def _arquivos_validos(graficos, static_dir):
+    """Os arquivos precisam existir (a coleta de lixo pode tê-los apagado)
+
+    Os nomes derivam do fingerprint (graficos.nome_arquivo), então um arquivo existente
+    nunca tem conteúdo diferente do registrado.
+    """
+    return all(os.path.exists(os.path.join(static_dir, caminho)) for caminho in graficos.values())
+
+
+def obter(fingerprint, static_dir='static'):
+    """Retorna os gráficos em cache para o fingerprint ou None"""
+    if not CACHE_CONFIG['ENABLED']:
+        return None
+
+    chave = _chave(fingerprint)
+    with _lock_cache:
+        entrada = _cache.get(chave)
+        if entrada is None:
+            return None
+
+        expirado = time.time() - entrada['criado_em'] > CACHE_CONFIG['TIMEOUT']
+        if expirado or not _arquivos_validos(entrada['graficos'], static_dir):
+            del _cache[chave]
+            return None
+
+        _cache.move_to_end(chave)
+        return dict(entrada['graficos'])
+
+
+def salvar(fingerprint, graficos):
+    """Registra os gráficos gerados para o fingerprint, removendo as entradas mais antigas"""
+    if not CACHE_CONFIG['ENABLED'] or not graficos:
+        return
+
+    chave = _chave(fingerprint)
+    with _lock_cache:
+        _cache[chave] = {'graficos': dict(graficos), 'criado_em': time.time()}
+        _cache.move_to_end(chave)
+        while len(_cache) > CACHE_CONFIG['MAX_ENTRIES']:
+            _cache.popitem(last=False)
+
+
+def arquivos_em_uso():
+    """Nomes dos arquivos referenciados pelas entradas do cache (poupados pela coleta de lixo)"""
+    with _lock_cache:
+        return {os.path.basename(caminho) for entrada in _cache.values() for caminho in entrada['graficos'].values()}
+
+
+def obter_dados(conn, execucao_id=None, fingerprint=None):
+    """Agregados dos gráficos (graficos.preparar_dados), calculados uma vez por fingerprint
+
+    Retorna (fingerprint, dados); dados é None se não há artigos. O dicionário é
+    compartilhado entre as requisições e não deve ser alterado por quem o recebe.
+    """
+    if fingerprint is None:
+        fingerprint = calcular_fingerprint(conn, execucao_id)
+    chave = _chave(fingerprint)
+    if CACHE_CONFIG['ENABLED']:
+        with _lock_cache:
+            entrada = _dados.get(chave)
+            if entrada is not None and time.time() - entrada['criado_em'] <= CACHE_CONFIG['TIMEOUT']:
+                _dados.move_to_end(chave)
+                return fingerprint, entrada['dados']
+
+    dados = graficos.preparar_dados(conn, execucao_id)
+    if CACHE_CONFIG['ENABLED']:
+        with _lock_cache:
+            _dados[chave] = {'dados': dados, 'criado_em': time.time()}
+            _dados.move_to_end(chave)
+            while len(_dados) > CACHE_CONFIG['MAX_ENTRIES']:
+                _dados.popitem(last=False)
+    return fingerprint, dados
+
+
+def limpar():
+    """Remove todas as entradas do cache"""
+    with _lock_cache:
+        _cache.clear()
+        _dados.clear()
@@ -0,0 +1,168 @@
+"""
+Cache em disco das páginas de resultados do Google Scholar
+
+As páginas ficam comprimidas em um SQLite separado (PAGE_CACHE_CONFIG['DATABASE_NAME']),
+indexadas pela URL normalizada, com TTL, limite de tamanho e descarte LRU. Guardar o HTML
+bruto também permite reprocessar as páginas quando os seletores mudarem.
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import PAGE_CACHE_CONFIG
+
+_instancia = None
+_lock_instancia = threading.Lock()
+
+
+def normalizar_url(url):
+    """URL canônica para a chave do cache: host em minúsculas e parâmetros ordenados"""
+    partes = urlsplit(url)
+    parametros = sorted((k, v) for k, v in parse_qsl(partes.query, keep_blank_values=False))
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), partes.path, urlencode(parametros), ''))
+
+
+class CachePaginas:
+    """Armazena o HTML das páginas com TTL, limite de tamanho e descarte LRU"""
+
+    def __init__(self, caminho=None, ttl=None, tamanho_maximo_mb=None):
+        self.caminho = caminho or PAGE_CACHE_CONFIG['DATABASE_NAME']
+        self.ttl = PAGE_CACHE_CONFIG['TTL'] if ttl is None else ttl
+        tamanho_maximo_mb = PAGE_CACHE_CONFIG['MAX_SIZE_MB'] if tamanho_maximo_mb is None else tamanho_maximo_mb
+        self.tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.caminho, check_same_thread=False, timeout=30)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS paginas (
+                chave TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                html BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                criado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_paginas_acesso ON paginas(acessado_em)")
+        # Tamanho total das páginas, mantido na mesma transação de cada gravação e remoção
+        # (o limite é verificado a cada página salva, sem somar a tabela inteira)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS estado (
+                chave TEXT PRIMARY KEY,
+                valor INTEGER NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            "INSERT OR IGNORE INTO estado (chave, valor) "
+            "SELECT 'tamanho_total', COALESCE(SUM(tamanho), 0) FROM paginas"
+        )
+        self._conn.commit()
+
+    def _tamanho_total(self):
+        return self._conn.execute("SELECT valor FROM estado WHERE chave = 'tamanho_total'").fetchone()[0]
+
+    def _ajustar_tamanho(self, diferenca):
+        if diferenca:
+            self._conn.execute(
+                "UPDATE estado SET valor = valor + ? WHERE chave = 'tamanho_total'", (diferenca,)
+            )
+
+    def obter(self, url):
+        """HTML da página em cache ou None (entradas expiradas são removidas)"""
+        chave = normalizar_url(url)
+        agora = time.time()
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT html, tamanho, criado_em FROM paginas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+            html, tamanho, criado_em = linha
+            if agora - criado_em > self.ttl:
+                self._conn.execute("DELETE FROM paginas WHERE chave = ?", (chave,))
+                self._ajustar_tamanho(-tamanho)
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE paginas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+            self._conn.commit()
+        return zlib.decompress(html).decode('utf-8')
+
+    def salvar(self, url, html):
+        """Grava a página e descarta as menos acessadas se o limite de tamanho for excedido"""
+        comprimido = zlib.compress(html.encode('utf-8'), 6)
+        chave = normalizar_url(url)
+        agora = time.time()
+        with self._lock:
+            anterior = self._conn.execute("SELECT tamanho FROM paginas WHERE chave = ?", (chave,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO paginas (chave, url, html, tamanho, criado_em, acessado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (chave, url, comprimido, len(comprimido), agora, agora)
+            )
+            self._ajustar_tamanho(len(comprimido) - (anterior[0] if anterior else 0))
+            self._descartar_excesso()
+            self._conn.commit()
+
+    def _descartar_excesso(self):
+        total = self._tamanho_total()
+        if total <= self.tamanho_maximo:
+            return
+        descartar = []
+        liberado = 0
+        for chave, tamanho in self._conn.execute("SELECT chave, tamanho FROM paginas ORDER BY acessado_em"):
+            if total - liberado <= self.tamanho_maximo:
+                break
+            descartar.append((chave,))
+            liberado += tamanho
+        self._conn.executemany("DELETE FROM paginas WHERE chave = ?", descartar)
+        self._ajustar_tamanho(-liberado)
+
+    def remover_expirados(self):
+        """Apaga as páginas com TTL vencido e retorna quantas foram removidas"""
+        with self._lock:
+            removidas = self._conn.execute(
+                "DELETE FROM paginas WHERE criado_em < ? RETURNING tamanho", (time.time() - self.ttl,)
+            ).fetchall()
+            self._ajustar_tamanho(-sum(tamanho for tamanho, in removidas))
+            self._conn.commit()
+            return len(removidas)
+
+    def iterar_paginas(self, tamanho_lote=200):
+        """Percorre (url, html) de todas as páginas válidas, para reprocessamento
+
+        As páginas são lidas em lotes pela chave: só um lote fica em memória, e o lock fica
+        livre para a coleta entre um lote e outro.
+        """
+        limite = time.time() - self.ttl
+        ultima_chave = ''
+        while True:
+            with self._lock:
+                linhas = self._conn.execute(
+                    "SELECT chave, url, html FROM paginas WHERE chave > ? AND criado_em >= ? "
+                    "ORDER BY chave LIMIT ?",
+                    (ultima_chave, limite, tamanho_lote)
+                ).fetchall()
+            if not linhas:
+                return
+            ultima_chave = linhas[-1][0]
+            for _, url, html in linhas:
+                yield url, zlib.decompress(html).decode('utf-8')
+
+    def estatisticas(self):
+        with self._lock:
+            paginas = self._conn.execute("SELECT COUNT(*) FROM paginas").fetchone()[0]
+            tamanho = self._tamanho_total()
+        return {'paginas': paginas, 'tamanho_bytes': tamanho, 'limite_bytes': self.tamanho_maximo}
+
+
+def obter_cache():
+    """Instância compartilhada do cache, ou None se ele estiver desativado"""
+    global _instancia
+    if not PAGE_CACHE_CONFIG['ENABLED']:
+        return None
+    with _lock_instancia:
+        if _instancia is None:
+            _instancia = CachePaginas()
+        return _instancia
@@ -0,0 +1,355 @@
+"""
+Coletores das páginas de resultados do Google Scholar
+
+Um coletor recebe a URL de uma página de resultados e devolve (estado, resultados
+brutos), no formato de extrator_scholar. O pipeline de busca (selenium_simples) não
+sabe de onde a página veio:
+
+  - ColetorHTTP: cliente HTTP sem navegador, com conexões persistentes (keep-alive)
+    por host; o HTML é analisado por extrator_scholar com os seletores de
+    GOOGLE_SCHOLAR_CONFIG. As páginas de resultados são estáticas, então não há
+    necessidade de um navegador para a maioria das buscas.
+  - ColetorSelenium: navegador headless (Chrome e depois Edge), iniciado apenas na
+    primeira página que precisa dele.
+  - ColetorComAlternativa: usa o primeiro coletor e passa para o segundo quando ele é
+    bloqueado (CAPTCHA) ou falha depois de todas as tentativas.
+
+criar_coletor() monta o coletor de SEARCH_CONFIG['FETCHER'] (com FETCHER_FALLBACK como
+alternativa). Cada worker tem o seu coletor; eles não são compartilhados entre threads.
+"""
+
+import gzip
+import http.client
+import random
+import time
+import urllib.parse
+import zlib
+
+import metricas
+from config import HTTP_CONFIG, SEARCH_CONFIG, SELENIUM_CONFIG
+from extrator_scholar import (
+    PAGINA_CAPTCHA, PAGINA_RESULTADOS, PAGINA_VAZIA, estado_pagina_driver, estado_pagina_html,
+    extrair_resultados_driver, extrair_resultados_elementos, extrair_resultados_html
+)
+
+
+class BloqueioCaptcha(Exception):
+    """O Google Scholar respondeu com uma página de CAPTCHA"""
+
+
+class SemNavegador(Exception):
+    """Nenhum navegador pôde ser iniciado"""
+
+
+class ErroHTTP(Exception):
+    """Resposta HTTP com erro (status >= 400, exceto os de bloqueio)"""
+
+
+def _espera_backoff(tentativa):
+    """Backoff exponencial com jitter: base * 2^tentativa, limitado a BACKOFF_MAX"""
+    espera = min(SEARCH_CONFIG['BACKOFF_BASE'] * (2 ** tentativa), SEARCH_CONFIG['BACKOFF_MAX'])
+    return random.uniform(espera / 2, espera)
+
+
+def _com_tentativas(abrir, limitador, erros, coletor):
+    """Chama abrir() respeitando o limitador, com até SEARCH_CONFIG['RETRY_ATTEMPTS']
+    tentativas e backoff exponencial em CAPTCHA ou em um dos erros informados
+
+    Cada tentativa é medida (span coleta_pagina, sem a espera do limitador) e conta nas
+    métricas do coletor: páginas coletadas, CAPTCHAs e novas tentativas.
+    """
+    tentativas = max(1, SEARCH_CONFIG['RETRY_ATTEMPTS'])
+    for tentativa in range(tentativas):
+        try:
+            # Respeitar o intervalo global entre requisições
+            limitador.aguardar()
+            with metricas.medir('coleta_pagina', coletor=coletor):
+                resultado = abrir()
+            limitador.aliviar()
+            metricas.incrementar('paginas_coletadas', coletor=coletor)
+            return resultado
+
+        except (BloqueioCaptcha, *erros) as e_pagina:
+            limitador.penalizar()
+            if isinstance(e_pagina, BloqueioCaptcha):
+                metricas.incrementar('captchas', coletor=coletor)
+            if tentativa + 1 >= tentativas:
+                raise
+            metricas.incrementar('novas_tentativas', coletor=coletor)
+            espera = _espera_backoff(tentativa)
+            motivo = 'CAPTCHA' if isinstance(e_pagina, BloqueioCaptcha) else type(e_pagina).__name__
+            print(f"⚠️ {motivo} ao abrir a página, nova tentativa em {espera:.1f}s ({tentativa + 1}/{tentativas})")
+            time.sleep(espera)
+
+
+class ColetorHTTP:
+    """Coletor sem navegador: GET direto na página de resultados
+
+    Mantém uma conexão persistente por host, reaproveitada entre páginas e tópicos do
+    mesmo worker (sem novo handshake TCP/TLS a cada página). Conexões derrubadas pelo
+    servidor são reabertas na próxima tentativa.
+    """
+
+    nome = 'http'
+
+    def __init__(self):
+        self._conexoes = {}
+        self.requisicoes = 0
+        self.falhou = False
+        self._cabecalhos = {
+            'User-Agent': HTTP_CONFIG['USER_AGENT'],
+            'Accept': 'text/html,application/xhtml+xml',
+            'Accept-Language': HTTP_CONFIG['ACCEPT_LANGUAGE'],
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        }
+
+    def _conexao(self, esquema, host):
+        chave = (esquema, host)
+        conexao = self._conexoes.get(chave)
+        if conexao is None:
+            classe = http.client.HTTPSConnection if esquema == 'https' else http.client.HTTPConnection
+            conexao = classe(host, timeout=HTTP_CONFIG['TIMEOUT'])
+            self._conexoes[chave] = conexao
+        return conexao
+
+    def _baixar(self, url):
+        """HTML da URL (segue redirecionamentos; o de bloqueio vira BloqueioCaptcha)"""
+        for _ in range(HTTP_CONFIG['MAX_REDIRECTS'] + 1):
+            partes = urllib.parse.urlsplit(url)
+            # Tópicos com acento chegam sem codificação na URL (a mesma chave do cache de páginas)
+            caminho = urllib.parse.quote(partes.path or '/', safe='/%')
+            if partes.query:
+                caminho += '?' + urllib.parse.quote(partes.query, safe='=&+%')
+            conexao = self._conexao(partes.scheme, partes.netloc)
+            try:
+                conexao.request('GET', caminho, headers=self._cabecalhos)
+                resposta = conexao.getresponse()
+                corpo = resposta.read()
+            except (http.client.HTTPException, OSError):
+                conexao.close()
+                raise
+            if resposta.will_close:
+                conexao.close()
+
+            if 300 <= resposta.status < 400 and resposta.getheader('Location'):
+                url = urllib.parse.urljoin(url, resposta.getheader('Location'))
+                if '/sorry/' in url:
+                    raise BloqueioCaptcha(url)
+                continue
+            if resposta.status == 429:
+                raise BloqueioCaptcha(url)
+            if resposta.status >= 400:
+                raise ErroHTTP(f"HTTP {resposta.status} em {url}")
+
+            codificacao = (resposta.getheader('Content-Encoding') or '').lower()
+            if codificacao == 'gzip':
+                corpo = gzip.decompress(corpo)
+            elif codificacao == 'deflate':
+                corpo = zlib.decompress(corpo)
+            charset = resposta.headers.get_content_charset() or 'utf-8'
+            return corpo.decode(charset, errors='replace')
+        raise ErroHTTP(f"Redirecionamentos demais em {url}")
+
+    def _abrir(self, url):
+        html = self._baixar(url)
+        resultados = extrair_resultados_html(html)
+        if resultados:
+            return PAGINA_RESULTADOS, resultados, html
+        # Sem resultados: página vazia ou CAPTCHA (só aqui vale o segundo parse)
+        estado = estado_pagina_html(html)
+        if estado == PAGINA_CAPTCHA:
+            raise BloqueioCaptcha(url)
+        return estado, [], html
+
+    def obter(self, url, limitador, cache=None):
+        """Retorna (estado, resultados brutos) da página; guarda o HTML no cache, se houver"""
+        self.requisicoes += 1
+        estado, resultados, html = _com_tentativas(
+            lambda: self._abrir(url), limitador, (ErroHTTP, http.client.HTTPException, OSError), self.nome
+        )
+        if cache is not None:
+            cache.salvar(url, html)
+        return estado, resultados
+
+    def fechar(self):
+        for conexao in self._conexoes.values():
+            conexao.close()
+        self._conexoes.clear()
+
+
+@metricas.cronometrado('inicio_navegador')
+def criar_driver():
+    """Cria um navegador headless: tenta Chrome primeiro e depois Edge"""
+    from selenium import webdriver
+
+    # Tentar Chrome primeiro (mais simples)
+    try:
+        from selenium.webdriver.chrome.options import Options
+
+        print("📦 Configurando Chrome...")
+
+        # Opções mínimas do Chrome
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+
+        # Criar driver (Selenium vai tentar encontrar automaticamente)
+        print("🌐 Iniciando Chrome...")
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(SELENIUM_CONFIG['TIMEOUT'])
+
+        print("✅ Chrome iniciado com sucesso!")
+        return driver
+
+    except Exception as e_chrome:
+        print(f"❌ Chrome falhou: {e_chrome}")
+
+    # Tentar Edge se Chrome falhar
+    try:
+        print("📦 Tentando Edge...")
+        edge_options = webdriver.EdgeOptions()
+        edge_options.add_argument("--headless")
+        edge_options.add_argument("--no-sandbox")
+
+        driver = webdriver.Edge(options=edge_options)
+        driver.set_page_load_timeout(SELENIUM_CONFIG['TIMEOUT'])
+        print("✅ Edge iniciado com sucesso!")
+        return driver
+
+    except Exception as e_edge:
+        print(f"❌ Edge falhou: {e_edge}")
+        return None
+
+
+class ColetorSelenium:
+    """Coletor com navegador headless, iniciado apenas na primeira página que o usa"""
+
+    nome = 'selenium'
+
+    def __init__(self):
+        self.driver = None
+        self.falhou = False
+        self.requisicoes = 0
+
+    def _obter_driver(self):
+        if self.driver is None:
+            if self.falhou:
+                raise SemNavegador('Nenhum navegador disponível. Instale Chrome ou Edge.')
+            self.driver = criar_driver()
+            if self.driver is None:
+                self.falhou = True
+                raise SemNavegador('Nenhum navegador disponível. Instale Chrome ou Edge.')
+        return self.driver
+
+    def _abrir(self, url):
+        """Abre a página e espera até ela estar pronta (resultados, vazia ou CAPTCHA)"""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self.driver.get(url)
+        # Esperar a página ficar pronta em vez de uma pausa fixa
+        estado = WebDriverWait(self.driver, SELENIUM_CONFIG['IMPLICIT_WAIT'], poll_frequency=0.2).until(
+            estado_pagina_driver
+        )
+        if estado == PAGINA_CAPTCHA:
+            raise BloqueioCaptcha(url)
+        return estado
+
+    def obter(self, url, limitador, cache=None):
+        """Retorna (estado, resultados brutos) da página; guarda o HTML no cache, se houver"""
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+
+        driver = self._obter_driver()
+        self.requisicoes += 1
+        estado = _com_tentativas(
+            lambda: self._abrir(url), limitador, (TimeoutException, WebDriverException), self.nome
+        )
+
+        if cache is not None:
+            # Com cache, o HTML completo é guardado e a extração roda sobre ele
+            html = driver.page_source
+            cache.salvar(url, html)
+            return estado, extrair_resultados_html(html)
+
+        if estado == PAGINA_VAZIA:
+            return estado, []
+
+        # Extrair todos os resultados da página em uma única chamada ao navegador
+        try:
+            resultados = extrair_resultados_driver(driver)
+        except Exception as e_lote:
+            print(f"⚠️ Extração em lote falhou ({e_lote}), usando extração por campo")
+            resultados = extrair_resultados_elementos(driver)
+        return estado, resultados
+
+    def fechar(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+
+class ColetorComAlternativa:
+    """Usa o coletor principal até ele ser bloqueado ou falhar; daí em diante, o alternativo
+
+    A troca vale para o restante da vida do worker: um bloqueio do Scholar costuma
+    durar mais do que uma página.
+    """
+
+    def __init__(self, principal, alternativo):
+        self.principal = principal
+        self.alternativo = alternativo
+        self._usando_alternativo = False
+
+    @property
+    def nome(self):
+        return self.alternativo.nome if self._usando_alternativo else self.principal.nome
+
+    @property
+    def requisicoes(self):
+        return self.principal.requisicoes + self.alternativo.requisicoes
+
+    @property
+    def falhou(self):
+        return self._usando_alternativo and self.alternativo.falhou
+
+    def obter(self, url, limitador, cache=None):
+        if not self._usando_alternativo:
+            try:
+                return self.principal.obter(url, limitador, cache)
+            except (BloqueioCaptcha, SemNavegador, ErroHTTP, http.client.HTTPException, OSError) as e_principal:
+                motivo = 'CAPTCHA' if isinstance(e_principal, BloqueioCaptcha) else e_principal
+                print(f"🔁 Coletor {self.principal.nome} falhou ({motivo}), passando para {self.alternativo.nome}")
+                metricas.incrementar('trocas_coletor', de=self.principal.nome, para=self.alternativo.nome)
+                self._usando_alternativo = True
+        return self.alternativo.obter(url, limitador, cache)
+
+    def fechar(self):
+        try:
+            self.principal.fechar()
+        finally:
+            self.alternativo.fechar()
+
+
+COLETORES = {
+    'http': ColetorHTTP,
+    'selenium': ColetorSelenium,
+}
+
+
+def criar_coletor(nome=None, alternativo=None):
+    """Coletor de um worker: SEARCH_CONFIG['FETCHER'], com FETCHER_FALLBACK como alternativa
+
+    Com nome informado e sem alternativo, não há alternativa.
+    """
+    if nome is None:
+        nome = SEARCH_CONFIG['FETCHER']
+        alternativo = SEARCH_CONFIG['FETCHER_FALLBACK']
+    if nome not in COLETORES:
+        raise ValueError(f"Coletor desconhecido: {nome}")
+    coletor = COLETORES[nome]()
+    if alternativo and alternativo != nome:
+        if alternativo not in COLETORES:
+            raise ValueError(f"Coletor desconhecido: {alternativo}")
+        coletor = ColetorComAlternativa(coletor, COLETORES[alternativo]())
+    return coletor
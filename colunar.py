@@ -0,0 +1,396 @@
+"""
+Snapshot colunar do corpus para as análises (Arrow IPC, particionado por ano)
+
+As análises leem poucas colunas de muitas linhas (ano, tópico, grupo de duplicatas,
+resumo), o oposto do acesso linha a linha do SQLite. O snapshot guarda essas colunas em
+arquivos Arrow IPC sem compressão, uma pasta por ano, e a leitura é por memory map:
+só as páginas das colunas e anos usados por cada gráfico saem do disco, sem passar
+pelo cursor do sqlite3 nem virar objetos Python.
+
+Duas tabelas:
+  - artigos: id, grupo (COALESCE(cluster_id, id)), canonico, ano, resumo
+  - topicos: artigo_id, grupo, termo, execucao_id, ano (uma linha por artigo_topicos)
+
+O snapshot acompanha a ingestão: atualizar() acrescenta um arquivo por partição com os
+artigos e associações novos desde a última marca (maior id e maior rowid de
+artigo_topicos) e junta as partições com arquivos demais. Se o banco mudou de um jeito
+que não é só acréscimo (artigos apagados, quase-duplicatas agrupadas depois da gravação,
+outro arquivo de banco), o snapshot é refeito em uma nova geração. O manifesto é trocado
+de uma vez (os.replace), então um leitor nunca vê um estado pela metade.
+
+A leitura não atualiza nada: abrir() mapeia o manifesto atual e, se o banco já tem
+artigos ou associações depois das marcas dele (maior id e maior rowid, O(1)) ou artigos
+agrupados depois dele (contagem de cluster_id NULL, pelo índice), as análises daquela
+vez leem o SQLite até a próxima atualização da ingestão.
+
+O pyarrow é opcional e só é importado aqui, sob demanda: sem ele (ou com
+SNAPSHOT_CONFIG['ENABLED'] = False), abrir() retorna None e as análises usam o SQLite.
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+import threading
+import time
+
+from config import DATABASE_CONFIG, SNAPSHOT_CONFIG
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+VERSAO = 1
+SEM_ANO = 'nulo'
+
+_lock = threading.Lock()
+
+_CONSULTAS = {
+    'artigos': (
+        f"SELECT id, COALESCE(cluster_id, id), cluster_id IS NULL OR cluster_id = id, ano_publicacao, resumo "
+        f"FROM {TABELA} WHERE id > ? AND id <= ? ORDER BY id"
+    ),
+    'topicos': (
+        "SELECT a.artigo_id, COALESCE(r.cluster_id, r.id), a.termo, a.execucao_id, r.ano_publicacao "
+        f"FROM artigo_topicos a JOIN {TABELA} r ON r.id = a.artigo_id "
+        "WHERE a.rowid > ? AND a.rowid <= ? ORDER BY a.rowid"
+    ),
+}
+
+
+def _esquemas():
+    import pyarrow as pa
+
+    return {
+        'artigos': pa.schema([('id', pa.int64()), ('grupo', pa.int64()), ('canonico', pa.bool_()),
+                              ('ano', pa.int32()), ('resumo', pa.string())]),
+        'topicos': pa.schema([('artigo_id', pa.int64()), ('grupo', pa.int64()), ('termo', pa.string()),
+                              ('execucao_id', pa.int64()), ('ano', pa.int32())]),
+    }
+
+
+def disponivel():
+    """O snapshot está habilitado e o pyarrow instalado"""
+    return SNAPSHOT_CONFIG['ENABLED'] and importlib.util.find_spec('pyarrow') is not None
+
+
+def diretorio_snapshot():
+    """SNAPSHOT_CONFIG['DIR'] ou, sem ele, <banco>_colunar ao lado do arquivo do banco"""
+    return SNAPSHOT_CONFIG['DIR'] or os.path.splitext(DATABASE_CONFIG['DATABASE_NAME'])[0] + '_colunar'
+
+
+def _ler_manifesto(diretorio):
+    try:
+        with open(os.path.join(diretorio, 'manifesto.json'), encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    return manifesto if manifesto.get('versao') == VERSAO else None
+
+
+def _gravar_manifesto(diretorio, manifesto):
+    caminho = os.path.join(diretorio, 'manifesto.json')
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo)
+    os.replace(temporario, caminho)
+
+
+def _marcas(cursor):
+    """(maior id de artigo, maior rowid de artigo_topicos)"""
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {TABELA}")
+    max_id = cursor.fetchone()[0]
+    cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM artigo_topicos")
+    return max_id, cursor.fetchone()[0]
+
+
+def _contagens(cursor, max_id, max_rowid):
+    """Contagens até as marcas: mudam se algo já copiado para o snapshot foi apagado ou
+    se um artigo ainda sem grupo (cluster_id NULL) foi agrupado depois"""
+    # COUNT(*) sem filtro percorre o menor índice, bem mais estreito que a tabela com os
+    # resumos; as linhas depois das marcas (as novas) são poucas e saem pelo rowid
+    cursor.execute(f"SELECT (SELECT COUNT(*) FROM {TABELA}) - (SELECT COUNT(*) FROM {TABELA} WHERE id > ?)",
+                   (max_id,))
+    total = cursor.fetchone()[0]
+    cursor.execute("SELECT (SELECT COUNT(*) FROM artigo_topicos) - "
+                   "(SELECT COUNT(*) FROM artigo_topicos WHERE rowid > ?)", (max_rowid,))
+    associacoes = cursor.fetchone()[0]
+    return {'total': total, 'pendentes': _pendentes(cursor, max_id), 'associacoes': associacoes}
+
+
+def _pendentes(cursor, max_id):
+    """Artigos até a marca ainda sem grupo (busca em idx_resultados_cluster_id)"""
+    cursor.execute(f"SELECT COUNT(*) FROM {TABELA} WHERE cluster_id IS NULL AND id <= ?", (max_id,))
+    return cursor.fetchone()[0]
+
+
+def _coluna(valores, tipo):
+    import pyarrow as pa
+
+    if pa.types.is_boolean(tipo):
+        # O SQLite devolve expressões booleanas como 0/1
+        return pa.array(valores, type=pa.int8()).cast(tipo)
+    return pa.array(valores, type=tipo)
+
+
+class _Escritores:
+    """Um arquivo Arrow IPC aberto por partição (ano) de uma tabela, criado sob demanda"""
+
+    def __init__(self, diretorio, geracao, tabela, esquema, sequencia):
+        self.diretorio = diretorio
+        self.prefixo = os.path.join(f"g{geracao:06d}", tabela)
+        self.esquema = esquema
+        self.sequencia = sequencia
+        self.arquivos = {}
+        self._abertos = {}
+
+    def escrever(self, linhas, coluna_ano):
+        """Grava um lote de linhas (tuplas na ordem do esquema) nas partições dos seus anos"""
+        import pyarrow as pa
+
+        por_ano = {}
+        for linha in linhas:
+            por_ano.setdefault(linha[coluna_ano], []).append(linha)
+        for ano, grupo in por_ano.items():
+            particao = SEM_ANO if ano is None else str(ano)
+            escritor = self._abertos.get(particao)
+            if escritor is None:
+                relativo = os.path.join(self.prefixo, f"ano={particao}", f"parte-{self.sequencia:06d}.arrow")
+                os.makedirs(os.path.dirname(os.path.join(self.diretorio, relativo)), exist_ok=True)
+                escritor = pa.ipc.new_file(os.path.join(self.diretorio, relativo), self.esquema)
+                self._abertos[particao] = escritor
+                self.arquivos[particao] = relativo
+            colunas = [_coluna(valores, campo.type) for valores, campo in zip(zip(*grupo), self.esquema)]
+            escritor.write_batch(pa.record_batch(colunas, schema=self.esquema))
+
+    def fechar(self):
+        for escritor in self._abertos.values():
+            escritor.close()
+        self._abertos.clear()
+
+
+def _copiar(conn, diretorio, geracao, sequencia, de, ate):
+    """Copia as linhas entre as marcas `de` e `ate` (exclusive/inclusive) para arquivos novos
+
+    Retorna {tabela: {particao: caminho relativo}}.
+    """
+    esquemas = _esquemas()
+    novos = {}
+    cursor = conn.cursor()
+    for tabela, consulta in _CONSULTAS.items():
+        escritores = _Escritores(diretorio, geracao, tabela, esquemas[tabela], sequencia)
+        try:
+            cursor.execute(consulta, (de[tabela], ate[tabela]))
+            while True:
+                linhas = cursor.fetchmany(SNAPSHOT_CONFIG['BATCH_SIZE'])
+                if not linhas:
+                    break
+                escritores.escrever(linhas, esquemas[tabela].get_field_index('ano'))
+        finally:
+            escritores.fechar()
+        novos[tabela] = escritores.arquivos
+    return novos
+
+
+def _compactar(diretorio, manifesto):
+    """Junta em um arquivo as partições com mais de SNAPSHOT_CONFIG['MAX_PARTS'] arquivos
+
+    Retorna os arquivos substituídos (apagados depois da troca do manifesto).
+    """
+    import pyarrow as pa
+
+    substituidos = []
+    for tabela, particoes in manifesto['particoes'].items():
+        for particao, arquivos in particoes.items():
+            if len(arquivos) <= SNAPSHOT_CONFIG['MAX_PARTS']:
+                continue
+            tabela_arrow = pa.concat_tables(_ler(diretorio, arquivo) for arquivo in arquivos)
+            relativo = os.path.join(f"g{manifesto['geracao']:06d}", tabela, f"ano={particao}",
+                                    f"parte-{manifesto['sequencia']:06d}.arrow")
+            manifesto['sequencia'] += 1
+            with pa.ipc.new_file(os.path.join(diretorio, relativo), tabela_arrow.schema) as escritor:
+                escritor.write_table(tabela_arrow, max_chunksize=SNAPSHOT_CONFIG['BATCH_SIZE'])
+            substituidos.extend(arquivos)
+            particoes[particao] = [relativo]
+    return substituidos
+
+
+def _ler(diretorio, relativo):
+    """Tabela Arrow de um arquivo do snapshot, por memory map (sem cópia)"""
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(os.path.join(diretorio, relativo), 'r')).read_all()
+
+
+def _remover(diretorio, relativos):
+    for relativo in relativos:
+        try:
+            os.remove(os.path.join(diretorio, relativo))
+        except OSError:
+            pass  # Já removido, ou ainda mapeado por um leitor (Windows): fica para a próxima geração
+
+
+def _reconstruir(conn, diretorio, anterior, marcas):
+    geracao = (anterior or {}).get('geracao', 0) + 1
+    inicio = time.time()
+    # Restos de uma reconstrução interrompida nesta mesma geração
+    shutil.rmtree(os.path.join(diretorio, f"g{geracao:06d}"), ignore_errors=True)
+    novos = _copiar(conn, diretorio, geracao, 1, {'artigos': 0, 'topicos': 0},
+                    {'artigos': marcas[0], 'topicos': marcas[1]})
+    manifesto = {
+        'versao': VERSAO,
+        'banco': os.path.abspath(DATABASE_CONFIG['DATABASE_NAME']),
+        'geracao': geracao,
+        'sequencia': 2,
+        'max_id': marcas[0],
+        'max_rowid_topicos': marcas[1],
+        'contagens': _contagens(conn.cursor(), *marcas),
+        'particoes': {tabela: {particao: [relativo] for particao, relativo in arquivos.items()}
+                      for tabela, arquivos in novos.items()},
+    }
+    _gravar_manifesto(diretorio, manifesto)
+
+    # Gerações anteriores não são mais referenciadas
+    for nome in os.listdir(diretorio):
+        if nome.startswith('g') and nome != f"g{geracao:06d}":
+            shutil.rmtree(os.path.join(diretorio, nome), ignore_errors=True)
+    print(f"🧊 Snapshot colunar refeito (geração {geracao}, {manifesto['contagens']['total']} artigos) "
+          f"em {time.time() - inicio:.2f}s")
+    return manifesto
+
+
+def _acrescentar(conn, diretorio, manifesto, marcas):
+    novos = _copiar(conn, diretorio, manifesto['geracao'], manifesto['sequencia'],
+                    {'artigos': manifesto['max_id'], 'topicos': manifesto['max_rowid_topicos']},
+                    {'artigos': marcas[0], 'topicos': marcas[1]})
+    manifesto['sequencia'] += 1
+    for tabela, arquivos in novos.items():
+        for particao, relativo in arquivos.items():
+            manifesto['particoes'].setdefault(tabela, {}).setdefault(particao, []).append(relativo)
+    substituidos = _compactar(diretorio, manifesto)
+    manifesto['max_id'], manifesto['max_rowid_topicos'] = marcas
+    manifesto['contagens'] = _contagens(conn.cursor(), *marcas)
+    _gravar_manifesto(diretorio, manifesto)
+    _remover(diretorio, substituidos)
+    return manifesto
+
+
+def _atualizar(conn):
+    diretorio = diretorio_snapshot()
+    os.makedirs(diretorio, exist_ok=True)
+    manifesto = _ler_manifesto(diretorio)
+    cursor = conn.cursor()
+    marcas = _marcas(cursor)
+
+    if (manifesto is None or manifesto['banco'] != os.path.abspath(DATABASE_CONFIG['DATABASE_NAME'])
+            or marcas[0] < manifesto['max_id'] or marcas[1] < manifesto['max_rowid_topicos']
+            or _contagens(cursor, manifesto['max_id'], manifesto['max_rowid_topicos']) != manifesto['contagens']):
+        return _reconstruir(conn, diretorio, manifesto, marcas)
+    if marcas == (manifesto['max_id'], manifesto['max_rowid_topicos']):
+        return manifesto
+    return _acrescentar(conn, diretorio, manifesto, marcas)
+
+
+def atualizar(conn):
+    """Leva o snapshot até o estado atual do banco; retorna o manifesto (None se indisponível)
+
+    Chamado ao fim da coleta e da importação (só na ingestão: abrir() não atualiza).
+    """
+    if not disponivel():
+        return None
+    with _lock:
+        return _atualizar(conn)
+
+
+def abrir(conn):
+    """Abre o snapshot atual (SnapshotColunar) sem atualizá-lo nem tomar o lock
+
+    Retorna None (as análises usam o banco) se o snapshot está indisponível, ainda não
+    existe, é de outro banco, ficou atrás das marcas do banco ou tem artigos que foram
+    agrupados depois dele (duplicatas.agrupar_pendentes sobre artigos gravados sem
+    indexar, que mudaria o canonico deles).
+    """
+    if not disponivel():
+        return None
+    diretorio = diretorio_snapshot()
+    manifesto = _ler_manifesto(diretorio)
+    if manifesto is None or manifesto['banco'] != os.path.abspath(DATABASE_CONFIG['DATABASE_NAME']):
+        return None
+    cursor = conn.cursor()
+    if _marcas(cursor) != (manifesto['max_id'], manifesto['max_rowid_topicos']):
+        return None
+    if _pendentes(cursor, manifesto['max_id']) != manifesto['contagens']['pendentes']:
+        return None
+    try:
+        return SnapshotColunar(diretorio, manifesto)
+    except Exception as e:
+        # Ex.: uma compactação apagou um arquivo entre a leitura do manifesto e o mapeamento
+        print(f"⚠️ Snapshot colunar indisponível, usando o banco: {e}")
+        return None
+
+
+class SnapshotColunar:
+    """Leitura das partições do snapshot (memory map) e os agregados dos gráficos
+
+    Só as colunas e os anos pedidos são lidos; os resultados têm o mesmo formato das
+    consultas SQL equivalentes em graficos.preparar_dados.
+    """
+
+    def __init__(self, diretorio, manifesto):
+        self.manifesto = manifesto
+        self._tabelas = {
+            tabela: {particao: [_ler(diretorio, arquivo) for arquivo in arquivos]
+                     for particao, arquivos in particoes.items()}
+            for tabela, particoes in manifesto['particoes'].items()
+        }
+
+    def tabela(self, nome, colunas, ano_min=None, ano_max=None):
+        """Tabela Arrow com as colunas pedidas; com ano_min/ano_max, só essas partições
+        (e sem a partição dos artigos sem ano)"""
+        import pyarrow as pa
+
+        partes = []
+        for particao, tabelas in self._tabelas.get(nome, {}).items():
+            if ano_min is not None or ano_max is not None:
+                if particao == SEM_ANO:
+                    continue
+                ano = int(particao)
+                if (ano_min is not None and ano < ano_min) or (ano_max is not None and ano > ano_max):
+                    continue
+            partes.extend(tabela.select(colunas) for tabela in tabelas)
+        if not partes:
+            return _esquemas()[nome].empty_table().select(colunas)
+        return pa.concat_tables(partes)
+
+    def _grupos_da_execucao(self, execucao_id):
+        import pyarrow.compute as pc
+
+        topicos = self.tabela('topicos', ['grupo', 'execucao_id'])
+        return pc.unique(topicos.filter(pc.equal(topicos['execucao_id'], execucao_id))['grupo'])
+
+    def _canonicos(self, colunas, execucao_id=None, ano_min=None, ano_max=None):
+        import pyarrow.compute as pc
+
+        artigos = self.tabela('artigos', ['id', 'canonico', *colunas], ano_min, ano_max)
+        filtro = artigos['canonico']
+        if execucao_id is not None:
+            filtro = pc.and_(filtro, pc.is_in(artigos['id'], value_set=self._grupos_da_execucao(execucao_id)))
+        return artigos.filter(filtro)
+
+    def publicacoes_por_ano(self, ano_max, execucao_id=None):
+        """[(ano, artigos canônicos)] de 1900 até ano_max, em ordem de ano"""
+        artigos = self._canonicos(['ano'], execucao_id, 1900, ano_max)
+        contagem = artigos.group_by('ano').aggregate([('id', 'count')]).sort_by('ano')
+        return list(zip(contagem['ano'].to_pylist(), contagem['id_count'].to_pylist()))
+
+    def topicos_por_ano(self, ano_max, execucao_id=None):
+        """[(ano, tópico, grupos de artigos distintos)] de 1900 até ano_max"""
+        import pyarrow.compute as pc
+
+        topicos = self.tabela('topicos', ['ano', 'termo', 'grupo', 'execucao_id'], 1900, ano_max)
+        if execucao_id is not None:
+            topicos = topicos.filter(pc.equal(topicos['execucao_id'], execucao_id))
+        contagem = topicos.group_by(['ano', 'termo']).aggregate([('grupo', 'count_distinct')])
+        return list(zip(contagem['ano'].to_pylist(), contagem['termo'].to_pylist(),
+                        contagem['grupo_count_distinct'].to_pylist()))
+
+    def resumos(self, execucao_id=None):
+        """Resumos dos artigos canônicos (pandas.Series), para a análise de sentimento"""
+        return self._canonicos(['resumo'], execucao_id)['resumo'].to_pandas()
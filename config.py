@@ -13,14 +13,30 @@ SELENIUM_CONFIG = {
     'WEBDRIVER': 'edge',  # edge, chrome, firefox
     'HEADLESS': True,     # True para executar sem interface gráfica
     'WINDOW_SIZE': '1920,1080',
-    'TIMEOUT': 30,        # Timeout em segundos
-    'IMPLICIT_WAIT': 10   # Espera implícita em segundos
+    'TIMEOUT': 30,        # Timeout de carregamento da página em segundos
+    'IMPLICIT_WAIT': 10   # Espera máxima até a página de resultados ficar pronta
+}
+
+# Coletor HTTP das páginas de resultados (sem navegador), ver coletores.py
+HTTP_CONFIG = {
+    'USER_AGENT': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'),
+    'ACCEPT_LANGUAGE': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'TIMEOUT': 30,        # Timeout de conexão e leitura em segundos
+    'MAX_REDIRECTS': 5
 }
 
 # Configurações do banco de dados
 DATABASE_CONFIG = {
     'DATABASE_NAME': 'buscas_completas_CQ.db',
-    'TABLE_NAME': 'resultados_detalhados_CQ'
+    'TABLE_NAME': 'resultados_detalhados_CQ',
+    'TIMEOUT': 30,        # Espera em segundos quando o banco está bloqueado por outra escrita
+    'POOL_SIZE': 8,       # Conexões ociosas mantidas para reaproveitamento
+    'CACHE_SIZE_MB': 32,  # Cache de páginas do SQLite por conexão
+    'MMAP_SIZE_MB': 256,  # Leitura do arquivo via memória mapeada
+    'WRITE_BATCH_SIZE': 500,      # Artigos acumulados antes de gravar um lote
+    'WRITE_BATCH_INTERVAL': 5,    # Tempo máximo em segundos que um artigo espera no lote
+    'IMPORT_BATCH_SIZE': 20000    # Tamanho do lote na importação de arquivos
 }
 
 # Configurações de busca
@@ -29,9 +45,16 @@ SEARCH_CONFIG = {
     'DEFAULT_YEAR_END': 2025,
     'DEFAULT_MIN_RESULTS': 50,
     'MAX_RESULTS_PER_TOPIC': 1000,
-    'SEARCH_DELAY': 4,      # Delay entre requests em segundos
-    'PAGE_DELAY': 2,        # Delay entre páginas em segundos
-    'RETRY_ATTEMPTS': 3     # Tentativas em caso de erro
+    'PAGE_DELAY': 2,        # Intervalo médio entre páginas de um mesmo host (token bucket, todas as buscas)
+    'RATE_BURST': 2,        # Páginas que podem sair em rajada antes de o intervalo valer
+    'PAGE_WINDOW': 2,       # Páginas de um mesmo tópico pedidas ao mesmo tempo
+    'RETRY_ATTEMPTS': 3,    # Tentativas em caso de erro
+    'BACKOFF_BASE': 2,      # Espera inicial do backoff exponencial em segundos
+    'BACKOFF_MAX': 60,      # Espera máxima do backoff em segundos
+    'WORKERS': 2,           # Páginas buscadas ao mesmo tempo (semáforo do motor; um coletor por vaga)
+    'FETCHER': 'http',      # Coletor das páginas: http (sem navegador) ou selenium
+    'FETCHER_FALLBACK': 'selenium',  # Usado quando o coletor principal é bloqueado ou falha (None desativa)
+    'INCREMENTAL': True     # Mantém o histórico e grava apenas artigos novos (False apaga tudo a cada busca)
 }
 
 # Tópicos predefinidos de pesquisa
@@ -50,7 +73,8 @@ DEFAULT_TOPICS = [
 TEXT_ANALYSIS_CONFIG = {
     'STOPWORDS_PORTUGUESE': True,
     'CUSTOM_STOPWORDS': [
-        'computacao', 'quantica', 'quântico', 'quantum', 
+        'computacao', 'quantica', 'computação', 'quântica', 'quânticas',
+        'quântico', 'quânticos', 'quantum', 
         'trabalho', 'estudo', 'pesquisa', 'neste', 'este', 
         'para', 'com', 'que', 'uma', 'como', 'sobre', 
         'dados', 'resultados', 'artigo', 'paper', 'revista'
@@ -58,13 +82,16 @@ TEXT_ANALYSIS_CONFIG = {
     'POSITIVE_WORDS': [
         'inovação', 'oportunidades', 'avanços', 'eficiente', 
         'sucesso', 'breakthrough', 'promissor', 'revolucionário',
-        'otimização', 'melhoria', 'solução'
+        'otimização', 'melhoria', 'solução', 'melhor', 'novo'
     ],
     'NEGATIVE_WORDS': [
         'desafios', 'problemas', 'riscos', 'limitações', 
         'ameaça', 'dificuldades', 'obstáculos', 'barreiras',
-        'complexidade', 'erro'
-    ]
+        'complexidade', 'erro', 'dificuldade', 'complexo'
+    ],
+    # Léxicos adicionais, um termo (ou expressão) por linha; None para usar apenas as listas acima
+    'POSITIVE_WORDS_FILE': None,
+    'NEGATIVE_WORDS_FILE': None
 }
 
 # Configurações dos gráficos
@@ -75,7 +102,13 @@ PLOT_CONFIG = {
     'COLOR_PALETTE': 'viridis',
     'FONT_SIZE': 12,
     'TITLE_SIZE': 16,
-    'SAVE_FORMAT': 'png'
+    'SAVE_FORMAT': 'png',
+    'WORKERS': 3,           # Processos que renderizam os gráficos em paralelo
+    'SERVER_RENDER': True,  # /resultados gera as imagens no servidor (False: só /api/analises no navegador)
+    'EXPORT_FORMATS': ('png', 'svg', 'pdf'),  # Formatos de /api/analises/<grafico>.<formato>
+    'EXPORT_MAX_DPI': 600,
+    'FILE_MAX_AGE': 31536000,   # Cache-Control dos arquivos em /graficos/arquivo (nomes por conteúdo: 1 ano)
+    'GC_MAX_AGE': 7 * 24 * 3600  # Renderizações sem uso há mais tempo que isso são apagadas
 }
 
 # Configurações de export
@@ -86,6 +119,47 @@ EXPORT_CONFIG = {
     'DATE_FORMAT': '%Y-%m-%d %H:%M:%S'
 }
 
+# Paginação da tabela de resultados (/dados_tabela)
+PAGINATION_CONFIG = {
+    'PAGE_SIZE': 100,       # Linhas por página quando o cliente não informa o limite
+    'MAX_PAGE_SIZE': 1000,  # Limite máximo de linhas por página
+    'DEFAULT_COLUMNS': ['id', 'termo', 'titulo', 'ano_publicacao', 'autores', 'fonte_publicacao', 'url_artigo']
+}
+
+# Busca textual no corpus (/buscar, índice FTS5), ver busca_textual.py
+FTS_CONFIG = {
+    'WEIGHTS': (10.0, 1.0, 3.0, 2.0),     # Pesos do BM25: título, resumo, autores, fonte
+    'PAGE_SIZE': 20,                      # Resultados por página quando o cliente não informa
+    'SNIPPET_TOKENS': 24,                 # Tamanho do trecho do resumo devolvido
+    'MAX_RANKED': 20000,                  # Casamentos ordenados por BM25 (os mais recentes); 0 = todos
+    'HIGHLIGHT': ('<mark>', '</mark>')    # Marcação dos termos encontrados
+}
+
+# Quase-duplicatas (MinHash + LSH), ver duplicatas.py
+DEDUP_CONFIG = {
+    'ENABLED': True,
+    'SHINGLE_SIZE': 5,    # Shingles de caracteres de título + resumo
+    'NUM_PERM': 64,       # Funções de hash da assinatura (mudar exige recalcular as assinaturas)
+    'BANDS': 16,          # Faixas do LSH (NUM_PERM / BANDS valores por faixa)
+    'BUCKET_LIMIT': 20,   # Candidatos lidos por faixa (limita o custo por artigo)
+    'THRESHOLD': 0.7      # Similaridade de Jaccard estimada para considerar duplicata
+}
+
+# Modelagem de temas dos resumos (TF-IDF + LDA online), ver temas.py
+TOPIC_MODEL_CONFIG = {
+    'ENABLED': True,          # Atualiza o modelo ao fim de cada busca
+    'MODEL_FILE': 'modelo_temas_CQ.joblib',  # Vocabulário, idf e LDA persistidos
+    'N_TOPICS': 10,
+    'MAX_FEATURES': 5000,     # Tamanho máximo do vocabulário (termos mais frequentes do índice)
+    'MIN_DF': 5,              # Termos em menos artigos ficam fora do vocabulário
+    'MAX_DF': 0.5,            # Termos em mais desta fração dos artigos também
+    'BATCH_SIZE': 2048,       # Artigos por lote do partial_fit (limita a memória)
+    'MAX_FIT_DOCS': 50000,    # Amostra do ajuste completo (limita o tempo em corpora grandes)
+    'PASSES': 2,              # Passadas do ajuste completo sobre a amostra
+    'REFIT_GROWTH': 2.0,      # Reajusta do zero quando o corpus cresce este fator desde o último ajuste
+    'TOP_WORDS': 10           # Palavras exibidas por tema
+}
+
 # URLs e seletores CSS (podem mudar com atualizações do Google Scholar)
 GOOGLE_SCHOLAR_CONFIG = {
     'BASE_URL': 'https://scholar.google.com.br/scholar',
@@ -97,6 +171,22 @@ GOOGLE_SCHOLAR_CONFIG = {
     'NEXT_BUTTON_TEXT': 'Próxima'
 }
 
+# Cache em disco das páginas de resultados do Google Scholar
+PAGE_CACHE_CONFIG = {
+    'ENABLED': True,
+    'DATABASE_NAME': 'cache_paginas_CQ.db',  # Fica ao lado de buscas_completas_CQ.db
+    'TTL': 7 * 24 * 3600,    # Validade de uma página em segundos (7 dias)
+    'MAX_SIZE_MB': 200       # Tamanho máximo do cache; as páginas menos acessadas são descartadas
+}
+
+# Snapshot colunar do corpus para as análises (Arrow IPC por ano), ver colunar.py
+SNAPSHOT_CONFIG = {
+    'ENABLED': True,        # Sem pyarrow instalado, as análises usam o banco de qualquer forma
+    'DIR': None,            # None: <banco>_colunar/ ao lado de buscas_completas_CQ.db
+    'BATCH_SIZE': 50000,    # Linhas lidas do banco por lote ao gravar o snapshot
+    'MAX_PARTS': 8          # Arquivos por partição (ano) antes de juntá-los em um só
+}
+
 # Configurações de logging
 LOGGING_CONFIG = {
     'LEVEL': 'INFO',
@@ -106,10 +196,22 @@ LOGGING_CONFIG = {
     'BACKUP_COUNT': 5
 }
 
-# Configurações de cache (para implementação futura)
+# Instrumentação (metricas.py): /metrics e perfilador por requisição
+METRICS_CONFIG = {
+    'ENABLED': True,
+    # Limites das faixas do histograma de duração dos spans, em segundos
+    'BUCKETS': (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    'PROFILER_ENABLED': False,   # Permite perfilar uma requisição com ?perfil=1 (só em desenvolvimento)
+    'PROFILER_PARAM': 'perfil',
+    'PROFILER_INTERVAL': 0.005,  # Intervalo entre amostras da pilha, em segundos
+    'PROFILER_DIR': 'perfis'     # Onde os perfis (formato collapsed) são gravados
+}
+
+# Configurações de cache dos gráficos (invalidado quando os dados da tabela mudam)
 CACHE_CONFIG = {
-    'ENABLED': False,
+    'ENABLED': True,
     'TYPE': 'simple',
     'TIMEOUT': 3600,  # 1 hora
-    'KEY_PREFIX': 'webscraping_'
+    'KEY_PREFIX': 'webscraping_',
+    'MAX_ENTRIES': 16  # Entradas mantidas antes de descartar as menos usadas
 }
@@ -0,0 +1,232 @@
+"""
+Detecção de quase-duplicatas (MinHash + LSH) durante a ingestão
+
+O Scholar devolve o mesmo trabalho várias vezes: preprint e versão publicada, títulos
+levemente diferentes, espelhos com outra URL. A chave normalizada do banco só une cópias
+exatas; aqui cada artigo novo recebe uma assinatura MinHash dos shingles de caracteres
+de título + resumo, gravada na própria linha (coluna assinatura), e as faixas da
+assinatura do artigo canônico de cada grupo vão para minhash_bandas. Os candidatos a
+duplicata são os canônicos que compartilham ao menos uma faixa (busca indexada, sem
+comparar com o corpus inteiro) e a similaridade estimada pelas assinaturas decide se o
+artigo entra no grupo de um deles.
+
+cluster_id aponta para o artigo canônico do grupo (o primeiro gravado); artigos
+canônicos têm cluster_id = id. Só os canônicos entram no índice de termos, de modo que
+as análises contam grupos, e não linhas.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+import indice_termos
+from config import DATABASE_CONFIG, DEDUP_CONFIG
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+# Semente fixa: as permutações precisam ser as mesmas em todas as execuções
+_SEMENTE = 20240501
+
+_REGEX_ESPACOS = re.compile(r'\s+')
+_REGEX_ACENTOS = re.compile('[\u0300-\u036f]')
+
+_permutacoes = None
+
+
+def criar_tabelas(cursor):
+    """Cria o índice LSH (chamado por banco.criar_esquema)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS minhash_bandas (
+            banda INTEGER NOT NULL,
+            hash INTEGER NOT NULL,
+            artigo_id INTEGER NOT NULL,
+            PRIMARY KEY (banda, hash, artigo_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+def limpar(cursor):
+    """Apaga o índice LSH (usado quando todos os artigos são removidos)"""
+    cursor.execute("DELETE FROM minhash_bandas")
+
+
+def _obter_permutacoes():
+    """Coeficientes (a, b) das NUM_PERM funções h(x) = ((a * x + b) mod 2^64) >> 32
+
+    Hash multiplicativo (multiply-shift): a aritmética de 64 bits do numpy já faz o
+    módulo ao estourar, sem a divisão de um hash módulo primo.
+    """
+    global _permutacoes
+    if _permutacoes is None:
+        import numpy as np
+
+        gerador = np.random.default_rng(_SEMENTE)
+        a = gerador.integers(0, 2 ** 64, size=DEDUP_CONFIG['NUM_PERM'], dtype=np.uint64) | np.uint64(1)
+        b = gerador.integers(0, 2 ** 64, size=DEDUP_CONFIG['NUM_PERM'], dtype=np.uint64)
+        _permutacoes = (a[:, None], b[:, None])
+    return _permutacoes
+
+
+def _normalizar(titulo, resumo):
+    """Minúsculas, sem acentos e com espaços simples: 'Quântica' e 'quantica' se igualam"""
+    texto = _REGEX_ACENTOS.sub('', unicodedata.normalize('NFKD', f"{titulo or ''} {resumo or ''}".lower()))
+    return _REGEX_ESPACOS.sub(' ', texto).strip()
+
+
+def assinatura(titulo, resumo):
+    """Assinatura MinHash (NUM_PERM valores uint32) dos shingles do texto, ou None se vazio
+
+    Os shingles são janelas de SHINGLE_SIZE bytes do texto normalizado em UTF-8 (um
+    caractere por byte no texto sem acentos), cada uma reduzida a um inteiro pelo hash
+    polinomial de base 257 (com SHINGLE_SIZE <= 7 ele cabe em 64 bits, sem colisões).
+    """
+    import numpy as np
+
+    texto = _normalizar(titulo, resumo)
+    if not texto:
+        return None
+    k = DEDUP_CONFIG['SHINGLE_SIZE']
+    dados = np.frombuffer(texto.encode('utf-8').ljust(k), dtype=np.uint8).astype(np.uint64)
+    janelas = len(dados) - k + 1
+    x = dados[:janelas].copy()
+    for deslocamento in range(1, k):
+        x *= np.uint64(257)
+        x += dados[deslocamento:deslocamento + janelas]
+    # Shingles repetidos não mudam o mínimo: não é preciso deduplicar x
+    a, b = _obter_permutacoes()
+    hashes = a * x
+    hashes += b
+    hashes >>= np.uint64(32)
+    return hashes.min(axis=1).astype(np.uint32)
+
+
+def _bandas(valores):
+    """(banda, hash de 64 bits) de cada faixa de NUM_PERM / BANDS valores da assinatura"""
+    linhas = DEDUP_CONFIG['NUM_PERM'] // DEDUP_CONFIG['BANDS']
+    dados = valores.tobytes()
+    tamanho = linhas * valores.itemsize
+    return [
+        (banda, int.from_bytes(
+            hashlib.blake2b(dados[banda * tamanho:(banda + 1) * tamanho], digest_size=8).digest(),
+            'big', signed=True
+        ))
+        for banda in range(DEDUP_CONFIG['BANDS'])
+    ]
+
+
+def _candidatos(cursor, bandas):
+    """Ids dos artigos que compartilham ao menos uma faixa (no máximo BUCKET_LIMIT por faixa)"""
+    # Uma busca pela chave primária por faixa ((banda, hash) IN (VALUES ...) varre a tabela).
+    # O limite mantém o custo por artigo constante quando uma faixa é muito comum (textos
+    # curtos ou padronizados), à custa de não ver todos os candidatos dessa faixa.
+    consulta = "SELECT * FROM (SELECT artigo_id FROM minhash_bandas WHERE banda = ? AND hash = ? LIMIT ?)"
+    cursor.execute(
+        ' UNION '.join([consulta] * len(bandas)),
+        [valor for banda in bandas for valor in (*banda, DEDUP_CONFIG['BUCKET_LIMIT'])]
+    )
+    return [linha[0] for linha in cursor.fetchall()]
+
+
+def agrupar_lote(cursor, artigos):
+    """Calcula assinatura e grupo dos artigos (artigo_id, titulo, resumo) recém-gravados
+
+    Grava assinatura e cluster_id na tabela principal e, para os canônicos, as faixas
+    em minhash_bandas. Artigos do mesmo lote também são comparados entre si. Retorna os
+    artigos canônicos (os que devem entrar no índice de termos), na mesma forma da entrada.
+    """
+    if not DEDUP_CONFIG['ENABLED']:
+        return list(artigos)
+    import numpy as np
+
+    limiar = DEDUP_CONFIG['THRESHOLD']
+    # Assinaturas dos canônicos do lote, consultadas antes do banco
+    do_lote = {}
+    bandas_do_lote = {}
+    atualizacoes = []
+    novas_bandas = []
+    canonicos = []
+    for artigo in artigos:
+        artigo_id, titulo, resumo = artigo
+        valores = assinatura(titulo, resumo)
+        if valores is None:
+            atualizacoes.append((None, artigo_id, artigo_id))
+            canonicos.append(artigo)
+            continue
+
+        bandas = _bandas(valores)
+        ids = set(_candidatos(cursor, bandas))
+        for banda in bandas:
+            ids.update(bandas_do_lote.get(banda, ())[:DEDUP_CONFIG['BUCKET_LIMIT']])
+        ids.discard(artigo_id)
+
+        externos = [i for i in ids if i not in do_lote]
+        assinaturas, grupos = [], []
+        if externos:
+            cursor.execute(
+                f"SELECT assinatura, COALESCE(cluster_id, id) FROM {TABELA} "
+                f"WHERE id IN ({','.join('?' * len(externos))}) AND assinatura IS NOT NULL",
+                externos
+            )
+            for blob, grupo in cursor.fetchall():
+                assinaturas.append(np.frombuffer(blob, dtype=np.uint32))
+                grupos.append(grupo)
+        for i in ids:
+            if i in do_lote:
+                assinaturas.append(do_lote[i])
+                grupos.append(i)
+
+        # Similaridade estimada com todos os candidatos de uma vez: fração de valores iguais
+        melhor_grupo = artigo_id
+        if assinaturas:
+            similaridades = (np.vstack(assinaturas) == valores).mean(axis=1)
+            melhor = int(similaridades.argmax())
+            if similaridades[melhor] >= limiar:
+                melhor_grupo = grupos[melhor]
+
+        atualizacoes.append((valores.tobytes(), melhor_grupo, artigo_id))
+        if melhor_grupo == artigo_id:
+            # Só o canônico entra no LSH: cada grupo é comparado uma vez, por maior que seja
+            do_lote[artigo_id] = valores
+            for banda in bandas:
+                bandas_do_lote.setdefault(banda, []).append(artigo_id)
+                novas_bandas.append((*banda, artigo_id))
+            canonicos.append(artigo)
+
+    cursor.executemany(f"UPDATE {TABELA} SET assinatura = ?, cluster_id = ? WHERE id = ?", atualizacoes)
+    cursor.executemany("INSERT OR IGNORE INTO minhash_bandas (banda, hash, artigo_id) VALUES (?, ?, ?)", novas_bandas)
+    return canonicos
+
+
+def agrupar_pendentes(conn, tamanho_lote=1000):
+    """Agrupa os artigos gravados sem assinatura (bancos antigos ou importações sem índice)
+
+    Duplicatas encontradas entre artigos que já estavam no índice de termos saem dele.
+    """
+    if not DEDUP_CONFIG['ENABLED']:
+        return 0
+    cursor = conn.cursor()
+    total = 0
+    duplicatas = 0
+    ultimo_id = 0
+    while True:
+        cursor.execute(
+            f"SELECT id, titulo, resumo, indexado FROM {TABELA} "
+            "WHERE id > ? AND cluster_id IS NULL ORDER BY id LIMIT ?",
+            (ultimo_id, tamanho_lote)
+        )
+        linhas = cursor.fetchall()
+        if not linhas:
+            break
+        ultimo_id = linhas[-1][0]
+        canonicos = {artigo[0] for artigo in agrupar_lote(cursor, [linha[:3] for linha in linhas])}
+        removidos = [linha[0] for linha in linhas if linha[0] not in canonicos and linha[3]]
+        indice_termos.remover_artigos(cursor, removidos)
+        cursor.executemany(
+            "DELETE FROM artigo_temas WHERE artigo_id = ?", [(artigo_id,) for artigo_id in removidos]
+        )
+        conn.commit()
+        total += len(linhas)
+        duplicatas += len(linhas) - len(canonicos)
+    if total:
+        print(f"🧬 {total} artigos agrupados por similaridade ({duplicatas} quase-duplicatas)")
+    return total
@@ -0,0 +1,300 @@
+"""
+Extração em lote dos resultados do Google Scholar
+
+Em vez de uma chamada ao WebDriver por campo de cada resultado, a página inteira é
+extraída de uma vez (um execute_script ou um parse do page_source) usando os
+seletores de GOOGLE_SCHOLAR_CONFIG. O tratamento de cada linha roda sobre strings.
+"""
+
+import re
+from html.parser import HTMLParser
+
+import metricas
+from config import GOOGLE_SCHOLAR_CONFIG
+
+# Script executado no navegador: retorna todos os campos da página em uma única chamada
+SCRIPT_EXTRACAO = """
+const [seletorResultado, seletorTitulo, seletorAutor, seletorResumo] = arguments;
+return Array.from(document.querySelectorAll(seletorResultado)).map(function (resultado) {
+    const titulo = resultado.querySelector(seletorTitulo);
+    const autor = resultado.querySelector(seletorAutor);
+    const resumo = resultado.querySelector(seletorResumo);
+    return {
+        titulo: titulo ? titulo.innerText : null,
+        url_artigo: titulo ? titulo.href : null,
+        texto_autor: autor ? autor.innerText : null,
+        resumo: resumo ? resumo.innerText : null
+    };
+});
+"""
+
+_ELEMENTOS_VAZIOS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+_REGEX_ANO = re.compile(r'(20\d{2})')
+_REGEX_ESPACOS = re.compile(r'\s+')
+
+
+def _seletores():
+    return (
+        GOOGLE_SCHOLAR_CONFIG['RESULT_SELECTOR'],
+        GOOGLE_SCHOLAR_CONFIG['TITLE_SELECTOR'],
+        GOOGLE_SCHOLAR_CONFIG['AUTHOR_YEAR_SELECTOR'],
+        GOOGLE_SCHOLAR_CONFIG['ABSTRACT_SELECTOR'],
+    )
+
+
+class _No:
+    """Elemento mínimo da árvore HTML"""
+
+    __slots__ = ('tag', 'atributos', 'filhos', 'pai')
+
+    def __init__(self, tag, atributos, pai):
+        self.tag = tag
+        self.atributos = atributos
+        self.filhos = []
+        self.pai = pai
+
+    @property
+    def classes(self):
+        return (self.atributos.get('class') or '').split()
+
+    def texto(self):
+        partes = []
+        pilha = [self]
+        while pilha:
+            item = pilha.pop()
+            if isinstance(item, str):
+                partes.append(item)
+            else:
+                if item.tag == 'br':
+                    partes.append(' ')
+                pilha.extend(reversed(item.filhos))
+        return _REGEX_ESPACOS.sub(' ', ''.join(partes)).strip()
+
+    def descendentes(self):
+        pilha = [f for f in reversed(self.filhos) if isinstance(f, _No)]
+        while pilha:
+            no = pilha.pop()
+            yield no
+            pilha.extend(f for f in reversed(no.filhos) if isinstance(f, _No))
+
+
+class _ConstrutorArvore(HTMLParser):
+    """Monta a árvore de _No a partir do HTML"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raiz = _No('#documento', {}, None)
+        self._atual = self.raiz
+
+    def handle_starttag(self, tag, attrs):
+        no = _No(tag, dict(attrs), self._atual)
+        self._atual.filhos.append(no)
+        if tag not in _ELEMENTOS_VAZIOS:
+            self._atual = no
+
+    def handle_startendtag(self, tag, attrs):
+        self._atual.filhos.append(_No(tag, dict(attrs), self._atual))
+
+    def handle_endtag(self, tag):
+        # Fecha até a tag correspondente; tags sem abertura são ignoradas
+        no = self._atual
+        while no is not None and no.tag != tag:
+            no = no.pai
+        if no is not None and no.pai is not None:
+            self._atual = no.pai
+
+    def handle_data(self, data):
+        self._atual.filhos.append(data)
+
+
+def _compilar_seletor(seletor):
+    """Converte 'h3.gs_rt a' em [(tag, classes, id), ...] (apenas combinador descendente)"""
+    partes = []
+    for composto in seletor.split():
+        tag = re.match(r'^[a-zA-Z0-9*]*', composto).group(0).lower() or None
+        if tag == '*':
+            tag = None
+        classes = re.findall(r'\.([\w-]+)', composto)
+        ids = re.findall(r'#([\w-]+)', composto)
+        partes.append((tag, classes, ids[0] if ids else None))
+    return partes
+
+
+def _combina(no, composto):
+    tag, classes, id_ = composto
+    if tag and no.tag != tag:
+        return False
+    if id_ and no.atributos.get('id') != id_:
+        return False
+    if classes:
+        classes_no = no.classes
+        return all(c in classes_no for c in classes)
+    return True
+
+
+def _combina_seletor(no, partes):
+    """Verifica o seletor da direita para a esquerda (como querySelector, os ancestrais
+    podem estar fora do elemento de onde a busca partiu)"""
+    if not _combina(no, partes[-1]):
+        return False
+    indice = len(partes) - 2
+    ancestral = no.pai
+    while indice >= 0:
+        while ancestral is not None and not _combina(ancestral, partes[indice]):
+            ancestral = ancestral.pai
+        if ancestral is None:
+            return False
+        indice -= 1
+        ancestral = ancestral.pai
+    return True
+
+
+def _selecionar(raiz, seletor):
+    partes = _compilar_seletor(seletor)
+    return [no for no in raiz.descendentes() if _combina_seletor(no, partes)]
+
+
+def _selecionar_primeiro(raiz, seletor):
+    partes = _compilar_seletor(seletor)
+    for no in raiz.descendentes():
+        if _combina_seletor(no, partes):
+            return no
+    return None
+
+
+def extrair_resultados_html(html):
+    """Extrai os campos brutos de todos os resultados a partir do HTML da página"""
+    construtor = _ConstrutorArvore()
+    construtor.feed(html)
+    construtor.close()
+
+    seletor_resultado, seletor_titulo, seletor_autor, seletor_resumo = _seletores()
+    brutos = []
+    for resultado in _selecionar(construtor.raiz, seletor_resultado):
+        titulo = _selecionar_primeiro(resultado, seletor_titulo)
+        autor = _selecionar_primeiro(resultado, seletor_autor)
+        resumo = _selecionar_primeiro(resultado, seletor_resumo)
+        brutos.append({
+            'titulo': titulo.texto() if titulo is not None else None,
+            'url_artigo': titulo.atributos.get('href') if titulo is not None else None,
+            'texto_autor': autor.texto() if autor is not None else None,
+            'resumo': resumo.texto() if resumo is not None else None,
+        })
+    return brutos
+
+
+def extrair_resultados_driver(driver):
+    """Extrai os campos brutos de todos os resultados com um único execute_script"""
+    return driver.execute_script(SCRIPT_EXTRACAO, *_seletores()) or []
+
+
+@metricas.cronometrado('extracao_resultado')
+def processar_resultado(bruto):
+    """Converte os campos brutos de um resultado na linha gravada no banco"""
+    titulo = bruto.get('titulo') or "Título não encontrado"
+    url_artigo = bruto.get('url_artigo') if bruto.get('titulo') is not None else None
+
+    autores = "N/A"
+    fonte = "N/A"
+    ano = None
+    texto_autor = bruto.get('texto_autor')
+    if texto_autor is not None:
+        texto_autor = texto_autor.replace('\xa0', ' ')
+
+        # Extrair ano (regex simples)
+        ano_match = _REGEX_ANO.search(texto_autor)
+        if ano_match:
+            ano = int(ano_match.group(1))
+
+        # Dividir autores e fonte
+        if ' - ' in texto_autor:
+            partes = texto_autor.split(' - ')
+            autores = partes[0].strip()
+            if len(partes) > 1:
+                fonte = partes[1].strip()
+        else:
+            autores = texto_autor.strip()
+
+    return {
+        'titulo': titulo,
+        'ano_publicacao': ano,
+        'autores': autores,
+        'fonte_publicacao': fonte,
+        'resumo': bruto.get('resumo'),
+        'url_artigo': url_artigo,
+    }
+
+
+def extrair_resultados_elementos(driver):
+    """Extração campo a campo (várias chamadas ao WebDriver por resultado), usada como
+    alternativa quando o execute_script não está disponível"""
+    from selenium.webdriver.common.by import By
+
+    seletor_resultado, seletor_titulo, seletor_autor, seletor_resumo = _seletores()
+    brutos = []
+    for resultado in driver.find_elements(By.CSS_SELECTOR, seletor_resultado):
+        bruto = {'titulo': None, 'url_artigo': None, 'texto_autor': None, 'resumo': None}
+        try:
+            titulo_elem = resultado.find_element(By.CSS_SELECTOR, seletor_titulo)
+            bruto['titulo'] = titulo_elem.text
+            bruto['url_artigo'] = titulo_elem.get_attribute("href")
+        except Exception:
+            pass
+        try:
+            bruto['texto_autor'] = resultado.find_element(By.CSS_SELECTOR, seletor_autor).text
+        except Exception:
+            pass
+        try:
+            bruto['resumo'] = resultado.find_element(By.CSS_SELECTOR, seletor_resumo).text
+        except Exception:
+            pass
+        brutos.append(bruto)
+    return brutos
+
+
+# Estados possíveis de uma página de resultados já carregada
+PAGINA_RESULTADOS = 'resultados'
+PAGINA_VAZIA = 'vazia'
+PAGINA_CAPTCHA = 'captcha'
+
+_SELETOR_CAPTCHA = '#gs_captcha_ccl, #captcha-form, form[action*="sorry"], iframe[src*="recaptcha"]'
+
+# Retorna o estado da página ou null enquanto ela ainda está carregando
+SCRIPT_ESTADO_PAGINA = """
+const [seletorResultado, seletorCaptcha] = arguments;
+if (location.href.indexOf('/sorry/') >= 0 || document.querySelector(seletorCaptcha)) {
+    return 'captcha';
+}
+if (document.querySelector(seletorResultado)) {
+    return 'resultados';
+}
+return document.readyState === 'complete' ? 'vazia' : null;
+"""
+
+
+def estado_pagina_driver(driver):
+    """Estado da página aberta no navegador (None se ainda não está pronta)"""
+    return driver.execute_script(SCRIPT_ESTADO_PAGINA, GOOGLE_SCHOLAR_CONFIG['RESULT_SELECTOR'], _SELETOR_CAPTCHA)
+
+
+def estado_pagina_html(html):
+    """Estado de uma página a partir do HTML completo"""
+    construtor = _ConstrutorArvore()
+    construtor.feed(html)
+    construtor.close()
+    raiz = construtor.raiz
+
+    for no in raiz.descendentes():
+        if no.atributos.get('id') in ('gs_captcha_ccl', 'captcha-form'):
+            return PAGINA_CAPTCHA
+        if no.tag == 'form' and 'sorry' in (no.atributos.get('action') or ''):
+            return PAGINA_CAPTCHA
+        if no.tag == 'iframe' and 'recaptcha' in (no.atributos.get('src') or ''):
+            return PAGINA_CAPTCHA
+    if _selecionar_primeiro(raiz, GOOGLE_SCHOLAR_CONFIG['RESULT_SELECTOR']) is not None:
+        return PAGINA_RESULTADOS
+    return PAGINA_VAZIA
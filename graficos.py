@@ -0,0 +1,450 @@
+"""
+Preparação dos dados e renderização dos gráficos da página de resultados
+
+Os dados de cada gráfico são agregados no processo do Flask (consultas SQL e índice de
+termos) e a renderização roda em um pool de processos, um gráfico por tarefa. Os
+renderizadores usam a API orientada a objetos do matplotlib (Figure), sem o estado
+global do pyplot, então gerações simultâneas não interferem umas nas outras.
+
+O matplotlib só é importado nos processos de renderização, nunca ao importar o módulo.
+A duração de cada renderização é medida no processo filho e registrada nas métricas
+(span grafico) pelo processo do Flask.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import colunar
+import indice_termos
+import metricas
+import temas
+from config import DATABASE_CONFIG, PLOT_CONFIG
+from preprocessamento import carregar_stopwords
+from sentimento import obter_analisador
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+_pool = None
+_lock_pool = threading.Lock()
+
+# Estilo comum a todos os gráficos
+_ESTILO = {'font.family': 'DejaVu Sans', 'font.size': 10}
+
+# Entra no nome dos arquivos: mude ao alterar um renderizador para não servir imagens antigas
+VERSAO_RENDER = 1
+
+
+def _filtro_canonicos(execucao_id):
+    """Só o artigo canônico de cada grupo de quase-duplicatas, opcionalmente de uma execução"""
+    filtro = " AND (cluster_id IS NULL OR cluster_id = id)"
+    if execucao_id is None:
+        return filtro, ()
+    return (f"{filtro} AND id IN (SELECT COALESCE(r.cluster_id, r.id) FROM artigo_topicos a "
+            f"JOIN {TABELA} r ON r.id = a.artigo_id WHERE a.execucao_id = ?)", (execucao_id,))
+
+
+@metricas.cronometrado('preprocessamento', etapa='agregacao_graficos')
+def preparar_dados(conn, execucao_id=None, stopwords=None):
+    """Agrega os dados de todos os gráficos; retorna None se não há artigos
+
+    As contagens são por grupo de quase-duplicatas (duplicatas.py), não por linha. Os
+    resumos e as contagens por ano e por tópico saem do snapshot colunar (colunar.py)
+    quando disponível e do banco quando não.
+    """
+    import pandas as pd
+
+    filtro, parametros = _filtro_canonicos(execucao_id)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {TABELA} WHERE 1 = 1{filtro}", parametros)
+    if cursor.fetchone()[0] == 0:
+        return None
+
+    dados = {}
+    ano_atual = time.localtime().tm_year
+    snapshot = colunar.abrir(conn)
+
+    # Frequências de termos direto do índice (agregação SQL, sem varrer o texto)
+    stopwords = carregar_stopwords() if stopwords is None else stopwords
+    frequencias = indice_termos.top_termos(conn, 100, stopwords, execucao_id)
+    dados['wordcloud'] = frequencias
+    dados['top_palavras'] = frequencias[:20]
+
+    # Sentimento dos resumos (léxico de TEXT_ANALYSIS_CONFIG)
+    if snapshot is not None:
+        resumos = snapshot.resumos(execucao_id)
+    else:
+        resumos = pd.read_sql_query(
+            f"SELECT id, resumo FROM {TABELA} WHERE 1 = 1{filtro}", conn, params=parametros
+        )['resumo']
+    pontuacoes = obter_analisador().pontuar(resumos)
+    dados['sentimentos'] = {
+        rotulo: int(total) for rotulo, total in pontuacoes['sentimento'].value_counts().items()
+    }
+
+    # Publicações por ano
+    if snapshot is not None:
+        dados['temporal'] = snapshot.publicacoes_por_ano(ano_atual, execucao_id)
+    else:
+        cursor.execute(
+            f"SELECT ano_publicacao, COUNT(*) FROM {TABELA} "
+            f"WHERE ano_publicacao BETWEEN 1900 AND ?{filtro} GROUP BY ano_publicacao ORDER BY ano_publicacao",
+            (ano_atual, *parametros)
+        )
+        dados['temporal'] = [(int(ano), total) for ano, total in cursor.fetchall()]
+
+    # Tendências por tópico: um artigo (ou grupo de duplicatas) encontrado em vários tópicos
+    # conta uma vez em cada um
+    if snapshot is not None:
+        linhas = snapshot.topicos_por_ano(ano_atual, execucao_id)
+    else:
+        filtro_topicos = " AND t.execucao_id = ?" if execucao_id is not None else ''
+        cursor.execute(
+            "SELECT r.ano_publicacao, t.termo, COUNT(DISTINCT COALESCE(r.cluster_id, r.id)) FROM artigo_topicos t "
+            f"JOIN {TABELA} r ON r.id = t.artigo_id "
+            f"WHERE r.ano_publicacao BETWEEN 1900 AND ?{filtro_topicos} "
+            "GROUP BY r.ano_publicacao, t.termo",
+            (ano_atual, *parametros)
+        )
+        linhas = cursor.fetchall()
+    if linhas:
+        tabela = pd.DataFrame(linhas, columns=['ano', 'termo', 'artigos']).pivot_table(
+            index='ano', columns='termo', values='artigos', fill_value=0, aggfunc='sum'
+        )
+        # Limitar a 10 tópicos mais frequentes para melhor visualização
+        top_topicos = tabela.sum().sort_values(ascending=False).head(10).index
+        dados['tendencias'] = {
+            'anos': [int(ano) for ano in tabela.index],
+            'series': {topico: [int(v) for v in tabela[topico]] for topico in top_topicos},
+        }
+    else:
+        dados['tendencias'] = None
+
+    # Temas descobertos pelo LDA: fração dos artigos de cada ano por tema dominante
+    dados['temas'] = None
+    prevalencia = temas.prevalencia_por_ano(conn, execucao_id)
+    if prevalencia:
+        rotulos = {t['tema']: f"{t['tema']}: {', '.join(t['palavras'][:3])}" for t in temas.listar_temas(conn)}
+        tabela = pd.DataFrame(prevalencia, columns=['ano', 'tema', 'artigos']).pivot_table(
+            index='ano', columns='tema', values='artigos', fill_value=0, aggfunc='sum'
+        )
+        fracoes = tabela.div(tabela.sum(axis=1), axis=0)
+        dados['temas'] = {
+            'anos': [int(ano) for ano in fracoes.index],
+            'series': {rotulos.get(tema, str(tema)): [round(float(v), 4) for v in fracoes[tema]]
+                       for tema in fracoes.columns},
+        }
+
+    return dados
+
+
+def _nova_figura(figsize):
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=figsize)
+
+
+def _salvar(fig, caminho, formato=None, dpi=None):
+    # Grava em arquivo temporário e troca de uma vez, para nunca servir uma imagem pela metade
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    fig.savefig(temporario, format=formato or PLOT_CONFIG['SAVE_FORMAT'], dpi=dpi or PLOT_CONFIG['DPI'],
+                bbox_inches='tight', facecolor='white')
+    os.replace(temporario, caminho)
+
+
+def renderizar_wordcloud(frequencias):
+    from wordcloud import WordCloud
+
+    if not frequencias:
+        return None
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color='white',
+        colormap='viridis',
+        max_words=100,
+        relative_scaling=0.5
+    ).generate_from_frequencies(dict(frequencias))
+    fig = _nova_figura((12, 6))
+    ax = fig.add_subplot()
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis('off')
+    ax.set_title('Nuvem de Palavras-Chave', fontsize=16, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def renderizar_sentimentos(contagens):
+    if not contagens:
+        return None
+    cores = {'Positivo': '#28a745', 'Negativo': '#dc3545', 'Neutro': '#6c757d'}
+    rotulos = list(contagens)
+    fig = _nova_figura((10, 6))
+    ax = fig.add_subplot()
+    ax.pie([contagens[r] for r in rotulos], labels=rotulos, autopct='%1.1f%%',
+           colors=[cores.get(r, '#6c757d') for r in rotulos], startangle=90)
+    ax.set_title('Análise de Sentimento dos Resumos', fontsize=16, fontweight='bold')
+    ax.axis('equal')
+    fig.tight_layout()
+    return fig
+
+
+def renderizar_temporal(anos_contagem):
+    if not anos_contagem:
+        return None
+    anos, valores = zip(*anos_contagem)
+    fig = _nova_figura((12, 6))
+    ax = fig.add_subplot()
+    ax.bar(anos, valores, color='skyblue', edgecolor='navy', alpha=0.7)
+    ax.set_title('Publicações por Ano', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Ano', fontsize=12)
+    ax.set_ylabel('Número de Artigos', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(axis='y', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for ano, valor in anos_contagem:
+        ax.text(ano, valor + 0.1, str(valor), ha='center', va='bottom', fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+def renderizar_tendencias(tendencias):
+    if not tendencias or not tendencias['series']:
+        return None
+    fig = _nova_figura((14, 8))
+    ax = fig.add_subplot()
+    for topico, valores in tendencias['series'].items():
+        ax.plot(tendencias['anos'], valores, marker='o', linewidth=2, markersize=6, label=topico)
+    ax.set_title('Tendência de Tópicos por Ano', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Ano', fontsize=12)
+    ax.set_ylabel('Quantidade de Artigos', fontsize=12)
+    ax.legend(title='Tópico', bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def renderizar_top_palavras(palavras_freq):
+    if not palavras_freq:
+        return None
+    from matplotlib import colormaps
+
+    palavras, frequencias = zip(*palavras_freq)
+    fig = _nova_figura((12, 8))
+    ax = fig.add_subplot()
+    cores = colormaps['viridis'](range(len(palavras)))
+    barras = ax.barh(range(len(palavras)), frequencias, color=cores)
+    ax.set_yticks(range(len(palavras)), palavras)
+    ax.set_title('Top 20 Palavras Mais Frequentes', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Frequência', fontsize=12)
+    ax.invert_yaxis()
+    ax.grid(axis='x', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for i, (barra, freq) in enumerate(zip(barras, frequencias)):
+        ax.text(freq + max(frequencias) * 0.01, i, str(freq), va='center', ha='left', fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+def renderizar_temas(prevalencia):
+    if not prevalencia or not prevalencia['series']:
+        return None
+    fig = _nova_figura((14, 8))
+    ax = fig.add_subplot()
+    rotulos = list(prevalencia['series'])
+    ax.stackplot(prevalencia['anos'], [[v * 100 for v in prevalencia['series'][r]] for r in rotulos],
+                 labels=rotulos, alpha=0.85)
+    ax.set_title('Prevalência dos Temas por Ano (LDA)', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Ano', fontsize=12)
+    ax.set_ylabel('% dos Artigos do Ano', fontsize=12)
+    ax.set_ylim(0, 100)
+    ax.legend(title='Tema', bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+RENDERIZADORES = {
+    'wordcloud': renderizar_wordcloud,
+    'sentimentos': renderizar_sentimentos,
+    'temporal': renderizar_temporal,
+    'tendencias': renderizar_tendencias,
+    'top_palavras': renderizar_top_palavras,
+    'temas': renderizar_temas,
+}
+
+
+def renderizar(nome, dados, caminho, formato=None, dpi=None):
+    """Renderiza um gráfico (executado nos processos do pool); False se não há dados
+
+    Formato e resolução padrão: PLOT_CONFIG['SAVE_FORMAT'] e PLOT_CONFIG['DPI'].
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Use backend não-interativo
+
+    with matplotlib.rc_context(_ESTILO):
+        fig = RENDERIZADORES[nome](dados)
+        if fig is None:
+            return False
+        _salvar(fig, caminho, formato, dpi)
+        return True
+
+
+def _renderizar_medido(nome, dados, caminho, formato=None, dpi=None):
+    """renderizar() no processo do pool, devolvendo (gerado, segundos) para as métricas"""
+    inicio = time.perf_counter()
+    gerado = renderizar(nome, dados, caminho, formato, dpi)
+    return gerado, time.perf_counter() - inicio
+
+
+def _obter_pool():
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            # 'spawn' evita herdar por fork o estado das threads do Flask
+            _pool = ProcessPoolExecutor(
+                max_workers=PLOT_CONFIG['WORKERS'], mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _descartar_pool(pool):
+    """Descarta um pool quebrado (processo filho morto) para que o próximo job crie outro"""
+    global _pool
+    with _lock_pool:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def nome_arquivo(nome, fingerprint, formato=None, dpi=None):
+    """Nome do arquivo de um gráfico, derivado dos dados (fingerprint) e dos parâmetros
+
+    Os mesmos dados e parâmetros dão sempre o mesmo nome, e qualquer mudança dá um nome
+    novo: o arquivo nunca é reescrito com outro conteúdo, então pode ficar em cache para
+    sempre, e gerações simultâneas de escopos diferentes não se sobrescrevem.
+    """
+    formato = formato or PLOT_CONFIG['SAVE_FORMAT']
+    dpi = dpi or PLOT_CONFIG['DPI']
+    parametros = f"{VERSAO_RENDER}:{nome}:{fingerprint}:{formato}:{dpi}:{sorted(_ESTILO.items())}"
+    resumo = hashlib.sha256(parametros.encode('utf-8')).hexdigest()[:20]
+    return f"{nome}-{resumo}.{formato}"
+
+
+def etag_arquivo(arquivo):
+    """ETag de um arquivo gerado por nome_arquivo: o resumo embutido no nome"""
+    return os.path.splitext(arquivo)[0].rpartition('-')[2]
+
+
+def renderizar_todos(dados, plots_dir, fingerprint):
+    """Renderiza os gráficos em paralelo e retorna {nome: caminho relativo a static/}
+
+    Gráficos cujo arquivo já existe (mesmo fingerprint e parâmetros) não são renderizados
+    de novo; o mtime é renovado para a coleta de lixo saber que continuam em uso.
+    """
+    pool = _obter_pool()
+    futuros = {}
+    graficos = {}
+    for nome in RENDERIZADORES:
+        arquivo = nome_arquivo(nome, fingerprint)
+        caminho = os.path.join(plots_dir, arquivo)
+        try:
+            os.utime(caminho)
+            graficos[nome] = f"plots/{arquivo}"
+            continue
+        except FileNotFoundError:
+            pass
+        futuros[nome] = (arquivo, pool.submit(_renderizar_medido, nome, dados.get(nome), caminho))
+
+    for nome, (arquivo, futuro) in futuros.items():
+        try:
+            gerado, segundos = futuro.result()
+            metricas.observar('grafico', segundos, grafico=nome)
+            if gerado:
+                graficos[nome] = f"plots/{arquivo}"
+                print(f"📈 Gráfico '{nome}' gerado com sucesso!")
+        except BrokenProcessPool as e:
+            print(f"Erro ao gerar gráfico '{nome}': {e}")
+            _descartar_pool(pool)
+        except Exception as e:
+            print(f"Erro ao gerar gráfico '{nome}': {e}")
+    return {nome: graficos[nome] for nome in RENDERIZADORES if nome in graficos}
+
+
+def coletar_lixo(plots_dir, em_uso=(), idade_maxima=None):
+    """Apaga as renderizações sem uso há mais de idade_maxima segundos
+
+    Padrão: PLOT_CONFIG['GC_MAX_AGE']. Arquivos em em_uso (nomes) são mantidos; os
+    temporários de renderizações interrompidas também são apagados. Retorna o total removido.
+    """
+    if idade_maxima is None:
+        idade_maxima = PLOT_CONFIG['GC_MAX_AGE']
+    limite = time.time() - idade_maxima
+    removidos = 0
+    with os.scandir(plots_dir) as entradas:
+        for entrada in entradas:
+            if entrada.name in em_uso or not entrada.is_file():
+                continue
+            try:
+                if entrada.stat().st_mtime < limite:
+                    os.remove(entrada.path)
+                    removidos += 1
+            except FileNotFoundError:
+                pass  # Outra coleta chegou antes
+    if removidos:
+        print(f"🧹 {removidos} gráficos antigos removidos de {plots_dir}")
+    return removidos
+
+
+def exportar(nome, dados, formato, dpi):
+    """Renderiza um gráfico sob demanda no formato e resolução pedidos
+
+    Retorna o conteúdo do arquivo, ou None se não há dados para o gráfico. Formato fora
+    de PLOT_CONFIG['EXPORT_FORMATS'] ou dpi fora de 1..EXPORT_MAX_DPI levantam ValueError.
+    """
+    if formato not in PLOT_CONFIG['EXPORT_FORMATS']:
+        raise ValueError(f"Formato inválido: {formato}")
+    if not 1 <= dpi <= PLOT_CONFIG['EXPORT_MAX_DPI']:
+        raise ValueError(f"Resolução inválida: {dpi} (máximo {PLOT_CONFIG['EXPORT_MAX_DPI']} dpi)")
+
+    descritor, caminho = tempfile.mkstemp(prefix=f"{nome}_", suffix=f".{formato}")
+    os.close(descritor)
+    pool = _obter_pool()
+    try:
+        gerado, segundos = pool.submit(_renderizar_medido, nome, dados.get(nome), caminho, formato, dpi).result()
+        metricas.observar('grafico', segundos, grafico=nome, formato=formato)
+        if not gerado:
+            return None
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+    except BrokenProcessPool:
+        _descartar_pool(pool)
+        raise
+    finally:
+        os.remove(caminho)
+
+
+def agregados_json(dados, top=20):
+    """Dados dos gráficos no formato compacto de /api/analises
+
+    Séries em colunas (anos e valores em listas paralelas) e termos como pares
+    [termo, frequência]; top limita as palavras mais frequentes (a nuvem leva todas).
+    """
+    anos, artigos = (list(coluna) for coluna in zip(*dados['temporal'])) if dados['temporal'] else ([], [])
+    return {
+        'por_ano': {'anos': anos, 'artigos': artigos},
+        'topicos_por_ano': dados['tendencias'],
+        'sentimentos': dados['sentimentos'],
+        'top_palavras': dados['wordcloud'][:top],
+        'nuvem': dados['wordcloud'],
+        'temas': dados['temas'],
+    }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Importação em massa de artigos para o banco de resultados
+
+Carrega arquivos CSV ou JSONL exportados anteriormente (as mesmas colunas de
+resultados_detalhados_CQ) e reconstrói o corpus a partir das páginas guardadas no cache
+em disco. Tudo passa pelo banco.EscritorLote: lotes grandes, executemany e uma transação
+por lote. Cada importação é registrada como uma execução.
+
+Uso:
+    python importacao.py arquivo.csv [arquivo2.jsonl ...] [--termo TOPICO] [--sem-indice] [--sem-temas]
+    python importacao.py --cache
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import banco
+import colunar
+import duplicatas
+import indice_termos
+import temas
+from config import DATABASE_CONFIG, EXPORT_CONFIG, TOPIC_MODEL_CONFIG
+from extrator_scholar import extrair_resultados_html, processar_resultado
+
+
+def _ler_csv(caminho):
+    with open(caminho, encoding=EXPORT_CONFIG['CSV_ENCODING'], newline='') as arquivo:
+        yield from csv.DictReader(arquivo, delimiter=EXPORT_CONFIG['CSV_SEPARATOR'])
+
+
+def _ler_jsonl(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ Linha {numero} ignorada em {caminho}: {e}")
+
+
+def _ano(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _gravar(registros, descricao, indexar=True):
+    """Grava (linha, termo) em lotes sob uma nova execução; retorna as estatísticas"""
+    inicio = time.perf_counter()
+    with banco.conexao() as conn:
+        execucao_id = banco.iniciar_execucao(conn, [descricao], None, None)
+        escritor = banco.EscritorLote(
+            conn, execucao_id, tamanho_lote=DATABASE_CONFIG['IMPORT_BATCH_SIZE'], intervalo=float('inf'),
+            indexar=False
+        )
+        try:
+            for linha, termo in registros:
+                escritor.adicionar(linha, termo)
+            escritor.descarregar()
+        except Exception:
+            banco.finalizar_execucao(conn, execucao_id, 'erro')
+            raise
+        duracao_gravacao = time.perf_counter() - inicio
+
+        # Agrupamento de duplicatas e índice de termos depois, em lotes, sobre os artigos novos
+        if indexar:
+            duplicatas.agrupar_pendentes(conn, tamanho_lote=5000)
+        indexados = indice_termos.reindexar_pendentes(conn, tamanho_lote=5000) if indexar else 0
+        banco.finalizar_execucao(conn, execucao_id, 'importado')
+
+        # Snapshot colunar das análises; sem ele em dia, os gráficos leem o banco até a
+        # próxima atualização (colunar.abrir não atualiza)
+        try:
+            colunar.atualizar(conn)
+        except Exception as e:
+            print(f"⚠️ Erro ao atualizar o snapshot colunar: {e}")
+
+    duracao = time.perf_counter() - inicio
+    estatisticas = {
+        'execucao_id': execucao_id,
+        'linhas': escritor.salvos,
+        'novos': escritor.novos,
+        'repetidos': escritor.salvos - escritor.novos,
+        'indexados': indexados,
+        'segundos_gravacao': round(duracao_gravacao, 3),
+        'segundos_total': round(duracao, 3),
+        'linhas_por_segundo': round(escritor.salvos / duracao_gravacao) if duracao_gravacao else None,
+    }
+    print(f"📥 {descricao}: {escritor.salvos} linhas ({escritor.novos} novas) "
+          f"em {duracao_gravacao:.2f}s, {estatisticas['linhas_por_segundo']} linhas/s")
+    return estatisticas
+
+
+def importar_arquivo(caminho, termo=None, indexar=True):
+    """Importa um CSV ou JSONL (formato pela extensão)
+
+    As linhas precisam de ao menos 'titulo'; 'termo' vem da própria linha, do parâmetro
+    termo ou, na falta dos dois, do nome do arquivo. Com indexar=False os artigos ficam
+    pendentes no índice de termos até o próximo banco.migrar_pendentes (inicialização
+    do app ou desta linha de comando).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.csv':
+        leitor = _ler_csv(caminho)
+    elif extensao in ('.jsonl', '.ndjson'):
+        leitor = _ler_jsonl(caminho)
+    else:
+        raise ValueError(f"Formato não suportado: {extensao} (use .csv, .jsonl ou .ndjson)")
+
+    termo_padrao = termo or os.path.splitext(os.path.basename(caminho))[0]
+
+    def registros():
+        for linha in leitor:
+            if not linha.get('titulo'):
+                continue
+            linha['ano_publicacao'] = _ano(linha.get('ano_publicacao'))
+            yield linha, linha.get('termo') or termo_padrao
+
+    return _gravar(registros(), f"importação: {os.path.basename(caminho)}", indexar)
+
+
+def reconstruir_do_cache(indexar=True):
+    """Reprocessa todas as páginas válidas do cache em disco e grava os artigos delas
+
+    O tópico de cada artigo é o parâmetro q da URL da página.
+    """
+    import cache_paginas
+
+    cache = cache_paginas.obter_cache()
+    if cache is None:
+        raise RuntimeError("Cache de páginas desativado (PAGE_CACHE_CONFIG['ENABLED'])")
+
+    def registros():
+        for url, html in cache.iterar_paginas():
+            termo = parse_qs(urlsplit(url).query).get('q', ['cache'])[0]
+            for bruto in extrair_resultados_html(html):
+                linha = processar_resultado(bruto)
+                if linha['titulo']:
+                    yield linha, termo
+
+    return _gravar(registros(), "reconstrução a partir do cache", indexar)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('arquivos', nargs='*', help='arquivos .csv, .jsonl ou .ndjson')
+    parser.add_argument('--termo', help='tópico das linhas que não têm a coluna termo')
+    parser.add_argument('--cache', action='store_true', help='reconstrói o corpus a partir do cache de páginas')
+    parser.add_argument('--sem-indice', action='store_true', help='não monta o índice de termos agora')
+    parser.add_argument('--sem-temas', action='store_true', help='não atualiza o modelo de temas agora')
+    args = parser.parse_args()
+
+    if not args.arquivos and not args.cache:
+        parser.error('informe arquivos ou --cache')
+    if not args.sem_indice:
+        with banco.conexao() as conn:
+            banco.migrar_pendentes(conn)
+    for caminho in args.arquivos:
+        print(json.dumps(importar_arquivo(caminho, args.termo, not args.sem_indice), ensure_ascii=False))
+    if args.cache:
+        print(json.dumps(reconstruir_do_cache(not args.sem_indice), ensure_ascii=False))
+    if TOPIC_MODEL_CONFIG['ENABLED'] and not (args.sem_indice or args.sem_temas):
+        with banco.conexao() as conn:
+            print(json.dumps(temas.atualizar(conn), ensure_ascii=False))
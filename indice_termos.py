@@ -0,0 +1,199 @@
+"""
+Índice de termos por artigo, mantido no SQLite durante a ingestão
+
+Cada artigo canônico (ver duplicatas.py) é tokenizado uma única vez ao ser gravado: termos(artigo_id, termo, freq)
+guarda a contagem por artigo e frequencia_termos(termo, df, total) a frequência global
+(documentos e ocorrências). As análises viram agregações SQL indexadas em vez de varrer
+o texto de todo o corpus.
+
+As stopwords não são removidas no índice, e sim na consulta, para que mudanças na
+lista não exijam reindexação.
+"""
+
+from collections import Counter
+
+from config import DATABASE_CONFIG
+from preprocessamento import tokenizar
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+
+def criar_tabelas(cursor):
+    """Cria as tabelas do índice (chamado por banco.criar_esquema)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS termos (
+            artigo_id INTEGER NOT NULL,
+            termo TEXT NOT NULL,
+            freq INTEGER NOT NULL,
+            PRIMARY KEY (artigo_id, termo)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_termos_termo ON termos(termo, artigo_id, freq)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS frequencia_termos (
+            termo TEXT PRIMARY KEY,
+            df INTEGER NOT NULL,
+            total INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_frequencia_termos_total ON frequencia_termos(total DESC)")
+
+
+def indexar_lote(cursor, artigos):
+    """Indexa vários artigos (artigo_id, titulo, resumo) de uma vez
+
+    As frequências globais são somadas em memória e gravadas com um único upsert por termo.
+    Cada artigo entra uma única vez (os chamadores só indexam artigos com indexado = 0, na
+    mesma transação que marca a coluna): indexar de novo um artigo somaria os termos dele
+    duas vezes nas frequências globais, então a chave duplicada em termos é um erro.
+    Para reindexar, tire o artigo antes com remover_artigos().
+    """
+    linhas_termos = []
+    globais = {}
+    for artigo_id, titulo, resumo in artigos:
+        contagem = Counter(tokenizar(f"{titulo or ''} {resumo or ''}"))
+        for termo, freq in contagem.items():
+            linhas_termos.append((artigo_id, termo, freq))
+            df, total = globais.get(termo, (0, 0))
+            globais[termo] = (df + 1, total + freq)
+    if not linhas_termos:
+        return
+    cursor.executemany(
+        "INSERT INTO termos (artigo_id, termo, freq) VALUES (?, ?, ?)", linhas_termos
+    )
+    cursor.executemany(
+        "INSERT INTO frequencia_termos (termo, df, total) VALUES (?, ?, ?) "
+        "ON CONFLICT(termo) DO UPDATE SET df = df + excluded.df, total = total + excluded.total",
+        [(termo, df, total) for termo, (df, total) in globais.items()]
+    )
+
+
+def reindexar_pendentes(conn, tamanho_lote=1000):
+    """Indexa os artigos gravados antes do índice existir (coluna indexado = 0)
+
+    Quase-duplicatas já agrupadas (cluster_id apontando para outro artigo) são marcadas
+    como indexadas sem entrar no índice: as análises contam o artigo canônico do grupo.
+    """
+    cursor = conn.cursor()
+    total = 0
+    ultimo_id = 0
+    while True:
+        # Avança pela chave primária para não reler as linhas já indexadas
+        cursor.execute(
+            f"SELECT id, titulo, resumo, cluster_id IS NULL OR cluster_id = id FROM {TABELA} "
+            "WHERE id > ? AND indexado = 0 ORDER BY id LIMIT ?",
+            (ultimo_id, tamanho_lote)
+        )
+        linhas = cursor.fetchall()
+        if not linhas:
+            break
+        ultimo_id = linhas[-1][0]
+        indexar_lote(cursor, [linha[:3] for linha in linhas if linha[3]])
+        cursor.executemany(
+            f"UPDATE {TABELA} SET indexado = 1 WHERE id = ?",
+            [(linha[0],) for linha in linhas]
+        )
+        conn.commit()
+        total += len(linhas)
+    if total:
+        print(f"🗂️ {total} artigos adicionados ao índice de termos")
+    return total
+
+
+def remover_artigos(cursor, artigo_ids):
+    """Tira artigos do índice, descontando os termos deles das frequências globais"""
+    if not artigo_ids:
+        return
+    globais = {}
+    for inicio in range(0, len(artigo_ids), 500):
+        parte = artigo_ids[inicio:inicio + 500]
+        cursor.execute(
+            f"SELECT termo, freq FROM termos WHERE artigo_id IN ({','.join('?' * len(parte))})", parte
+        )
+        for termo, freq in cursor.fetchall():
+            df, total = globais.get(termo, (0, 0))
+            globais[termo] = (df + 1, total + freq)
+    cursor.executemany(
+        "UPDATE frequencia_termos SET df = df - ?, total = total - ? WHERE termo = ?",
+        [(df, total, termo) for termo, (df, total) in globais.items()]
+    )
+    cursor.execute("DELETE FROM frequencia_termos WHERE df <= 0")
+    cursor.executemany("DELETE FROM termos WHERE artigo_id = ?", [(artigo_id,) for artigo_id in artigo_ids])
+
+
+def limpar(cursor):
+    """Apaga o índice inteiro (usado quando todos os artigos são removidos)"""
+    cursor.execute("DELETE FROM termos")
+    cursor.execute("DELETE FROM frequencia_termos")
+
+
+def _filtro_execucao(execucao_id, coluna='artigo_id'):
+    # Artigos da execução mapeados para o canônico do grupo (só ele está no índice)
+    if execucao_id is None:
+        return '', ()
+    return (f" AND {coluna} IN (SELECT COALESCE(r.cluster_id, r.id) FROM artigo_topicos a "
+            f"JOIN {TABELA} r ON r.id = a.artigo_id WHERE a.execucao_id = ?)",
+            (execucao_id,))
+
+
+def top_termos(conn, n, stopwords=(), execucao_id=None):
+    """Os n termos mais frequentes como lista de (termo, ocorrências)"""
+    cursor = conn.cursor()
+    stopwords = set(stopwords)
+
+    if execucao_id is None:
+        # Histórico completo: percorre o índice por total decrescente, pulando stopwords
+        cursor.execute("SELECT termo, total FROM frequencia_termos ORDER BY total DESC")
+        resultado = []
+        for termo, total in cursor:
+            if termo in stopwords:
+                continue
+            resultado.append((termo, total))
+            if len(resultado) >= n:
+                break
+        return resultado
+
+    filtro, parametros = _filtro_execucao(execucao_id)
+    marcadores = ','.join('?' * len(stopwords))
+    filtro_stopwords = f" AND termo NOT IN ({marcadores})" if stopwords else ''
+    cursor.execute(
+        f"SELECT termo, SUM(freq) AS total FROM termos WHERE 1 = 1{filtro}{filtro_stopwords} "
+        "GROUP BY termo ORDER BY total DESC LIMIT ?",
+        (*parametros, *stopwords, n)
+    )
+    return cursor.fetchall()
+
+
+def tendencia_termos(conn, termos, execucao_id=None):
+    """Ocorrências por ano de cada termo: lista de (ano, termo, ocorrências, artigos)"""
+    if not termos:
+        return []
+    cursor = conn.cursor()
+    filtro, parametros = _filtro_execucao(execucao_id, 't.artigo_id')
+    marcadores = ','.join('?' * len(termos))
+    cursor.execute(
+        "SELECT r.ano_publicacao, t.termo, SUM(t.freq), COUNT(*) "
+        f"FROM termos t JOIN {TABELA} r ON r.id = t.artigo_id "
+        f"WHERE t.termo IN ({marcadores}) AND r.ano_publicacao IS NOT NULL{filtro} "
+        "GROUP BY r.ano_publicacao, t.termo ORDER BY r.ano_publicacao, t.termo",
+        (*termos, *parametros)
+    )
+    return cursor.fetchall()
+
+
+def top_termos_por_topico(conn, topico, n, stopwords=(), execucao_id=None):
+    """Os n termos mais frequentes entre os artigos de um tópico de busca"""
+    cursor = conn.cursor()
+    stopwords = list(stopwords)
+    marcadores = ','.join('?' * len(stopwords))
+    filtro_stopwords = f" AND termo NOT IN ({marcadores})" if stopwords else ''
+    filtro_execucao = " AND a.execucao_id = ?" if execucao_id is not None else ''
+    parametros_execucao = (execucao_id,) if execucao_id is not None else ()
+    cursor.execute(
+        "SELECT termo, SUM(freq) AS total FROM termos "
+        "WHERE artigo_id IN (SELECT COALESCE(r.cluster_id, r.id) FROM artigo_topicos a "
+        f"JOIN {TABELA} r ON r.id = a.artigo_id WHERE a.termo = ?{filtro_execucao})"
+        f"{filtro_stopwords} GROUP BY termo ORDER BY total DESC LIMIT ?",
+        (topico, *parametros_execucao, *stopwords, n)
+    )
+    return cursor.fetchall()
@@ -0,0 +1,167 @@
+"""
+Registro de jobs em segundo plano (buscas e geração de gráficos)
+
+Cada job tem um id e um estado próprio protegido por lock. Toda alteração incrementa a
+versão do estado e acorda quem espera por ela, o que permite transmitir o progresso
+por Server-Sent Events sem polling: /eventos/<job_id> bloqueia em aguardar_mudanca().
+"""
+
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Estados finais: o job não muda mais depois deles
+STATUS_FINAIS = ('concluido', 'erro', 'cancelado')
+
+# Jobs finalizados mantidos no registro antes de descartar os mais antigos
+MAXIMO_JOBS = 100
+
+
+def finalizado(status):
+    """True para 'concluido', 'cancelado' e 'erro' / 'erro: <mensagem>'"""
+    return status in STATUS_FINAIS or str(status).startswith('erro')
+
+
+class Job:
+    """Estado de um job, atualizado por threads de trabalho e lido pelas rotas"""
+
+    def __init__(self, tipo, estado_inicial=None, **parametros):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.parametros = parametros
+        self.criado_em = time.time()
+        self._inicio = time.monotonic()
+        self._condicao = threading.Condition()
+        self._versao = 0
+        self._cancelamento = threading.Event()
+        self._ao_cancelar = []
+        self._estado = {'status': 'na fila', 'progresso': 0}
+        if estado_inicial:
+            self._estado.update(estado_inicial)
+
+    @contextmanager
+    def editar(self):
+        """with job.editar() as estado: ... — alteração atômica que notifica os assinantes"""
+        with self._condicao:
+            yield self._estado
+            self._versao += 1
+            self._condicao.notify_all()
+
+    def atualizar(self, **campos):
+        with self.editar() as estado:
+            estado.update(campos)
+
+    @property
+    def status(self):
+        with self._condicao:
+            return self._estado['status']
+
+    @property
+    def finalizado(self):
+        return finalizado(self.status)
+
+    @property
+    def cancelamento_solicitado(self):
+        return self._cancelamento.is_set()
+
+    def ao_cancelar(self, callback):
+        """Registra como interromper o trabalho quando cancelar() for chamado"""
+        with self._condicao:
+            self._ao_cancelar.append(callback)
+
+    def cancelar(self):
+        """Pede o cancelamento; retorna False se o job já terminou
+
+        Quem executa o job para o trabalho (callbacks de ao_cancelar) e marca o status
+        'cancelado' quando de fato parar.
+        """
+        with self.editar() as estado:
+            if finalizado(estado['status']):
+                return False
+            self._cancelamento.set()
+            estado['cancelamento_solicitado'] = True
+            callbacks = list(self._ao_cancelar)
+        for callback in callbacks:
+            callback()
+        return True
+
+    def _instantaneo(self):
+        estado = copy.deepcopy(self._estado)
+        decorrido = time.monotonic() - self._inicio
+        estado.update({'job_id': self.id, 'tipo': self.tipo, 'decorrido': round(decorrido, 1)})
+
+        # Vazão e previsão de término a partir dos resultados já coletados
+        coletados = estado.get('total_resultados')
+        if coletados and decorrido > 0:
+            vazao = coletados / decorrido
+            estado['linhas_por_segundo'] = round(vazao, 2)
+            if 'restantes' in estado and not finalizado(estado['status']):
+                estado['eta_segundos'] = round(estado['restantes'] / vazao, 1)
+        return estado
+
+    def instantaneo(self):
+        """Cópia do estado com id, tipo, tempo decorrido, vazão e ETA"""
+        with self._condicao:
+            return self._instantaneo()
+
+    def aguardar_mudanca(self, versao, timeout):
+        """Espera o estado passar da `versao` informada (ou o timeout)
+
+        Retorna (instantâneo, versão atual); o instantâneo é None se nada mudou.
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._versao != versao, timeout)
+            if self._versao == versao:
+                return None, versao
+            return self._instantaneo(), self._versao
+
+
+class RegistroJobs:
+    """Jobs por id, do mais antigo para o mais recente"""
+
+    def __init__(self, maximo=MAXIMO_JOBS):
+        self.maximo = maximo
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def criar(self, tipo, estado_inicial=None, **parametros):
+        job = Job(tipo, estado_inicial, **parametros)
+        with self._lock:
+            self._descartar_antigos()
+            self._jobs[job.id] = job
+        return job
+
+    def _descartar_antigos(self):
+        for job_id in list(self._jobs):
+            if len(self._jobs) < self.maximo:
+                break
+            if self._jobs[job_id].finalizado:
+                del self._jobs[job_id]
+
+    def obter(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def listar(self, tipo=None):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if tipo is None or job.tipo == tipo]
+
+    def ultimo(self, tipo):
+        """Job mais recente de um tipo, ou None"""
+        jobs = self.listar(tipo)
+        return jobs[-1] if jobs else None
+
+    def em_andamento(self, tipo, **parametros):
+        """Job ainda não finalizado com o mesmo tipo e parâmetros, ou None"""
+        for job in reversed(self.listar(tipo)):
+            if job.parametros == parametros and not job.finalizado:
+                return job
+        return None
+
+
+# Registro compartilhado pelo app e pelos módulos de trabalho
+registro = RegistroJobs()
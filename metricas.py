@@ -0,0 +1,234 @@
+"""
+Instrumentação: spans de tempo, contadores, /metrics (texto do Prometheus), logs em
+arquivo e um perfilador por amostragem para uma requisição
+
+Os spans medem as etapas quentes (início do navegador, coleta de cada página, extração
+de cada resultado, gravação no banco, pré-processamento, renderização de cada gráfico) e
+viram um histograma cq_span_segundos com o nome da etapa no rótulo `span`. Os contadores
+(páginas coletadas, linhas gravadas, novas tentativas, CAPTCHAs...) viram cq_<nome>_total.
+Tudo fica em memória, no processo do Flask, e custa um lock e algumas somas por medição;
+com METRICS_CONFIG['ENABLED'] = False, medir() e incrementar() não fazem nada.
+
+Os gráficos são renderizados em outros processos (graficos.py): a duração volta com o
+resultado e é registrada aqui com observar().
+
+Com nível DEBUG em LOGGING_CONFIG, cada span também sai no log (logger 'cq.spans') no
+formato chave=valor.
+"""
+
+import bisect
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from config import LOGGING_CONFIG, METRICS_CONFIG
+
+PREFIXO = 'cq_'
+
+# Descrição dos contadores em /metrics (# HELP); nomes sem o prefixo e sem _total
+DESCRICOES = {
+    'paginas_coletadas': 'Páginas de resultados baixadas com sucesso, por coletor',
+    'paginas_cache': 'Páginas de resultados servidas pelo cache em disco',
+    'novas_tentativas': 'Novas tentativas de abrir uma página depois de uma falha, por coletor',
+    'captchas': 'Respostas de CAPTCHA/bloqueio do Scholar, por coletor',
+    'trocas_coletor': 'Passagens do coletor principal para o alternativo',
+    'linhas_gravadas': 'Artigos enviados ao banco (novos ou já conhecidos)',
+    'artigos_novos': 'Artigos novos gravados no banco',
+    'requisicoes_http': 'Requisições atendidas pelo Flask, por rota e status',
+}
+
+_log_spans = logging.getLogger('cq.spans')
+
+_lock = threading.Lock()
+# (nome, rótulos) -> valor
+_contadores = {}
+# (span, rótulos) -> [contagens por faixa (não acumuladas), soma, total]
+_histogramas = {}
+_logs_configurados = False
+
+
+def _rotulos(rotulos):
+    return tuple(sorted(rotulos.items())) if rotulos else ()
+
+
+def incrementar(nome, valor=1, **rotulos):
+    """Soma `valor` ao contador cq_<nome>_total com os rótulos dados"""
+    if not METRICS_CONFIG['ENABLED']:
+        return
+    chave = (nome, _rotulos(rotulos))
+    with _lock:
+        _contadores[chave] = _contadores.get(chave, 0) + valor
+
+
+def observar(span, segundos, **rotulos):
+    """Registra uma duração já medida no histograma do span"""
+    if not METRICS_CONFIG['ENABLED']:
+        return
+    chave = (span, _rotulos(rotulos))
+    faixa = bisect.bisect_left(METRICS_CONFIG['BUCKETS'], segundos)
+    with _lock:
+        histograma = _histogramas.get(chave)
+        if histograma is None:
+            histograma = _histogramas[chave] = [[0] * (len(METRICS_CONFIG['BUCKETS']) + 1), 0.0, 0]
+        histograma[0][faixa] += 1
+        histograma[1] += segundos
+        histograma[2] += 1
+    if _log_spans.isEnabledFor(logging.DEBUG):
+        extras = ''.join(f" {chave}={valor}" for chave, valor in chave[1])
+        _log_spans.debug(f"span={span} ms={segundos * 1000:.2f}{extras}")
+
+
+class _Span:
+    __slots__ = ('span', 'rotulos', 'inicio')
+
+    def __init__(self, span, rotulos):
+        self.span = span
+        self.rotulos = rotulos
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, *_):
+        rotulos = self.rotulos if tipo is None else dict(self.rotulos, erro=tipo.__name__)
+        observar(self.span, time.perf_counter() - self.inicio, **rotulos)
+        return False
+
+
+def medir(span, **rotulos):
+    """with metricas.medir('coleta_pagina', coletor='http'): ... — mede o bloco
+
+    Um bloco que termina com exceção ganha o rótulo erro=<tipo da exceção>.
+    """
+    return _Span(span, rotulos)
+
+
+def cronometrado(span, **rotulos):
+    """Decorador: mede cada chamada da função como um span"""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            with _Span(span, rotulos):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(rotulos, extra=None):
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + '}'
+
+
+def exportar_prometheus():
+    """Contadores e histogramas no formato de texto do Prometheus (versão 0.0.4)"""
+    with _lock:
+        contadores = sorted(_contadores.items())
+        histogramas = sorted((chave, (list(v[0]), v[1], v[2])) for chave, v in _histogramas.items())
+
+    linhas = []
+    anterior = None
+    for (nome, rotulos), valor in contadores:
+        metrica = f"{PREFIXO}{nome}_total"
+        if nome != anterior:
+            linhas.append(f"# HELP {metrica} {DESCRICOES.get(nome, nome)}")
+            linhas.append(f"# TYPE {metrica} counter")
+            anterior = nome
+        linhas.append(f"{metrica}{_formatar_rotulos(rotulos)} {valor}")
+
+    if histogramas:
+        metrica = f"{PREFIXO}span_segundos"
+        linhas.append(f"# HELP {metrica} Duração das etapas instrumentadas (rótulo span)")
+        linhas.append(f"# TYPE {metrica} histogram")
+        for (span, rotulos), (contagens, soma, total) in histogramas:
+            rotulos = (('span', span),) + rotulos
+            acumulado = 0
+            for limite, contagem in zip(METRICS_CONFIG['BUCKETS'], contagens):
+                acumulado += contagem
+                linhas.append(f"{metrica}_bucket{_formatar_rotulos(rotulos, ('le', repr(float(limite))))} {acumulado}")
+            linhas.append(f"{metrica}_bucket{_formatar_rotulos(rotulos, ('le', '+Inf'))} {total}")
+            linhas.append(f"{metrica}_sum{_formatar_rotulos(rotulos)} {soma!r}")
+            linhas.append(f"{metrica}_count{_formatar_rotulos(rotulos)} {total}")
+    return '\n'.join(linhas) + '\n'
+
+
+def limpar():
+    """Zera contadores e histogramas"""
+    with _lock:
+        _contadores.clear()
+        _histogramas.clear()
+
+
+def configurar_logs():
+    """Log em arquivo com rotação (LOGGING_CONFIG) para os loggers 'cq.*'; só na primeira chamada"""
+    global _logs_configurados
+    with _lock:
+        if _logs_configurados:
+            return
+        _logs_configurados = True
+    manipulador = RotatingFileHandler(
+        LOGGING_CONFIG['FILE'], maxBytes=LOGGING_CONFIG['MAX_SIZE'], backupCount=LOGGING_CONFIG['BACKUP_COUNT'],
+        encoding='utf-8'
+    )
+    manipulador.setFormatter(logging.Formatter(LOGGING_CONFIG['FORMAT']))
+    logger = logging.getLogger('cq')
+    logger.setLevel(LOGGING_CONFIG['LEVEL'])
+    logger.addHandler(manipulador)
+
+
+class AmostradorPerfil:
+    """Perfilador por amostragem de uma thread (a da requisição)
+
+    Uma thread auxiliar lê a pilha da thread alvo a cada `intervalo` segundos
+    (sys._current_frames) e conta as pilhas iguais. O resultado sai no formato "collapsed"
+    (funcao;funcao;funcao contagem), aceito por flamegraph.pl e speedscope. O custo fica
+    só na requisição perfilada; sem amostrador, nada muda nas demais.
+    """
+
+    def __init__(self, thread_id, intervalo=None):
+        self.thread_id = thread_id
+        self.intervalo = intervalo or METRICS_CONFIG['PROFILER_INTERVAL']
+        self.pilhas = {}
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True, name='amostrador-perfil')
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.thread_id)
+            if quadro is None:
+                continue
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                quadro = quadro.f_back
+            chave = ';'.join(reversed(pilha))
+            self.pilhas[chave] = self.pilhas.get(chave, 0) + 1
+            self.amostras += 1
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def salvar(self, caminho):
+        """Para a amostragem e grava as pilhas em `caminho`"""
+        self.parar()
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            for pilha, contagem in sorted(self.pilhas.items(), key=lambda item: item[1], reverse=True):
+                arquivo.write(f"{pilha} {contagem}\n")
+        logging.getLogger('cq.perfil').info(f"perfil={caminho} amostras={self.amostras}")
@@ -0,0 +1,85 @@
+"""
+Pré-processamento de texto das análises
+
+Os textos são tokenizados com operações vetorizadas do pandas e uma regex compilada que
+preserva os acentos do português. As frequências de termos dos gráficos saem do índice
+de termos (indice_termos.py), montado na ingestão com a mesma tokenização.
+"""
+
+import functools
+import re
+import unicodedata
+
+import metricas
+from config import TEXT_ANALYSIS_CONFIG
+
+# Palavras com 2+ letras (qualquer alfabeto, inclusive letras acentuadas); ignora dígitos e '_'
+REGEX_TOKEN = re.compile(r'[^\W\d_]{2,}')
+
+
+def tokenizar(texto):
+    """Tokeniza um único texto (minúsculas, acentos preservados)
+
+    Usado na ingestão, por isso não depende do pandas.
+    """
+    if not isinstance(texto, str):
+        return []
+    return REGEX_TOKEN.findall(unicodedata.normalize('NFC', texto).lower())
+
+
+def preparar_nltk():
+    """Garante o corpus de stopwords do NLTK, baixando-o se faltar
+
+    Chamado uma vez na inicialização do app; retorna False se o recurso não está
+    disponível (por exemplo, sem rede), caso em que só as stopwords personalizadas valem.
+    """
+    import nltk
+
+    try:
+        nltk.data.find('corpora/stopwords')
+        return True
+    except LookupError:
+        pass
+    try:
+        if nltk.download('stopwords', quiet=True):
+            nltk.data.find('corpora/stopwords')
+            return True
+    except Exception as e:
+        print(f"⚠️ Não foi possível baixar as stopwords do NLTK: {e}")
+    return False
+
+
+@functools.lru_cache(maxsize=1)
+def carregar_stopwords():
+    """Stopwords do NLTK (se habilitadas) mais as personalizadas de TEXT_ANALYSIS_CONFIG
+
+    Resolvidas uma única vez por processo.
+    """
+    palavras = set()
+    if TEXT_ANALYSIS_CONFIG['STOPWORDS_PORTUGUESE']:
+        if preparar_nltk():
+            from nltk.corpus import stopwords
+            palavras.update(stopwords.words('portuguese'))
+        else:
+            print("⚠️ Usando apenas as stopwords personalizadas")
+    palavras.update(TEXT_ANALYSIS_CONFIG['CUSTOM_STOPWORDS'])
+    return frozenset(palavra.lower() for palavra in palavras)
+
+
+def tokenizar_textos(textos, stopwords=None):
+    """Versão vetorizada de tokenizar() para uma série de textos
+
+    Retorna uma série com um token por linha, indexada pelo documento de origem (textos
+    sem tokens não aparecem). Sem `stopwords`, usa carregar_stopwords().
+    """
+    import pandas as pd
+
+    textos = pd.Series(textos).fillna('').astype(str)
+    stopwords = carregar_stopwords() if stopwords is None else stopwords
+
+    with metricas.medir('preprocessamento', etapa='tokenizacao'):
+        tokens = textos.str.normalize('NFC').str.lower().str.findall(REGEX_TOKEN).explode().dropna()
+    if not stopwords:
+        return tokens
+    with metricas.medir('preprocessamento', etapa='stopwords'):
+        return tokens[~tokens.isin(stopwords)]
@@ -1,241 +1,421 @@
 #!/usr/bin/env python3
 """
-Versão SUPER SIMPLES do web scraping com Selenium
+Versão SUPER SIMPLES do web scraping do Google Scholar
+
+As páginas vêm de um coletor (coletores.py): por padrão HTTP direto, sem navegador, com o
+Selenium como alternativa quando o Scholar bloqueia ou a requisição falha.
+
+A busca roda em um loop asyncio (MotorBusca): cada tópico é uma tarefa, que pede as
+próprias páginas como tarefas; os coletores, que são bloqueantes, rodam em threads. A
+concorrência é limitada por um semáforo e a taxa por um token bucket por host, então uma
+página lenta segura só o próprio tópico.
 """
 
-import os
-import re
-import sqlite3
+import asyncio
+import logging
 import time
 import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
-# Variável global para compatibilidade com app.py
-progresso_busca = {'status': 'idle', 'progresso': 0, 'total_resultados': 0, 'topico_atual': ''}
+import banco
+import cache_paginas
+import coletores
+import jobs
+import metricas
+from coletores import BloqueioCaptcha, SemNavegador
+from config import GOOGLE_SCHOLAR_CONFIG, SEARCH_CONFIG
+from extrator_scholar import PAGINA_RESULTADOS, PAGINA_VAZIA, extrair_resultados_html, processar_resultado
 
-def executar_web_scraping_selenium_simples(topicos_selecionados, ano_inicio, ano_fim, min_resultados):
-    """Versão mais simples possível com Selenium"""
-    global progresso_busca
-    
-    try:
-        print("🚀 Iniciando Selenium SIMPLES...")
-        progresso_busca['status'] = 'iniciando selenium'
-        progresso_busca['progresso'] = 0
-        
-        # Tentar Chrome primeiro (mais simples)
+# Resultados por página do Scholar e limite de páginas por tópico (100 resultados)
+RESULTADOS_POR_PAGINA = 10
+MAX_PAGINAS = 10
+
+_log = logging.getLogger('cq.busca')
+
+# Limitadores de taxa por host, compartilhados por todas as buscas do processo
+_limitadores = {}
+_lock_limitador = threading.Lock()
+
+
+class LimitadorTaxa:
+    """Token bucket de um host: uma requisição a cada `intervalo` segundos, em média,
+    com rajadas de até `capacidade` requisições
+
+    O intervalo é adaptativo: dobra a cada falha ou CAPTCHA (até BACKOFF_MAX) e cai pela metade
+    a cada página carregada normalmente, até voltar ao intervalo base. Quem pede um token
+    sem saldo entra na fila (o saldo fica negativo) e espera a sua vez: aguardar() bloqueia
+    a thread, aguardar_async() só a corrotina.
+    """
+
+    def __init__(self, intervalo, capacidade=1):
+        self.intervalo_base = intervalo
+        self.intervalo = intervalo
+        self.capacidade = max(1, capacidade)
+        self._tokens = float(self.capacidade)
+        self._atualizado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def penalizar(self):
+        with self._lock:
+            self.intervalo = min(max(self.intervalo, 0.5) * 2, SEARCH_CONFIG['BACKOFF_MAX'])
+
+    def aliviar(self):
+        with self._lock:
+            self.intervalo = max(self.intervalo_base, self.intervalo / 2)
+
+    def _reservar(self):
+        """Retira um token e retorna quantos segundos esperar por ele"""
+        with self._lock:
+            agora = time.monotonic()
+            if self.intervalo > 0:
+                self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) / self.intervalo)
+            else:
+                self._tokens = float(self.capacidade)
+            self._atualizado = agora
+            self._tokens -= 1
+            return max(0.0, -self._tokens * self.intervalo)
+
+    def aguardar(self):
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+    async def aguardar_async(self):
+        espera = self._reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+def obter_limitador(url=None):
+    """Limitador do host da URL (padrão: o do Google Scholar); buscas simultâneas o dividem"""
+    host = urllib.parse.urlsplit(url or GOOGLE_SCHOLAR_CONFIG['BASE_URL']).netloc
+    with _lock_limitador:
+        if host not in _limitadores:
+            _limitadores[host] = LimitadorTaxa(SEARCH_CONFIG['PAGE_DELAY'], SEARCH_CONFIG['RATE_BURST'])
+        return _limitadores[host]
+
+
+class _TokenReservado:
+    """Limitador entregue ao coletor quando o token da primeira tentativa já foi obtido no
+    loop: só as novas tentativas esperam o token bucket"""
+
+    def __init__(self, limitador):
+        self._limitador = limitador
+        self._primeira = True
+
+    def aguardar(self):
+        if self._primeira:
+            self._primeira = False
+            return
+        self._limitador.aguardar()
+
+    def penalizar(self):
+        self._limitador.penalizar()
+
+    def aliviar(self):
+        self._limitador.aliviar()
+
+
+def _atualizar_progresso_topico(job, topico, **campos):
+    """Atualiza os contadores de um tópico e recalcula o progresso geral do job"""
+    with job.editar() as progresso:
+        topicos = progresso.setdefault('topicos', {})
+        estado = topicos.setdefault(topico, {'status': 'aguardando', 'coletados': 0, 'paginas': 0, 'meta': 0})
+        estado.update(campos)
+
+        # Progresso geral: 15% de inicialização + 80% divididos entre os tópicos
+        fracoes = [
+            1.0 if t['status'] in ('concluido', 'erro', 'cancelado')
+            else min(t['coletados'] / t['meta'], 1.0) if t['meta'] else 0.0
+            for t in topicos.values()
+        ]
+        progresso['progresso'] = 15 + (sum(fracoes) / len(fracoes)) * 80
+        progresso['topico_atual'] = ', '.join(
+            nome for nome, t in topicos.items() if t['status'] == 'buscando'
+        )
+        # Resultados que ainda faltam para as metas (base do ETA)
+        progresso['restantes'] = sum(
+            max(t['meta'] - t['coletados'], 0) for t in topicos.values()
+            if t['status'] not in ('concluido', 'erro', 'cancelado')
+        )
+
+
+def _somar_total(job, quantidade, novos):
+    with job.editar() as progresso:
+        progresso['total_resultados'] = progresso.get('total_resultados', 0) + quantidade
+        progresso['novos'] = progresso.get('novos', 0) + novos
+        progresso['paginas'] = progresso.get('paginas', 0) + 1
+
+
+class MotorBusca:
+    """Uma busca (tópicos x páginas) como tarefas asyncio
+
+    - No máximo `concorrencia` páginas são buscadas ao mesmo tempo (semáforo); cada vaga
+      usa um coletor do pool, de modo que conexões e navegadores são reaproveitados.
+    - Antes de cada página, o motor espera o token bucket do host no próprio loop (a
+      espera não ocupa uma thread).
+    - Cada tópico mantém até SEARCH_CONFIG['PAGE_WINDOW'] páginas a caminho, processadas
+      em ordem, e para ao atingir min_resultados ou receber uma página vazia, cancelando
+      as que ainda estavam a caminho.
+    - A gravação roda em uma thread própria (um escritor, uma conexão), uma página por vez.
+    """
+
+    def __init__(self, job, conn, execucao_id, ano_inicio, ano_fim, min_resultados, concorrencia):
+        self.job = job
+        self.ano_inicio = ano_inicio
+        self.ano_fim = ano_fim
+        self.min_resultados = min_resultados
+        self.concorrencia = concorrencia
+        self.escritor = banco.EscritorLote(conn, execucao_id)
+        self.cache = cache_paginas.obter_cache()
+        self.coletores = [coletores.criar_coletor() for _ in range(concorrencia)]
+        self._rede = ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix='coleta')
+        self._gravacao = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gravacao')
+
+    async def executar(self, topicos):
+        """Busca todos os tópicos; levanta CancelledError se o job for cancelado"""
+        self._loop = asyncio.get_running_loop()
+        self._semaforo = asyncio.Semaphore(self.concorrencia)
+        self._livres = asyncio.Queue()
+        for coletor in self.coletores:
+            self._livres.put_nowait(coletor)
+
+        self._tarefa = asyncio.current_task()
+        self.job.ao_cancelar(self._cancelar)
+        if self.job.cancelamento_solicitado:
+            raise asyncio.CancelledError()
+        await asyncio.gather(*(self._executar_topico(topico) for topico in topicos))
+
+    def _cancelar(self):
+        """Chamado pela thread que cancelou o job (rota /cancelar)"""
         try:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from selenium.webdriver.common.by import By
-            
-            print("📦 Configurando Chrome...")
-            
-            # Opções mínimas do Chrome
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            
-            # Criar driver (Selenium vai tentar encontrar automaticamente)
-            print("🌐 Iniciando Chrome...")
-            driver = webdriver.Chrome(options=chrome_options)
-            
-            print("✅ Chrome iniciado com sucesso!")
-            
-        except Exception as e_chrome:
-            print(f"❌ Chrome falhou: {e_chrome}")
-            
-            # Tentar Edge se Chrome falhar
+            self._loop.call_soon_threadsafe(self._tarefa.cancel)
+        except RuntimeError:
+            pass  # o loop já terminou
+
+    def fechar(self):
+        """Espera as requisições e a gravação em andamento e fecha os coletores"""
+        self._rede.shutdown(wait=True, cancel_futures=True)
+        self._gravacao.shutdown(wait=True)
+        self.escritor.descarregar()
+        for coletor in self.coletores:
+            coletor.fechar()
+
+    async def _obter_pagina(self, url):
+        """(estado, resultados brutos) da página, do cache ou de um coletor livre"""
+        # Leitura do SQLite e descompressão fora do loop, para não travar as demais páginas
+        html = await asyncio.to_thread(self.cache.obter, url) if self.cache is not None else None
+        if html is not None:
+            print("💾 Página servida do cache")
+            metricas.incrementar('paginas_cache')
+            resultados = extrair_resultados_html(html)
+            return (PAGINA_RESULTADOS if resultados else PAGINA_VAZIA), resultados
+
+        limitador = obter_limitador(url)
+        async with self._semaforo:
+            coletor = await self._livres.get()
             try:
-                print("📦 Tentando Edge...")
-                edge_options = webdriver.EdgeOptions()
-                edge_options.add_argument("--headless")
-                edge_options.add_argument("--no-sandbox")
-                
-                driver = webdriver.Edge(options=edge_options)
-                print("✅ Edge iniciado com sucesso!")
-                
-            except Exception as e_edge:
-                print(f"❌ Edge falhou: {e_edge}")
-                progresso_busca['status'] = f'erro: Nenhum navegador disponível. Instale Chrome ou Edge.'
-                return
-        
-        progresso_busca['status'] = 'navegador iniciado'
-        progresso_busca['progresso'] = 15
-        
+                await limitador.aguardar_async()
+            except BaseException:
+                self._livres.put_nowait(coletor)
+                raise
+            futuro = self._loop.run_in_executor(
+                self._rede, coletor.obter, url, _TokenReservado(limitador), self.cache
+            )
+            # O coletor só volta ao pool quando a thread termina, mesmo que o tópico
+            # desista da página antes (shield: cancelar a espera não abandona a thread)
+            futuro.add_done_callback(lambda _: self._livres.put_nowait(coletor))
+            return await asyncio.shield(futuro)
+
+    def _gravar_pagina(self, topico, linhas):
+        """Grava a página inteira em uma única transação (na thread de gravação)"""
+        novos_antes = self.escritor.novos
+        for linha in linhas:
+            # Enfileirar no lote (artigos já conhecidos só ganham o tópico/execução)
+            self.escritor.adicionar(linha, topico)
+        self.escritor.descarregar()
+        return self.escritor.novos - novos_antes
+
+    async def _buscar_topico(self, topico):
+        """Coleta os resultados de um tópico e retorna quantos foram encontrados"""
+        print(f"🔍 Buscando: {topico}")
+        _atualizar_progresso_topico(self.job, topico, status='buscando', meta=self.min_resultados)
+
+        # URL simples do Google Scholar
+        query = topico.replace(' ', '+')
+        url = f"{GOOGLE_SCHOLAR_CONFIG['BASE_URL']}?q={query}&as_ylo={self.ano_inicio}&as_yhi={self.ano_fim}"
+        print(f"📄 Acessando: {url}")
+
+        resultados_coletados = 0
+        pagina_atual = 0
+        proxima_pagina = 0
+        a_caminho = {}
+        try:
+            while resultados_coletados < self.min_resultados:
+                # Pedir as próximas páginas enquanto a janela permite e as que já estão a
+                # caminho (se vierem cheias) não bastam para a meta
+                while (proxima_pagina < MAX_PAGINAS and len(a_caminho) < SEARCH_CONFIG['PAGE_WINDOW']
+                       and resultados_coletados + len(a_caminho) * RESULTADOS_POR_PAGINA < self.min_resultados):
+                    url_pagina = f"{url}&start={proxima_pagina * RESULTADOS_POR_PAGINA}"
+                    print(f"📄 Acessando página {proxima_pagina + 1}: {url_pagina}")
+                    a_caminho[proxima_pagina] = asyncio.ensure_future(self._obter_pagina(url_pagina))
+                    proxima_pagina += 1
+
+                estado, resultados = await a_caminho.pop(pagina_atual)
+                print(f"📋 Encontrados {len(resultados)} resultados na página {pagina_atual + 1}")
+
+                # Se não há mais resultados, parar
+                if len(resultados) == 0:
+                    print("❌ Não há mais resultados disponíveis")
+                    break
+
+                # Tratar cada resultado (apenas strings, sem chamadas ao navegador)
+                linhas = []
+                for j, bruto in enumerate(resultados[:self.min_resultados - resultados_coletados]):
+                    try:
+                        linha = processar_resultado(bruto)
+                        linhas.append(linha)
+                        _log.debug(f"{resultados_coletados + len(linhas)}/{self.min_resultados}. {linha['titulo'][:50]}")
+                    except Exception as e_item:
+                        print(f"   ⚠️ Erro no item {j+1}: {e_item}")
+
+                novos_pagina = await self._loop.run_in_executor(self._gravacao, self._gravar_pagina, topico, linhas)
+                resultados_coletados += len(linhas)
+                print(f"💾 Página gravada: {len(linhas)} resultados, {novos_pagina} novos")
+                _somar_total(self.job, len(linhas), novos_pagina)
+                _atualizar_progresso_topico(
+                    self.job, topico, coletados=resultados_coletados, paginas=pagina_atual + 1
+                )
+
+                pagina_atual += 1
+                # Limite de segurança para evitar loop infinito
+                if pagina_atual >= MAX_PAGINAS and resultados_coletados < self.min_resultados:
+                    print(f"⚠️ Limite de páginas atingido ({MAX_PAGINAS} páginas)")
+                    break
+        finally:
+            # Parada antecipada (meta, página vazia, erro ou cancelamento): as páginas
+            # que ainda estavam a caminho não são mais necessárias
+            for tarefa in a_caminho.values():
+                tarefa.cancel()
+
+        print(f"✅ Coletados {resultados_coletados} resultados para '{topico}'")
+        return resultados_coletados
+
+    async def _executar_topico(self, topico):
+        try:
+            coletados = await self._buscar_topico(topico)
+            _atualizar_progresso_topico(self.job, topico, status='concluido', coletados=coletados)
+        except asyncio.CancelledError:
+            _atualizar_progresso_topico(self.job, topico, status='cancelado')
+            raise
+        except SemNavegador as e_navegador:
+            print(f"❌ Tópico '{topico}' sem navegador: {e_navegador}")
+            _atualizar_progresso_topico(self.job, topico, status='erro', erro='sem navegador')
+        except BloqueioCaptcha:
+            print(f"🚫 CAPTCHA persistente no tópico '{topico}'")
+            _atualizar_progresso_topico(self.job, topico, status='erro', erro='captcha')
+        except Exception as e_topico:
+            print(f"❌ Erro no tópico '{topico}': {e_topico}")
+            _atualizar_progresso_topico(self.job, topico, status='erro')
+
+
+def executar_web_scraping_selenium_simples(topicos_selecionados, ano_inicio, ano_fim, min_resultados, num_workers=None, job=None):
+    """Versão mais simples possível do scraping
+
+    Os tópicos rodam em paralelo no motor asyncio, com até `num_workers` páginas
+    simultâneas (padrão: SEARCH_CONFIG['WORKERS']), cada uma com um coletor do pool
+    (SEARCH_CONFIG['FETCHER']), e um token bucket por host. Páginas já presentes no
+    cache em disco não usam o coletor.
+    O progresso vai para `job` (criado no registro de jobs se não for informado),
+    que é retornado ao final. job.cancelar() (rota /cancelar) interrompe a busca; o que
+    já foi gravado fica no banco.
+    """
+    if job is None:
+        job = jobs.registro.criar('busca', topicos=list(topicos_selecionados))
+
+    try:
+        print("🚀 Iniciando Selenium SIMPLES...")
+        job.atualizar(
+            status='iniciando selenium',
+            progresso=0,
+            total_resultados=0,
+            novos=0,
+            paginas=0,
+            topico_atual='',
+            restantes=min_resultados * len(topicos_selecionados),
+            topicos={
+                topico: {'status': 'aguardando', 'coletados': 0, 'paginas': 0, 'meta': min_resultados}
+                for topico in topicos_selecionados
+            }
+        )
+
         # Configurar banco de dados
         print("💾 Configurando banco...")
-        conn = sqlite3.connect("buscas_completas_CQ.db")
-        cursor = conn.cursor()
-        
-        # Limpar dados antigos antes de iniciar nova busca
-        print("🧹 Limpando dados antigos...")
-        cursor.execute("DELETE FROM resultados_detalhados_CQ")
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resultados_detalhados_CQ (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                termo TEXT NOT NULL,
-                titulo TEXT NOT NULL,
-                ano_publicacao INTEGER,
-                autores TEXT,
-                fonte_publicacao TEXT,
-                resumo TEXT,
-                url_artigo TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        print("✅ Banco limpo e configurado!")
-        
-        total_resultados = 0
-        
-        # Processar cada tópico
-        for i, topico in enumerate(topicos_selecionados):
-            print(f"🔍 Buscando: {topico}")
-            progresso_busca['topico_atual'] = topico
-            progresso_busca['progresso'] = 15 + ((i / len(topicos_selecionados)) * 80)
-            
-            # URL simples do Google Scholar
-            query = topico.replace(' ', '+')
-            url = f"https://scholar.google.com.br/scholar?q={query}&as_ylo={ano_inicio}&as_yhi={ano_fim}"
-            
-            print(f"📄 Acessando: {url}")
-            
-            try:
-                resultados_coletados = 0
-                pagina_atual = 0
-                
-                # Loop para coletar a quantidade desejada de resultados
-                while resultados_coletados < min_resultados:
-                    # Calcular offset para paginação
-                    start_param = pagina_atual * 10
-                    url_pagina = f"{url}&start={start_param}"
-                    
-                    print(f"📄 Acessando página {pagina_atual + 1}: {url_pagina}")
-                    
-                    # Abrir página
-                    driver.get(url_pagina)
-                    time.sleep(3)  # Aguardar carregar
-                    
-                    # Buscar resultados (seletor simples)
-                    resultados = driver.find_elements(By.CSS_SELECTOR, "div.gs_ri")
-                    print(f"📋 Encontrados {len(resultados)} resultados na página {pagina_atual + 1}")
-                    
-                    # Se não há mais resultados, parar
-                    if len(resultados) == 0:
-                        print("❌ Não há mais resultados disponíveis")
-                        break
-                    
-                    # Calcular quantos resultados processar nesta página
-                    resultados_restantes = min_resultados - resultados_coletados
-                    resultados_processar = min(len(resultados), resultados_restantes)
-                    
-                    # Extrair dados de cada resultado
-                    for j, resultado in enumerate(resultados[:resultados_processar]):
-                        try:
-                            # Título (simples)
-                            titulo = "Título não encontrado"
-                            try:
-                                titulo_elem = resultado.find_element(By.CSS_SELECTOR, "h3 a")
-                                titulo = titulo_elem.text
-                                url_artigo = titulo_elem.get_attribute("href")
-                            except:
-                                url_artigo = None
-                            
-                            # Autores (simples)
-                            autores = "N/A"
-                            fonte = "N/A"
-                            ano = None
-                            try:
-                                autor_elem = resultado.find_element(By.CSS_SELECTOR, "div.gs_a")
-                                texto_autor = autor_elem.text
-                                
-                                # Extrair ano (regex simples)
-                                ano_match = re.search(r'(20\d{2})', texto_autor)
-                                if ano_match:
-                                    ano = int(ano_match.group(1))
-                                
-                                # Dividir autores e fonte
-                                if ' - ' in texto_autor:
-                                    partes = texto_autor.split(' - ')
-                                    autores = partes[0].strip()
-                                    if len(partes) > 1:
-                                        fonte = partes[1].strip()
-                                else:
-                                    autores = texto_autor.strip()
-                            except:
-                                pass
-                            
-                            # Resumo (simples)
-                            resumo = None
-                            try:
-                                resumo_elem = resultado.find_element(By.CSS_SELECTOR, "div.gs_rs")
-                                resumo = resumo_elem.text
-                            except:
-                                pass
-                            
-                            # Salvar no banco
-                            cursor.execute(
-                                "INSERT INTO resultados_detalhados_CQ (termo, titulo, ano_publicacao, autores, fonte_publicacao, resumo, url_artigo) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                                (topico, titulo, ano, autores, fonte, resumo, url_artigo)
-                            )
-                            
-                            total_resultados += 1
-                            resultados_coletados += 1
-                            print(f"   ✅ {resultados_coletados}/{min_resultados}. {titulo[:50]}...")
-                            
-                        except Exception as e_item:
-                            print(f"   ⚠️ Erro no item {j+1}: {e_item}")
-                    
-                    conn.commit()
-                    
-                    # Se já coletamos o suficiente, parar
-                    if resultados_coletados >= min_resultados:
-                        break
-                    
-                    # Próxima página
-                    pagina_atual += 1
-                    
-                    # Limite de segurança para evitar loop infinito
-                    if pagina_atual >= 10:  # Máximo 10 páginas (100 resultados por tópico)
-                        print("⚠️ Limite de páginas atingido (10 páginas)")
-                        break
-                    
-                    # Pausa entre páginas
-                    time.sleep(2)
-                
-                print(f"✅ Coletados {resultados_coletados} resultados para '{topico}'")
-                
-            except Exception as e_topico:
-                print(f"❌ Erro no tópico '{topico}': {e_topico}")
-            
-            # Pausa entre tópicos
-            time.sleep(2)
-        
+        conn = banco.obter_conexao()
+
+        # No modo incremental os artigos já coletados são mantidos e apenas os novos são gravados
+        if not SEARCH_CONFIG['INCREMENTAL']:
+            print("🧹 Limpando dados antigos...")
+            banco.limpar_resultados(conn)
+
+        execucao_id = banco.iniciar_execucao(conn, topicos_selecionados, ano_inicio, ano_fim)
+        job.atualizar(execucao_id=execucao_id)
+        print(f"✅ Banco configurado! Execução #{execucao_id}")
+
+        # Vagas de requisição simultânea (sem mais vagas do que tópicos x janela de páginas).
+        # Navegadores só sobem quando o coletor HTTP é bloqueado ou quando FETCHER = 'selenium'.
+        if num_workers is None:
+            num_workers = SEARCH_CONFIG['WORKERS']
+        num_workers = max(1, min(num_workers, len(topicos_selecionados) * SEARCH_CONFIG['PAGE_WINDOW']))
+
+        motor = MotorBusca(job, conn, execucao_id, ano_inicio, ano_fim, min_resultados, num_workers)
+        print(f"🧵 Iniciando motor com {num_workers} requisição(ões) simultânea(s)...")
+        job.atualizar(status='buscando', progresso=15)
+        cancelado = False
+        try:
+            asyncio.run(motor.executar(topicos_selecionados))
+        except asyncio.CancelledError:
+            cancelado = True
+        finally:
+            motor.fechar()
+
+        if cancelado:
+            print("🛑 Busca cancelada")
+            banco.finalizar_execucao(conn, execucao_id, 'cancelado')
+            banco.devolver_conexao(conn)
+            job.atualizar(topico_atual='', restantes=0, status='cancelado')
+            return job
+
+        # Nenhum navegador subiu e algum tópico precisava dele
+        if all(coletor.falhou for coletor in motor.coletores):
+            banco.finalizar_execucao(conn, execucao_id, 'erro')
+            banco.devolver_conexao(conn)
+            job.atualizar(status='erro: Nenhum navegador disponível. Instale Chrome ou Edge.')
+            return job
+
         # Finalizar
-        progresso_busca['total_resultados'] = total_resultados
-        progresso_busca['progresso'] = 100
-        progresso_busca['status'] = 'concluido'
-        
-        print(f"🎉 Concluído! Total: {total_resultados} resultados")
-        
-        # Fechar tudo
-        driver.quit()
-        conn.close()
-        
+        banco.finalizar_execucao(conn, execucao_id, 'concluido')
+        banco.devolver_conexao(conn)
+        job.atualizar(topico_atual='', progresso=100, restantes=0, status='concluido')
+
+        progresso = job.instantaneo()
+        print(f"🎉 Concluído! Total: {progresso['total_resultados']} resultados ({progresso['novos']} novos)")
+
     except Exception as e:
         print(f"❌ Erro geral: {e}")
-        progresso_busca['status'] = f'erro: {str(e)}'
-        if 'driver' in locals():
-            driver.quit()
+        job.atualizar(status=f'erro: {str(e)}')
         if 'conn' in locals():
-            conn.close()
+            if 'execucao_id' in locals():
+                banco.finalizar_execucao(conn, execucao_id, 'erro')
+            banco.devolver_conexao(conn)
+    return job
 
 # Teste direto
 if __name__ == "__main__":
     print("🧪 TESTE SELENIUM SIMPLES")
     print("=" * 30)
-    
+
     # Teste com um tópico
     topicos = ["computação quântica"]
-    executar_web_scraping_selenium_simples(topicos, 2024, 2025, 3)
\ No newline at end of file
+    executar_web_scraping_selenium_simples(topicos, 2024, 2025, 3)
@@ -0,0 +1,85 @@
+"""
+Análise de sentimento por léxico
+
+O léxico (POSITIVE_WORDS/NEGATIVE_WORDS de TEXT_ANALYSIS_CONFIG, opcionalmente
+complementado por arquivos) vira um dicionário termo -> polaridade. Cada texto é
+tokenizado uma vez e os tokens são cruzados com o dicionário, inclusive expressões de
+várias palavras, em tempo linear no tamanho do corpus e independente do tamanho do léxico.
+"""
+
+import functools
+
+import metricas
+from config import TEXT_ANALYSIS_CONFIG
+from preprocessamento import tokenizar, tokenizar_textos
+
+
+def _carregar_arquivo(caminho):
+    """Lê um léxico com um termo por linha (linhas vazias e iniciadas por # são ignoradas)"""
+    with open(caminho, encoding='utf-8') as arquivo:
+        return [linha.strip() for linha in arquivo if linha.strip() and not linha.startswith('#')]
+
+
+class AnalisadorSentimento:
+    """Pontua textos contando termos positivos e negativos do léxico"""
+
+    def __init__(self, positivas, negativas):
+        # Chave: termo ou expressão já tokenizada e unida por espaço
+        self.lexico = {}
+        for termos, polaridade in ((positivas, 1), (negativas, -1)):
+            for termo in termos:
+                tokens = tokenizar(termo)
+                if tokens:
+                    self.lexico[' '.join(tokens)] = polaridade
+        self.tamanho_maximo = max((chave.count(' ') + 1 for chave in self.lexico), default=1)
+
+    @classmethod
+    def de_config(cls):
+        positivas = list(TEXT_ANALYSIS_CONFIG['POSITIVE_WORDS'])
+        negativas = list(TEXT_ANALYSIS_CONFIG['NEGATIVE_WORDS'])
+        if TEXT_ANALYSIS_CONFIG.get('POSITIVE_WORDS_FILE'):
+            positivas += _carregar_arquivo(TEXT_ANALYSIS_CONFIG['POSITIVE_WORDS_FILE'])
+        if TEXT_ANALYSIS_CONFIG.get('NEGATIVE_WORDS_FILE'):
+            negativas += _carregar_arquivo(TEXT_ANALYSIS_CONFIG['NEGATIVE_WORDS_FILE'])
+        return cls(positivas, negativas)
+
+    @metricas.cronometrado('preprocessamento', etapa='sentimento')
+    def pontuar(self, textos):
+        """Pontua uma série de textos
+
+        Retorna um DataFrame alinhado aos textos com as colunas positivas, negativas,
+        pontuacao (entre -1 e 1) e sentimento (Positivo/Negativo/Neutro).
+        """
+        import pandas as pd
+
+        textos = pd.Series(textos)
+        # Sem remoção de stopwords: expressões do léxico podem conter palavras comuns
+        termos = tokenizar_textos(textos, stopwords=frozenset())
+
+        # n-gramas de cada documento montados deslocando a série de tokens dentro do documento
+        polaridades = termos.map(self.lexico)
+        ngrama = termos
+        for deslocamento in range(1, self.tamanho_maximo):
+            proximo = termos.groupby(level=0).shift(-deslocamento)
+            ngrama = ngrama + ' ' + proximo
+            polaridades = pd.concat([polaridades, ngrama.dropna().map(self.lexico)])
+
+        polaridades = polaridades.dropna()
+        positivas = (polaridades > 0).groupby(level=0).sum()
+        negativas = (polaridades < 0).groupby(level=0).sum()
+
+        resultado = pd.DataFrame(index=textos.index)
+        resultado['positivas'] = positivas.reindex(textos.index, fill_value=0).astype(int)
+        resultado['negativas'] = negativas.reindex(textos.index, fill_value=0).astype(int)
+        total = resultado['positivas'] + resultado['negativas']
+        resultado['pontuacao'] = ((resultado['positivas'] - resultado['negativas']) / total.where(total > 0)).fillna(0.0)
+        resultado['sentimento'] = 'Neutro'
+        resultado.loc[resultado['positivas'] > resultado['negativas'], 'sentimento'] = 'Positivo'
+        resultado.loc[resultado['negativas'] > resultado['positivas'], 'sentimento'] = 'Negativo'
+        return resultado
+
+
+@functools.lru_cache(maxsize=1)
+def obter_analisador():
+    """Analisador montado a partir da configuração (o léxico é compilado uma única vez)"""
+    return AnalisadorSentimento.de_config()
@@ -0,0 +1,361 @@
+"""
+Modelagem de temas dos resumos (TF-IDF + LDA online), atualizada a cada ingestão
+
+O vocabulário sai do índice de termos (frequencia_termos), sem tokenizar o corpus de
+novo: os termos mais frequentes entre MIN_DF e MAX_DF, sem stopwords. Cada artigo vira
+um vetor TF-IDF (tf sublinear x idf suavizado, as mesmas fórmulas do TfidfVectorizer)
+montado a partir de termos(artigo_id, termo, freq), e o LDA é ajustado em lotes com
+partial_fit. Vocabulário, idf e modelo ficam em disco (TOPIC_MODEL_CONFIG['MODEL_FILE']).
+
+Artigos novos são incorporados ao modelo existente lote a lote, sem reajuste do zero;
+o reajuste completo só acontece quando o corpus cresce REFIT_GROWTH vezes desde o
+último (o vocabulário fica congelado entre reajustes). O tema dominante de cada artigo
+fica em artigo_temas e as palavras de cada tema em temas, para que rotas e gráficos
+consultem só o SQLite.
+
+scikit-learn, numpy e scipy só são importados durante o ajuste.
+"""
+
+import json
+import os
+import threading
+import time
+
+import duplicatas
+import indice_termos
+from config import DATABASE_CONFIG, TOPIC_MODEL_CONFIG
+from preprocessamento import carregar_stopwords
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+# Um ajuste por vez no processo
+_lock_modelo = threading.Lock()
+
+
+def criar_tabelas(cursor):
+    """Cria as tabelas dos temas (chamado por banco.criar_esquema)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS temas (
+            tema INTEGER PRIMARY KEY,
+            palavras TEXT NOT NULL,
+            versao INTEGER NOT NULL,
+            atualizado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Tema dominante de cada artigo e o peso dele na distribuição do artigo
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS artigo_temas (
+            artigo_id INTEGER PRIMARY KEY,
+            tema INTEGER NOT NULL,
+            peso REAL NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_artigo_temas_tema ON artigo_temas(tema)")
+
+
+def limpar(cursor):
+    """Apaga os temas e descarta o modelo em disco (usado quando todos os artigos são removidos)"""
+    cursor.execute("DELETE FROM temas")
+    cursor.execute("DELETE FROM artigo_temas")
+    if os.path.exists(TOPIC_MODEL_CONFIG['MODEL_FILE']):
+        os.remove(TOPIC_MODEL_CONFIG['MODEL_FILE'])
+
+
+def carregar_modelo(caminho=None):
+    """Modelo salvo em disco ({'versao', 'vocabulario', 'idf', 'lda', ...}) ou None"""
+    import joblib
+
+    caminho = caminho or TOPIC_MODEL_CONFIG['MODEL_FILE']
+    if not os.path.exists(caminho):
+        return None
+    try:
+        return joblib.load(caminho)
+    except Exception as e:
+        print(f"⚠️ Modelo de temas ilegível ({caminho}), será reajustado: {e}")
+        return None
+
+
+def salvar_modelo(modelo, caminho=None):
+    import joblib
+
+    caminho = caminho or TOPIC_MODEL_CONFIG['MODEL_FILE']
+    # Grava em arquivo temporário e troca de uma vez, como os gráficos
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    joblib.dump(modelo, temporario)
+    os.replace(temporario, caminho)
+
+
+def _vocabulario(conn, total_artigos, stopwords):
+    """Termos do modelo e o idf de cada um, direto de frequencia_termos"""
+    import numpy as np
+
+    df_maximo = max(TOPIC_MODEL_CONFIG['MIN_DF'], int(TOPIC_MODEL_CONFIG['MAX_DF'] * total_artigos))
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT termo, df FROM frequencia_termos WHERE df BETWEEN ? AND ? ORDER BY df DESC",
+        (TOPIC_MODEL_CONFIG['MIN_DF'], df_maximo)
+    )
+    vocabulario = []
+    frequencias = []
+    for termo, df in cursor:
+        if termo in stopwords:
+            continue
+        vocabulario.append(termo)
+        frequencias.append(df)
+        if len(vocabulario) >= TOPIC_MODEL_CONFIG['MAX_FEATURES']:
+            break
+    # idf suavizado: ln((1 + n) / (1 + df)) + 1
+    idf = np.log((1 + total_artigos) / (1 + np.asarray(frequencias, dtype=np.float64))) + 1
+    return vocabulario, idf
+
+
+def _carregar_vocabulario(conn, vocabulario):
+    """Tabela temporária termo -> coluna, para o SQLite filtrar o vocabulário no join"""
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS vocabulario_temas (termo TEXT PRIMARY KEY, coluna INTEGER NOT NULL) "
+        "WITHOUT ROWID"
+    )
+    conn.execute("DELETE FROM vocabulario_temas")
+    conn.executemany("INSERT INTO vocabulario_temas (termo, coluna) VALUES (?, ?)",
+                     [(termo, j) for j, termo in enumerate(vocabulario)])
+
+
+def _matriz(conn, ids, idf):
+    """Matriz TF-IDF esparsa (uma linha por id de artigo, ids em ordem crescente)"""
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    marcadores = ','.join('?' * len(ids))
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT t.artigo_id, v.coluna, t.freq FROM termos t JOIN vocabulario_temas v ON v.termo = t.termo "
+        f"WHERE t.artigo_id IN ({marcadores})",
+        ids
+    )
+    entradas = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 3)
+    linhas = np.searchsorted(np.asarray(ids), entradas[:, 0])
+    valores = (1 + np.log(entradas[:, 2])) * idf[entradas[:, 1]]
+    return csr_matrix((valores, (linhas, entradas[:, 1])), shape=(len(ids), len(idf)))
+
+
+def _lotes_de_ids(conn, depois_de=0):
+    """Ids dos artigos indexados em ordem crescente, em lotes de BATCH_SIZE"""
+    cursor = conn.cursor()
+    ultimo_id = depois_de
+    while True:
+        cursor.execute(
+            f"SELECT id FROM {TABELA} WHERE id > ? AND indexado = 1 ORDER BY id LIMIT ?",
+            (ultimo_id, TOPIC_MODEL_CONFIG['BATCH_SIZE'])
+        )
+        ids = [linha[0] for linha in cursor.fetchall()]
+        if not ids:
+            return
+        ultimo_id = ids[-1]
+        yield ids
+
+
+def _amostra_de_ids(conn, total_artigos):
+    """Ids usados no ajuste inicial: todos ou uma amostra de MAX_FIT_DOCS, em lotes"""
+    import random
+
+    if total_artigos <= TOPIC_MODEL_CONFIG['MAX_FIT_DOCS']:
+        return list(_lotes_de_ids(conn))
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT id FROM {TABELA} WHERE indexado = 1")
+    ids = sorted(random.Random(0).sample([linha[0] for linha in cursor], TOPIC_MODEL_CONFIG['MAX_FIT_DOCS']))
+    tamanho = TOPIC_MODEL_CONFIG['BATCH_SIZE']
+    return [ids[i:i + tamanho] for i in range(0, len(ids), tamanho)]
+
+
+def _atribuir(conn, modelo, ids, matriz):
+    """Grava o tema dominante dos artigos do lote (artigos sem termos do vocabulário ficam de fora)"""
+    com_termos = matriz.getnnz(axis=1) > 0
+    if not com_termos.any():
+        return 0
+    distribuicao = modelo['lda'].transform(matriz[com_termos])
+    ids = [artigo_id for artigo_id, usar in zip(ids, com_termos) if usar]
+    dominantes = distribuicao.argmax(axis=1)
+    conn.executemany(
+        "INSERT OR REPLACE INTO artigo_temas (artigo_id, tema, peso) VALUES (?, ?, ?)",
+        [(artigo_id, int(tema), round(float(distribuicao[i, tema]), 4))
+         for i, (artigo_id, tema) in enumerate(zip(ids, dominantes))]
+    )
+    return len(ids)
+
+
+def _gravar_temas(conn, modelo):
+    """Palavras de maior peso de cada tema, para as rotas e gráficos não carregarem o modelo"""
+    componentes = modelo['lda'].components_
+    n = TOPIC_MODEL_CONFIG['TOP_WORDS']
+    conn.execute("DELETE FROM temas")
+    conn.executemany(
+        "INSERT INTO temas (tema, palavras, versao) VALUES (?, ?, ?)",
+        [(tema, json.dumps([modelo['vocabulario'][j] for j in pesos.argsort()[::-1][:n]], ensure_ascii=False),
+          modelo['versao'])
+         for tema, pesos in enumerate(componentes)]
+    )
+
+
+def _ajustar_do_zero(conn, total_artigos, versao, progresso):
+    from sklearn.decomposition import LatentDirichletAllocation
+
+    vocabulario, idf = _vocabulario(conn, total_artigos, carregar_stopwords())
+    if len(vocabulario) < TOPIC_MODEL_CONFIG['N_TOPICS']:
+        return None
+    _carregar_vocabulario(conn, vocabulario)
+    lda = LatentDirichletAllocation(
+        n_components=TOPIC_MODEL_CONFIG['N_TOPICS'],
+        learning_method='online',
+        batch_size=TOPIC_MODEL_CONFIG['BATCH_SIZE'],
+        total_samples=total_artigos,
+        random_state=0
+    )
+
+    # Ajuste em lotes sobre (uma amostra d)o corpus: as matrizes da amostra são montadas
+    # uma vez e reaproveitadas nas passadas, a memória fica limitada por MAX_FIT_DOCS
+    matrizes = [_matriz(conn, ids, idf) for ids in _amostra_de_ids(conn, total_artigos)]
+    passos = len(matrizes) * TOPIC_MODEL_CONFIG['PASSES']
+    for passada in range(TOPIC_MODEL_CONFIG['PASSES']):
+        for i, matriz in enumerate(matrizes):
+            lda.partial_fit(matriz)
+            progresso(50 * (passada * len(matrizes) + i + 1) / passos)
+    del matrizes
+
+    modelo = {
+        'versao': versao,
+        'vocabulario': vocabulario,
+        'idf': idf,
+        'lda': lda,
+        'artigos_ajuste': total_artigos,
+        'artigos': total_artigos,
+        'ultimo_id': 0,
+    }
+
+    # Todos os artigos recebem o tema dominante segundo o novo modelo
+    conn.execute("DELETE FROM artigo_temas")
+    atribuidos = 0
+    for ids in _lotes_de_ids(conn):
+        atribuidos += _atribuir(conn, modelo, ids, _matriz(conn, ids, idf))
+        modelo['ultimo_id'] = ids[-1]
+        progresso(50 + 50 * min(1, atribuidos / total_artigos))
+    return modelo
+
+
+def _atualizar_incremental(conn, modelo, total_artigos, progresso):
+    """Incorpora ao modelo os artigos gravados depois do último ajuste"""
+    _carregar_vocabulario(conn, modelo['vocabulario'])
+    lda = modelo['lda']
+    lda.total_samples = total_artigos
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {TABELA} WHERE id > ? AND indexado = 1", (modelo['ultimo_id'],))
+    novos = cursor.fetchone()[0]
+    processados = 0
+    for ids in _lotes_de_ids(conn, modelo['ultimo_id']):
+        matriz = _matriz(conn, ids, modelo['idf'])
+        if matriz.nnz:
+            lda.partial_fit(matriz)
+        _atribuir(conn, modelo, ids, matriz)
+        modelo['ultimo_id'] = ids[-1]
+        processados += len(ids)
+        progresso(100 * processados / novos)
+    modelo['artigos'] = total_artigos
+    return processados
+
+
+def atualizar(conn, reajustar=False, progresso=None):
+    """Ajusta (ou atualiza) o modelo de temas com os artigos do banco
+
+    Sem modelo salvo, com reajustar=True ou quando o corpus cresceu REFIT_GROWTH vezes
+    desde o último ajuste, o modelo é ajustado do zero; senão só os artigos novos
+    passam pelo partial_fit. `progresso(percentual)` é chamado ao longo do processo.
+    Retorna as estatísticas da atualização ou None se ainda não há dados suficientes.
+    """
+    progresso = progresso or (lambda percentual: None)
+    with _lock_modelo:
+        inicio = time.perf_counter()
+        # O modelo lê o índice de termos: artigos gravados sem índice entram agora
+        duplicatas.agrupar_pendentes(conn)
+        indice_termos.reindexar_pendentes(conn, tamanho_lote=5000)
+
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {TABELA} WHERE indexado = 1")
+        total_artigos = cursor.fetchone()[0]
+        if total_artigos == 0:
+            return None
+
+        modelo = None if reajustar else carregar_modelo()
+        crescimento = total_artigos / modelo['artigos_ajuste'] if modelo else None
+        versao = (modelo['versao'] if modelo else 0) + 1
+        try:
+            if modelo is None or crescimento >= TOPIC_MODEL_CONFIG['REFIT_GROWTH']:
+                modo = 'ajuste'
+                modelo = _ajustar_do_zero(conn, total_artigos, versao, progresso)
+                if modelo is None:
+                    conn.rollback()
+                    print("⚠️ Vocabulário insuficiente para modelar temas")
+                    return None
+                novos = total_artigos
+            else:
+                modo = 'incremental'
+                novos = _atualizar_incremental(conn, modelo, total_artigos, progresso)
+                if not novos:
+                    return {'modo': modo, 'versao': modelo['versao'], 'artigos': total_artigos, 'novos': 0,
+                            'segundos': round(time.perf_counter() - inicio, 2)}
+                modelo['versao'] = versao
+            _gravar_temas(conn, modelo)
+            salvar_modelo(modelo)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    duracao = time.perf_counter() - inicio
+    print(f"🧩 Temas ({modo}): {novos} artigos, versão {modelo['versao']}, {duracao:.1f}s")
+    return {'modo': modo, 'versao': modelo['versao'], 'artigos': total_artigos, 'novos': novos,
+            'segundos': round(duracao, 2)}
+
+
+def _filtro_execucao(execucao_id):
+    if execucao_id is None:
+        return '', ()
+    # Só artigos canônicos têm tema: os da execução são mapeados para o canônico do grupo
+    return (f" AND a.artigo_id IN (SELECT COALESCE(r.cluster_id, r.id) FROM artigo_topicos x "
+            f"JOIN {TABELA} r ON r.id = x.artigo_id WHERE x.execucao_id = ?)", (execucao_id,))
+
+
+def listar_temas(conn, execucao_id=None):
+    """Temas do modelo com as palavras principais e o número de artigos de cada um"""
+    filtro, parametros = _filtro_execucao(execucao_id)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT t.tema, t.palavras, t.versao, t.atualizado_em, "
+        f"(SELECT COUNT(*) FROM artigo_temas a WHERE a.tema = t.tema{filtro}) "
+        "FROM temas t ORDER BY t.tema",
+        parametros
+    )
+    return [
+        {'tema': tema, 'palavras': json.loads(palavras), 'versao': versao,
+         'atualizado_em': atualizado_em, 'artigos': artigos}
+        for tema, palavras, versao, atualizado_em, artigos in cursor.fetchall()
+    ]
+
+
+def prevalencia_por_ano(conn, execucao_id=None):
+    """Artigos por ano e tema dominante: lista de (ano, tema, artigos)"""
+    filtro, parametros = _filtro_execucao(execucao_id)
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT r.ano_publicacao, a.tema, COUNT(*) FROM artigo_temas a JOIN {TABELA} r ON r.id = a.artigo_id "
+        f"WHERE r.ano_publicacao BETWEEN 1900 AND ?{filtro} "
+        "GROUP BY r.ano_publicacao, a.tema ORDER BY r.ano_publicacao, a.tema",
+        (time.localtime().tm_year, *parametros)
+    )
+    return cursor.fetchall()
+
+
+def versao_atual(conn):
+    """Versão do modelo refletida no banco (0 sem modelo), usada no fingerprint dos gráficos"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MAX(versao), 0) FROM temas")
+    return cursor.fetchone()[0]
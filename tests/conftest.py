@@ -0,0 +1,85 @@
+"""
+Fixtures comuns dos testes: banco temporário e o Scholar local de benchmarks/bench_coleta.py
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'benchmarks'))
+
+import banco  # noqa: E402
+from config import GOOGLE_SCHOLAR_CONFIG, PAGE_CACHE_CONFIG, SEARCH_CONFIG  # noqa: E402
+
+
+@pytest.fixture
+def banco_temporario(tmp_path):
+    """Aponta o banco do processo para um arquivo novo em tmp_path"""
+    anterior = banco.definir_banco(str(tmp_path / 'teste.db'))
+    yield
+    banco.definir_banco(anterior)
+
+
+@pytest.fixture
+def gravar_artigos(banco_temporario):
+    """gravar(conn, quantidade=0, semente=42, linhas=()): grava artigos no banco temporário
+
+    Numa execução nova e sem indexar (duplicatas e termos ficam para migrar_pendentes):
+    `quantidade` linhas sintéticas de corpus.gerar_linhas com a semente dada e depois
+    `linhas` (dicts com as colunas da tabela; termo 'teste' se a linha não traz um).
+    Retorna o id da execução.
+    """
+    from corpus import gerar_linhas
+
+    def gravar(conn, quantidade=0, semente=42, linhas=()):
+        execucao_id = banco.iniciar_execucao(conn, ['teste'], None, None)
+        escritor = banco.EscritorLote(conn, execucao_id, intervalo=float('inf'), indexar=False)
+        for linha in (*gerar_linhas(quantidade, semente=semente), *linhas):
+            escritor.adicionar(linha, linha.get('termo', 'teste'))
+        escritor.descarregar()
+        return execucao_id
+
+    return gravar
+
+
+@pytest.fixture
+def quase_duplicatas():
+    """A mesma publicação como artigo e como preprint (URLs diferentes), de 2023"""
+    resumo = ('Propomos um algoritmo variacional para simular moléculas pequenas em computadores '
+              'quânticos ruidosos, com correção de erros leve e medições agrupadas.')
+    return [{'titulo': 'Simulação variacional de moléculas em hardware ruidoso', 'ano_publicacao': 2023,
+             'resumo': resumo, 'url_artigo': url}
+            for url in ('https://exemplo.org/artigo/1', 'https://arxiv.org/abs/2301.00001')]
+
+
+@pytest.fixture
+def scholar(monkeypatch, banco_temporario):
+    """Sobe o ServidorScholar (fixtures de benchmarks/) e aponta a busca para ele
+
+    Sem cache de páginas, sem limite de taxa, backoff curto, uma página por tópico a
+    caminho e só o coletor HTTP (sem alternativa), a menos que o teste mude.
+    """
+    from bench_coleta import ServidorScholar
+
+    servidores = []
+
+    def iniciar(paginas=1, captcha=False):
+        servidor = ServidorScholar(paginas=paginas, captcha=captcha)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        monkeypatch.setitem(GOOGLE_SCHOLAR_CONFIG, 'BASE_URL', servidor.url)
+        return servidor
+
+    monkeypatch.setitem(PAGE_CACHE_CONFIG, 'ENABLED', False)
+    for chave, valor in (('PAGE_DELAY', 0), ('BACKOFF_BASE', 0.001), ('BACKOFF_MAX', 0.01), ('PAGE_WINDOW', 1),
+                         ('RETRY_ATTEMPTS', 2), ('FETCHER', 'http'), ('FETCHER_FALLBACK', None),
+                         ('INCREMENTAL', True)):
+        monkeypatch.setitem(SEARCH_CONFIG, chave, valor)
+    yield iniciar
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
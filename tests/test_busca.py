@@ -0,0 +1,69 @@
+"""
+Páginas da busca textual (busca_textual.buscar) com o corte de MAX_RANKED
+"""
+
+import pytest
+
+import banco
+import busca_textual
+from config import FTS_CONFIG
+
+CONSULTA = 'qubits'
+
+
+@pytest.fixture
+def casamentos(gravar_artigos):
+    """Grava 300 artigos sintéticos e retorna os ids que casam com CONSULTA"""
+    with banco.conexao() as conn:
+        gravar_artigos(conn, 300)
+        return [linha[0] for linha in conn.execute(
+            "SELECT rowid FROM resultados_fts WHERE resultados_fts MATCH ? ORDER BY rowid",
+            (busca_textual.montar_consulta(CONSULTA),)
+        )]
+
+
+def _paginas(conn, limite):
+    """Todas as páginas da consulta; retorna (ids, truncado de cada página, consultas SQL)"""
+    ids, truncados, consultas, cursor_pagina = [], [], [], None
+    conn.set_trace_callback(consultas.append)
+    try:
+        while True:
+            resultados, cursor_pagina, truncado = busca_textual.buscar(
+                conn, CONSULTA, limite=limite, cursor_pagina=cursor_pagina
+            )
+            ids.extend(resultado['id'] for resultado in resultados)
+            truncados.append(truncado)
+            if cursor_pagina is None:
+                return ids, truncados, consultas
+    finally:
+        conn.set_trace_callback(None)
+
+
+def test_corte_calculado_uma_vez_e_levado_no_cursor(casamentos, monkeypatch):
+    maximo = len(casamentos) // 2
+    assert maximo > 20
+    monkeypatch.setitem(FTS_CONFIG, 'MAX_RANKED', maximo)
+
+    with banco.conexao() as conn:
+        ids, truncados, consultas = _paginas(conn, 10)
+
+    # Só os MAX_RANKED casamentos mais recentes, sem repetir nem pular entre as páginas
+    assert sorted(ids) == casamentos[-maximo:]
+    assert len(truncados) > 1 and all(truncados)
+    assert sum('ORDER BY resultados_fts.rowid DESC' in sql for sql in consultas) == 1
+
+
+def test_sem_corte_quando_todos_cabem(casamentos, monkeypatch):
+    monkeypatch.setitem(FTS_CONFIG, 'MAX_RANKED', len(casamentos))
+
+    with banco.conexao() as conn:
+        ids, truncados, _ = _paginas(conn, 25)
+
+    assert sorted(ids) == casamentos
+    assert not any(truncados)
+
+
+@pytest.mark.parametrize('cursor_pagina', ['10', 'a:b', '-10:0', '10:0:1'])
+def test_cursor_invalido(casamentos, cursor_pagina):
+    with banco.conexao() as conn, pytest.raises(ValueError):
+        busca_textual.buscar(conn, CONSULTA, cursor_pagina=cursor_pagina)
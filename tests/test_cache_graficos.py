@@ -0,0 +1,16 @@
+"""
+Impressão digital da tabela de resultados (cache_graficos.calcular_fingerprint)
+"""
+
+import banco
+import cache_graficos
+
+
+def test_fingerprint_muda_com_o_agrupamento_de_duplicatas(gravar_artigos, quase_duplicatas):
+    with banco.conexao() as conn:
+        gravar_artigos(conn, linhas=quase_duplicatas)
+        antes = cache_graficos.calcular_fingerprint(conn)
+
+        # Só cluster_id muda: total, maior id, timestamps e associações ficam iguais
+        banco.migrar_pendentes(conn)
+        assert cache_graficos.calcular_fingerprint(conn) != antes
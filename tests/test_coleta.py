@@ -0,0 +1,152 @@
+"""
+A busca inteira (selenium_simples -> coletor HTTP -> extração -> banco) contra o Scholar
+local, sem rede e sem navegador
+"""
+
+import urllib.parse
+
+import pytest
+
+import banco
+import coletores
+import selenium_simples
+from coletores import BloqueioCaptcha
+from config import DATABASE_CONFIG
+from extrator_scholar import PAGINA_RESULTADOS, PAGINA_VAZIA, extrair_resultados_html
+
+TOPICO = 'computação quântica'
+
+# Os 10 resultados de benchmarks/fixtures/scholar_pagina.html, na ordem da página:
+# (título, ano, autores, fonte, início do resumo, URL)
+ESPERADOS = [
+    ('Criptografia pós-quântica: desafios e oportunidades para a segurança de dados', 2024,
+     'AB Silva, CD Souza', 'Revista Brasileira de Computação, 2024',
+     'A computação quântica representa uma ameaça', 'https://www.scielo.br/j/rbc/a/abc123'),
+    ('Quantum algorithms for portfolio optimization in finance', 2024,
+     'J Smith, K Lee, M Chen', 'arXiv preprint arXiv:2401.01234, 2024',
+     'We present a breakthrough approach', 'https://arxiv.org/abs/2401.01234'),
+    ('Aprendizado de máquina quântico aplicado à descoberta de medicamentos', 2025,
+     'RF Oliveira', 'Dissertação de Mestrado, 2025',
+     'Investigamos modelos de aprendizado', 'https://repositorio.ufsc.br/handle/123456789/9999'),
+    ('Quantum chemistry on noisy intermediate-scale quantum computers', 2024,
+     'Y Cao, J Romero, A Aspuru-Guzik', 'Chemical Reviews, 2024',
+     'Quantum chemistry is one of the most promising', 'https://pubs.acs.org/doi/10.1021/acs.chemrev.4c00001'),
+    ('Perspectivas futuras da computação quântica no Brasil', 2025,
+     'LM Pereira, TS Costa', 'Computação Brasil, 2025',
+     'Este artigo apresenta um panorama', 'https://www.sbc.org.br/artigos/perspectivas-quanticas'),
+    ('Post-quantum cryptography standardization: an overview', 2024,
+     'D Moody, L Chen', 'IEEE Security & Privacy, 2024',
+     'NIST has selected the first', 'https://ieeexplore.ieee.org/document/10400001'),
+    ('Otimização quântica aproximada (QAOA) em problemas de roteamento', 2024,
+     'GH Almeida, PR Lima', 'Anais do WCAMA, 2024',
+     'Avaliamos o QAOA em instâncias', 'https://sol.sbc.org.br/index.php/wcama/article/view/12345'),
+    ('Quantum advantage in machine learning: myths and reality', 2025,
+     'H Huang, R Kueng, J Preskill', 'Nature Physics, 2025',
+     None, 'https://www.nature.com/articles/s41567-024-00001'),
+    ('Desafios da correção de erros em computadores quânticos supercondutores', 2024,
+     'MC Rocha', 'Revista de Física Aplicada, 2024',
+     'A correção de erros quânticos continua', 'https://periodicos.ufpe.br/revistas/quantica/article/view/777'),
+    ('Quantum computing for drug discovery: a review', 2024,
+     'S Kumar, A Gupta', 'Drug Discovery Today, 2024',
+     'Quantum computing promises to accelerate', 'https://www.sciencedirect.com/science/article/pii/S1359644624000001'),
+]
+
+
+def _artigos():
+    with banco.conexao() as conn:
+        return conn.execute(
+            "SELECT termo, titulo, ano_publicacao, autores, fonte_publicacao, resumo, url_artigo "
+            f"FROM {DATABASE_CONFIG['TABLE_NAME']} ORDER BY id"
+        ).fetchall()
+
+
+def _buscar(meta, topicos=(TOPICO,)):
+    return selenium_simples.executar_web_scraping_selenium_simples(list(topicos), 2020, 2025, meta, num_workers=1)
+
+
+def test_grava_os_resultados_da_pagina_campo_a_campo(scholar):
+    scholar(paginas=1)
+
+    job = _buscar(10)
+
+    assert job.instantaneo()['status'] == 'concluido'
+    artigos = _artigos()
+    assert len(artigos) == len(ESPERADOS)
+    for posicao, (artigo, esperado) in enumerate(zip(artigos, ESPERADOS)):
+        termo, titulo, ano, autores, fonte, resumo, url = artigo
+        titulo_esperado, ano_esperado, autores_esperados, fonte_esperada, resumo_esperado, url_esperada = esperado
+        # O servidor local marca cada resultado com o tópico, a página e a posição
+        assert termo == TOPICO
+        assert titulo == f"[{TOPICO} #1.{posicao}] {titulo_esperado}"
+        assert ano == ano_esperado
+        assert autores == autores_esperados
+        assert fonte == fonte_esperada
+        if resumo_esperado is None:
+            assert resumo is None
+        else:
+            assert resumo.startswith(resumo_esperado) and resumo.endswith('…')
+        assert url == f"{url_esperada}?q={urllib.parse.quote(TOPICO)}&n={posicao}"
+
+
+def test_pagina_vazia_encerra_a_paginacao(scholar):
+    servidor = scholar(paginas=2)
+
+    job = _buscar(100)
+
+    progresso = job.instantaneo()
+    assert progresso['status'] == 'concluido'
+    assert progresso['topicos'][TOPICO]['status'] == 'concluido'
+    # Duas páginas com resultados e a vazia; nenhuma página depois dela
+    assert servidor.requisicoes == 3
+    assert len(_artigos()) == 20
+
+
+def test_captcha_levanta_bloqueio(scholar):
+    servidor = scholar(captcha=True)
+    coletor = coletores.ColetorHTTP()
+    url = f"{servidor.url}?q=teste"
+
+    try:
+        with pytest.raises(BloqueioCaptcha):
+            coletor.obter(url, selenium_simples.obter_limitador(url))
+    finally:
+        coletor.fechar()
+    # Uma requisição por tentativa, todas redirecionadas para /sorry/
+    assert servidor.requisicoes == 2
+
+
+class ColetorFixture:
+    """Alternativa sem navegador: a página de fixture no lugar do Selenium"""
+
+    nome = 'fixture'
+
+    def __init__(self):
+        self.requisicoes = 0
+        self.falhou = False
+
+    def obter(self, url, limitador, cache=None):
+        self.requisicoes += 1
+        inicio = int(urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get('start', ['0'])[0])
+        if inicio:
+            return PAGINA_VAZIA, []
+        from bench_coleta import DIR_FIXTURES
+
+        with open(f"{DIR_FIXTURES}/scholar_pagina.html", encoding='utf-8') as arquivo:
+            return PAGINA_RESULTADOS, extrair_resultados_html(arquivo.read())
+
+    def fechar(self):
+        pass
+
+
+def test_captcha_passa_para_o_coletor_alternativo(scholar, monkeypatch):
+    servidor = scholar(captcha=True)
+    monkeypatch.setitem(coletores.COLETORES, 'fixture', ColetorFixture)
+    monkeypatch.setitem(selenium_simples.SEARCH_CONFIG, 'FETCHER_FALLBACK', 'fixture')
+
+    job = _buscar(20)
+
+    assert job.instantaneo()['status'] == 'concluido'
+    # O HTTP esgotou as tentativas no CAPTCHA e a busca seguiu pela alternativa
+    assert servidor.requisicoes == 2
+    artigos = _artigos()
+    assert [artigo[1] for artigo in artigos] == [esperado[0] for esperado in ESPERADOS]
@@ -0,0 +1,63 @@
+"""
+Snapshot colunar: atualizar() na ingestão, abrir() só lê o manifesto atual
+"""
+
+import pytest
+
+import banco
+import colunar
+from config import SNAPSHOT_CONFIG
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def snapshot_habilitado(monkeypatch, banco_temporario):
+    monkeypatch.setitem(SNAPSHOT_CONFIG, 'ENABLED', True)
+    monkeypatch.setitem(SNAPSHOT_CONFIG, 'DIR', None)
+
+
+def test_abrir_nao_atualiza_e_usa_o_banco_se_atrasado(snapshot_habilitado, gravar_artigos):
+    with banco.conexao() as conn:
+        gravar_artigos(conn, 100, semente=1)
+        # Sem snapshot ainda: abrir() não o cria
+        assert colunar.abrir(conn) is None
+        assert colunar._ler_manifesto(colunar.diretorio_snapshot()) is None
+
+        manifesto = colunar.atualizar(conn)
+        snapshot = colunar.abrir(conn)
+        assert snapshot is not None
+        assert snapshot.tabela('artigos', ['id']).num_rows == 100
+
+        # Artigos depois das marcas: abrir() cai para o banco e o manifesto fica como estava
+        gravar_artigos(conn, 10, semente=2)
+        assert colunar.abrir(conn) is None
+        assert colunar._ler_manifesto(colunar.diretorio_snapshot()) == manifesto
+
+        colunar.atualizar(conn)
+        assert colunar.abrir(conn).tabela('artigos', ['id']).num_rows == 110
+
+
+def test_abrir_nao_espera_o_lock_da_atualizacao(snapshot_habilitado, gravar_artigos):
+    with banco.conexao() as conn:
+        gravar_artigos(conn, 50, semente=1)
+        colunar.atualizar(conn)
+        with colunar._lock:
+            assert colunar.abrir(conn) is not None
+
+
+def test_abrir_recusa_snapshot_de_antes_do_agrupamento(snapshot_habilitado, gravar_artigos, quase_duplicatas):
+    with banco.conexao() as conn:
+        gravar_artigos(conn, linhas=quase_duplicatas)
+        assert colunar.atualizar(conn)['contagens']['pendentes'] == 2
+
+        # Agrupamento depois do snapshot: as marcas não mudam, o canonico do preprint sim
+        banco.migrar_pendentes(conn)
+        canonicos = conn.execute(
+            f"SELECT COUNT(*) FROM {colunar.TABELA} WHERE cluster_id IS NULL OR cluster_id = id"
+        ).fetchone()[0]
+        assert canonicos == 1
+        assert colunar.abrir(conn) is None
+
+        colunar.atualizar(conn)
+        assert colunar.abrir(conn).publicacoes_por_ano(2025) == [(2023, 1)]
@@ -0,0 +1,18 @@
+"""
+Estado final dos jobs de gráficos (app._executar_job_graficos)
+"""
+
+import app
+import jobs
+
+
+def test_job_sem_graficos_termina_em_erro(banco_temporario):
+    # Banco vazio: gerar_graficos não tem o que analisar e retorna None
+    job = jobs.registro.criar('graficos', {'escopo': 'todas', 'graficos': None}, escopo='todas')
+
+    app._executar_job_graficos(job, None)
+
+    estado = job.instantaneo()
+    assert estado['status'].startswith('erro')
+    assert jobs.finalizado(estado['status'])
+    assert estado['graficos'] is None
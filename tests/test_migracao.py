@@ -0,0 +1,33 @@
+"""
+Abrir conexões só cria o esquema; o que percorre o corpus fica em banco.migrar_pendentes
+"""
+
+import banco
+from config import DATABASE_CONFIG
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+
+def _estado():
+    with banco.conexao() as conn:
+        return (
+            conn.execute(f"SELECT COUNT(*) FROM {TABELA} WHERE indexado = 0").fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM resultados_fts_docsize").fetchone()[0],
+        )
+
+
+def test_conexao_nova_nao_percorre_o_corpus(gravar_artigos):
+    with banco.conexao() as conn:
+        gravar_artigos(conn, 200)
+        # Banco de antes da busca textual: índice FTS vazio
+        conn.execute("INSERT INTO resultados_fts (resultados_fts) VALUES ('delete-all')")
+        conn.commit()
+        total = conn.execute(f"SELECT COUNT(*) FROM {TABELA}").fetchone()[0]
+
+    # Pool e esquema do processo do zero, como numa inicialização nova
+    banco.definir_banco(DATABASE_CONFIG['DATABASE_NAME'])
+    assert _estado() == (total, 0)
+
+    with banco.conexao() as conn:
+        banco.migrar_pendentes(conn)
+    assert _estado() == (0, total)
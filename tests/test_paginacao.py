@@ -0,0 +1,59 @@
+"""
+Paginação por chave da tabela de resultados (banco.pagina_resultados)
+"""
+
+import pytest
+
+import banco
+from config import DATABASE_CONFIG
+
+TABELA = DATABASE_CONFIG['TABLE_NAME']
+
+
+@pytest.fixture
+def corpus_pequeno(gravar_artigos):
+    """500 artigos sintéticos (com alguns sem ano)"""
+    with banco.conexao() as conn:
+        gravar_artigos(conn, 500)
+
+
+def _percorrer(conn, ordem, limite):
+    ids, cursor_pagina = [], None
+    while True:
+        _, linhas, cursor_pagina = banco.pagina_resultados(conn, ['id'], ordem, cursor_pagina, limite)
+        ids.extend(linha[0] for linha in linhas)
+        if cursor_pagina is None:
+            return ids
+
+
+@pytest.mark.parametrize('ordem, direcao', [('ano_desc', 'DESC'), ('ano_asc', 'ASC'),
+                                            ('id_desc', 'DESC'), ('id_asc', 'ASC')])
+def test_paginas_cobrem_a_tabela_na_ordem(corpus_pequeno, ordem, direcao):
+    with banco.conexao() as conn:
+        chave = ', '.join(f"{expressao} {direcao}" for expressao in banco.ORDENACOES[ordem][0])
+        esperado = [linha[0] for linha in conn.execute(f"SELECT id FROM {TABELA} ORDER BY {chave}")]
+        assert _percorrer(conn, ordem, 37) == esperado
+
+
+@pytest.mark.parametrize('ordem', ['ano_desc', 'ano_asc'])
+def test_paginas_por_ano_usam_o_indice_sem_ordenar(corpus_pequeno, ordem):
+    with banco.conexao() as conn:
+        _, _, cursor_pagina = banco.pagina_resultados(conn, ['id', 'titulo'], ordem, None, 50)
+        consultas = []
+        conn.set_trace_callback(consultas.append)
+        try:
+            banco.pagina_resultados(conn, ['id', 'titulo'], ordem, None, 50)
+            # Página do meio: as duas buscas (restante do ano do cursor e anos seguintes)
+            banco.pagina_resultados(conn, ['id', 'titulo'], ordem, cursor_pagina, 450)
+        finally:
+            conn.set_trace_callback(None)
+
+        consultas = [sql for sql in consultas if sql.startswith('SELECT')]
+        assert len(consultas) == 3
+        for sql in consultas:
+            plano = ' | '.join(linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            assert 'idx_resultados_ano_id' in plano, plano
+            assert 'TEMP B-TREE' not in plano, plano
+        for sql in consultas[1:]:
+            plano = ' | '.join(linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            assert plano.startswith('SEARCH'), plano